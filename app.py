@@ -1,14 +1,40 @@
+import cProfile
+import contextlib
+import fcntl
+import functools
+import itertools
+import io
+import json
 import pickle
 import os
+import pstats
+import re
+import queue
+import signal
+import time
 import gc
+import hmac
 import logging
+import math
+import threading
+import uuid
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 import requests
-from flask import Flask, request, jsonify
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from flask import Flask, Response, g, has_request_context, redirect, request, jsonify, send_file
 from flask_cors import CORS
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+from catalog import (COLD_TEXT_COLUMNS, CatalogDB, ColdTextStore, ColdTextWriter, build_range_indexes,
+                     compact_main_frame, compact_movies_frame, file_key, genre_labels, intersect_sorted, object_bytes)
+from catalog_csv import MAIN_DATA_SCHEMA, MOVIES_SCHEMA, prepare_movies, read_catalog, read_main_data, read_movies
+from image_cache import ImageCache
+from metrics import (ADMISSION, ERRORS, IMAGE_CACHE, POSTER_CACHE, POSTER_FETCH_LATENCY, REQUEST_LATENCY,
+                     STAGE_LATENCY, TMDB_REQUESTS, render_all)
+from sentiment import compile_sentiment
+from similarity import build_neighbors, catalog_fingerprint, load_neighbors, top_k_rows, vectorize_catalog
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,11 +42,111 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 # Allow Vercel and Localhost (for testing)
-CORS(app, resources={r"/*": {"origins": [
+CORS_ORIGINS = [
     "https://end-to-end-movie-recommendation-sys.vercel.app",
     "http://localhost:3000",
     "http://localhost:5173"
-]}})
+]
+CORS(app, resources={r"/*": {"origins": CORS_ORIGINS}})
+
+class AdmissionLimiter:
+    """Concurrency limit for one endpoint with a bounded, time-limited wait queue"""
+
+    def __init__(self, concurrency, queue_size, wait_ms):
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.wait_ms = wait_ms
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a slot, waiting only if the queue has room. Returns False when overloaded."""
+        if self._slots.acquire(blocking=False):
+            return True
+        with self._lock:
+            if self._waiting >= self.queue_size:
+                return False
+            self._waiting += 1
+        try:
+            return self._slots.acquire(timeout=self.wait_ms / 1000)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def release(self):
+        self._slots.release()
+
+def build_admission_limiters(spec, defaults, wait_ms):
+    """Parse "endpoint=concurrency:queue,..." over the defaults; concurrency 0 disables a limit"""
+    limits = dict(defaults)
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        endpoint, _, value = item.partition('=')
+        concurrency, _, queue_size = value.partition(':')
+        limits[endpoint.strip()] = (int(concurrency), int(queue_size or 0))
+    return {endpoint: AdmissionLimiter(concurrency, queue_size, wait_ms)
+            for endpoint, (concurrency, queue_size) in limits.items() if concurrency > 0}
+
+def respond(payload):
+    """jsonify() a response payload, timed as the request's 'serialize' stage"""
+    with stage('serialize'):
+        return jsonify(payload)
+
+def stage(name, endpoint=None):
+    """Time a named stage of the current request (title resolve, score, serialize, ...)
+
+    The endpoint defaults to the Flask request's; outside a request (ASGI worker
+    threads, scripts) nothing is recorded unless it is given explicitly.
+    """
+    endpoint = endpoint or (request.endpoint if has_request_context() else None)
+    if not endpoint:
+        return contextlib.nullcontext()
+    return STAGE_LATENCY.time(endpoint, name)
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _record_request_metrics(response):
+    started = getattr(g, 'request_started', None)
+    if started is not None:
+        endpoint = request.endpoint or 'unknown'
+        REQUEST_LATENCY.observe(time.perf_counter() - started, endpoint, request.method, str(response.status_code))
+        if response.status_code >= 500:
+            ERRORS.inc(endpoint)
+    return response
+
+@app.before_request
+def _admit_request():
+    """Enforce the endpoint's concurrency limit; over the limit, degrade or shed the request"""
+    limiter = admission_limiters.get(request.endpoint)
+    if limiter is None:
+        return None
+    if limiter.acquire():
+        g.admission = limiter
+        return None
+    if OVERLOAD_MODE == 'degrade':
+        ADMISSION.inc(request.endpoint, 'degraded')
+        g.degraded = True
+        return None
+    ADMISSION.inc(request.endpoint, 'rejected')
+    response = jsonify({'error': 'Server is busy, please retry shortly'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(OVERLOAD_RETRY_AFTER)
+    return response
+
+@app.after_request
+def _mark_degraded(response):
+    if g.get('degraded'):
+        response.headers['X-Degraded'] = 'posters'
+    return response
+
+@app.teardown_request
+def _release_admission(exc):
+    limiter = g.pop('admission', None)
+    if limiter is not None:
+        limiter.release()
 
 # Get TMDB API key from environment variable
 TMDB_API_KEY = os.environ.get('TMDB_API_KEY')
@@ -29,89 +155,1120 @@ if not TMDB_API_KEY:
 else:
     logger.info("TMDB_API_KEY loaded successfully from environment")
 
-# Loading the dataset and the trained model
-try:
-    clf = pickle.load(open("./Artifacts/nlp_model.pkl", 'rb'))
-    vectorizer = pickle.load(open("./Artifacts/tranform.pkl", 'rb'))
-    logger.info("Models loaded successfully")
-    # Force garbage collection to free temporary memory from pickle loading
-    gc.collect()
-    logger.info("Garbage collection completed after model loading")
-except Exception as e:
-    logger.error(f"Error loading models: {e}")
-    clf = None
-    vectorizer = None
+# Number of nearest neighbours kept per movie (rcmd() serves the first 10)
+NEIGHBOR_K = int(os.environ.get('NEIGHBOR_K', 50))
+
+# Token required by the /admin/* endpoints; admin endpoints are disabled when unset
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# Weight of each disliked title relative to a liked one in taste profiles
+DISLIKE_WEIGHT = float(os.environ.get('DISLIKE_WEIGHT', 0.5))
+
+# Upper bound on seeds and results accepted by /recommend/profile
+MAX_PROFILE_SEEDS = 50
+MAX_PROFILE_RESULTS = 50
+
+# Upper bound on titles accepted by /recommend/batch
+MAX_BATCH_TITLES = 25
+
+# Upper bound on movies accepted by /api/posters
+MAX_POSTER_BATCH = 50
+
+# How /recommend returns posters unless the request says otherwise: 'inline' resolves them
+# before responding, 'deferred' answers at once with cached posters only (see /api/posters)
+RECOMMEND_POSTERS = os.environ.get('RECOMMEND_POSTERS', 'inline')
+
+# Upper bound on reviews accepted by /api/sentiment
+MAX_SENTIMENT_REVIEWS = 100
+# Names /api/sentiment gives the classifier's classes (reviews.txt labels: 1 positive, 0 negative)
+SENTIMENT_NAMES = {1: 'Good', 0: 'Bad'}
+
+# Optional cross-request micro-batching of /recommend/profile scoring; disabled when the window is 0
+MICROBATCH_WINDOW_MS = float(os.environ.get('MICROBATCH_WINDOW_MS', 0))
+MICROBATCH_MAX = int(os.environ.get('MICROBATCH_MAX', 64))
+
+# TMDB endpoints; overridable so load tests can point at a local stand-in
+TMDB_API_BASE = os.environ.get('TMDB_API_BASE', 'https://api.themoviedb.org/3').rstrip('/')
+TMDB_IMAGE_BASE = os.environ.get('TMDB_IMAGE_BASE', 'https://image.tmdb.org/t/p').rstrip('/')
+# Base of the poster URLs the API returns; set to this app's /img to serve posters through the proxy
+POSTER_URL_BASE = os.environ.get('POSTER_URL_BASE', TMDB_IMAGE_BASE).rstrip('/')
+
+# /img/<size>/<poster_path> poster proxy: TMDB sizes it forwards, and its on-disk cache
+POSTER_SIZES = ('w92', 'w154', 'w185', 'w342', 'w500', 'w780', 'original')
+# Size of the poster URLs the API returns (one of POSTER_SIZES; unknown values fall back to w500)
+POSTER_SIZE = os.environ.get('POSTER_SIZE', 'w500') if os.environ.get('POSTER_SIZE', 'w500') in POSTER_SIZES else 'w500'
+POSTER_CACHE_DIR = os.environ.get('POSTER_CACHE_DIR', os.path.join(os.path.dirname(__file__), 'Artifacts', 'posters'))
+POSTER_CACHE_MAX_BYTES = int(os.environ.get('POSTER_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+# Per-endpoint admission control for the routes that fan out to TMDB: at most `concurrency`
+# requests run at once and at most `queue` more wait up to ADMISSION_WAIT_MS for a slot.
+# Override with ADMISSION_LIMITS="get_movies=4:8,recommend=4:8"; cheap routes are never limited.
+ADMISSION_DEFAULTS = {'get_movies': (4, 8), 'get_rows': (4, 8), 'get_movie_full': (4, 8), 'recommend': (4, 8),
+                      'recommend_batch': (2, 4), 'recommend_profile': (2, 4), 'get_posters': (4, 8)}
+ADMISSION_WAIT_MS = float(os.environ.get('ADMISSION_WAIT_MS', 100))
+# What happens past the queue: 'degrade' serves cached/placeholder posters, 'reject' answers 503
+OVERLOAD_MODE = os.environ.get('OVERLOAD_MODE', 'degrade')
+OVERLOAD_RETRY_AFTER = int(os.environ.get('OVERLOAD_RETRY_AFTER', 1))
+
+# Largest page size /api/movies serves (each row may cost a TMDB call)
+MAX_PAGE_LIMIT = int(os.environ.get('MAX_PAGE_LIMIT', 100))
+
+# Rows formatted per chunk when /api/movies streams NDJSON (?format=ndjson)
+MOVIES_STREAM_CHUNK = int(os.environ.get('MOVIES_STREAM_CHUNK', 1000))
+
+# Home page rows served by /api/rows, materialized from /api/movies queries whenever the
+# catalog loads: (key, display title, query parameters)
+HOME_ROWS = [
+    ('popular', 'Popular', {'sort': 'popularity.desc'}),
+    ('top_rated', 'Top Rated', {'sort': 'vote_average.desc'}),
+    ('recent', 'New Releases', {'sort': 'release_date.desc'}),
+] + [
+    (re.sub(r'[^a-z]+', '_', genre.lower()), genre, {'genre': genre, 'sort': 'popularity.desc'})
+    for genre in ['Action', 'Adventure', 'Animation', 'Comedy', 'Crime', 'Documentary', 'Drama', 'Family',
+                  'Fantasy', 'Horror', 'Mystery', 'Romance', 'Sci-Fi', 'Thriller']
+]
+HOME_ROW_LENGTH = int(os.environ.get('HOME_ROW_LENGTH', 20))
+
+# Number of resolved poster URLs kept in the per-process LRU cache
+POSTER_CACHE_SIZE = int(os.environ.get('POSTER_CACHE_SIZE', 10000))
+
+# Threads resolving one response's posters concurrently (see fetch_posters)
+POSTER_WORKERS = int(os.environ.get('POSTER_WORKERS', 8))
+
+# Recommendations returned by /api/movie/<id>/full unless ?limit= asks for fewer
+MOVIE_PAGE_RECOMMENDATIONS = 10
+
+# Lazy loading of components missing after startup: requests wait up to WARMUP_WAIT_SECONDS
+# for the single in-flight load before getting a 503; failed loads retry with exponential backoff
+WARMUP_WAIT_SECONDS = float(os.environ.get('WARMUP_WAIT_SECONDS', 2))
+LOAD_RETRY_BASE = float(os.environ.get('LOAD_RETRY_BASE', 5))
+LOAD_RETRY_MAX = float(os.environ.get('LOAD_RETRY_MAX', 300))
+
+# Opt-in per-request profiling (see _profile_requested); dumps go to PROFILE_DIR
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED') == '1'
+PROFILE_DIR = os.environ.get('PROFILE_DIR', '/tmp/profiles')
+PROFILE_TOP_N = int(os.environ.get('PROFILE_TOP_N', 25))
+
+ARTIFACTS_DIR = os.environ.get('ARTIFACTS_DIR', os.path.join(os.path.dirname(__file__), 'Artifacts'))
+MAIN_DATA_PATH = os.path.join(ARTIFACTS_DIR, 'main_data.csv')
+MOVIES_DATA_PATH = os.path.join(ARTIFACTS_DIR, 'movies.csv')
+# nlp_model.pkl / tranform.pkl; train_sentiment.py writes retrained ones to Artifacts/sentiment
+SENTIMENT_DIR = os.environ.get('SENTIMENT_DIR', ARTIFACTS_DIR)
+MAIN_DATA_COLUMNS = list(MAIN_DATA_SCHEMA)
+# Seconds between checks for rows another worker appended to main_data.csv
+CATALOG_CHECK_SECONDS = float(os.environ.get('CATALOG_CHECK_SECONDS', 5))
+
+# Compact catalog mode: narrow dtypes, categorical strings, cold text memory-mapped (see catalog.py)
+COMPACT_CATALOG = os.environ.get('COMPACT_CATALOG') == '1'
+
+# Browse catalog storage: 'memory' (pandas, the default) or 'sqlite' (indexed on-disk database, see catalog.py)
+CATALOG_BACKEND = os.environ.get('CATALOG_BACKEND', 'memory')
+CATALOG_DB_PATH = os.environ.get('CATALOG_DB_PATH', os.path.join(ARTIFACTS_DIR, 'movies.db'))
+
+
+class ArtifactSnapshot:
+    """Versioned bundle of every artifact the request path reads.
+
+    Handlers read the module-level `snapshot` once and work only with that
+    object, so a reload that publishes a new bundle never changes data under
+    an in-flight request. Published snapshots are never mutated; updates build
+    a new one with `replace()` and swap the reference.
+    """
+
+    FIELDS = ('clf', 'vectorizer', 'sentiment', 'data', 'count_vectorizer', 'features',
+              'neighbors', 'neighbor_scores', 'title_index', 'movies_data', 'movie_text',
+              'range_indexes', 'catalog_db', 'home_rows', 'movie_rows', 'row_movies', 'data_key')
+
+    def __init__(self, version=0, **artifacts):
+        self.version = version
+        self.created_at = time.time()
+        for field in self.FIELDS:
+            setattr(self, field, artifacts.get(field))
+
+    def replace(self, **changes):
+        """Return a copy with some artifacts swapped and the version bumped"""
+        artifacts = {field: getattr(self, field) for field in self.FIELDS}
+        artifacts.update(changes)
+        return ArtifactSnapshot(self.version + 1, **artifacts)
+
+
+admission_limiters = build_admission_limiters(os.environ.get('ADMISSION_LIMITS', ''), ADMISSION_DEFAULTS,
+                                              ADMISSION_WAIT_MS)
+
+# Current artifacts; replaced as a whole, never modified in place
+snapshot = ArtifactSnapshot()
+
+# Serializes writers (reloads, ingestion, lazy loads); the read path never takes it
+_snapshot_lock = threading.Lock()
+_reload_thread = None
+_reload_thread_lock = threading.Lock()
 
-# Global variables for similarity data
-data = None
-similarity = None
+# (movie_id, title) -> poster URL, least recently used first
+_poster_cache = OrderedDict()
+_poster_cache_lock = threading.Lock()
+_poster_pool = ThreadPoolExecutor(max_workers=POSTER_WORKERS, thread_name_prefix='poster')
+
+def load_models():
+    """Load the sentiment model and its vectorizer"""
+    try:
+        with open(os.path.join(SENTIMENT_DIR, 'nlp_model.pkl'), 'rb') as f:
+            clf = pickle.load(f)
+        with open(os.path.join(SENTIMENT_DIR, 'tranform.pkl'), 'rb') as f:
+            vectorizer = pickle.load(f)
+        logger.info("Models loaded successfully")
+        # Force garbage collection to free temporary memory from pickle loading
+        gc.collect()
+        logger.info("Garbage collection completed after model loading")
+        return clf, vectorizer
+    except Exception as e:
+        logger.error(f"Error loading models: {e}")
+        return None, None
+
+def load_sentiment(clf, vectorizer):
+    """Compile the sentiment pipeline to a single weight vector (None if it can't be compiled)"""
+    try:
+        compiled = compile_sentiment(clf, vectorizer)
+        logger.info(f"Sentiment model compiled: {len(compiled.term_weights)} features")
+        return compiled
+    except Exception as e:
+        logger.error(f"Error compiling sentiment model: {e}")
+        return None
+
+def build_title_index(titles):
+    """Map each movie title to the first row it appears in"""
+    index = {}
+    for i, title in enumerate(titles):
+        index.setdefault(title, i)
+    return index
 
 def create_similarity():
-    """Create similarity matrix using count vectorizer and cosine similarity"""
-    global data, similarity
+    """Vectorize the catalog and build the top-K cosine neighbour lists.
+
+    Returns the recommender artifacts as a dict of snapshot fields, or None on failure.
+    """
     try:
-        # Use relative path that works in production
-        data_path = os.path.join(os.path.dirname(__file__), 'Artifacts', 'main_data.csv')
-        data = pd.read_csv(data_path)
-        cv = CountVectorizer()
-        count_matrix = cv.fit_transform(data['comb']) 
-        similarity = cosine_similarity(count_matrix)
-        logger.info("Similarity matrix created successfully")
+        # Keyed before reading, so rows appended meanwhile show up as a changed file
+        data_key = file_key(MAIN_DATA_PATH)
+        # Typed, chunked read of only the schema columns (see catalog_csv.py)
+        df = read_main_data(MAIN_DATA_PATH)
+        cv, feats = vectorize_catalog(df['comb'])
+        # Prefer neighbour lists prebuilt by `python similarity.py` for this exact catalog
+        saved = load_neighbors(ARTIFACTS_DIR, catalog_fingerprint(df['comb']), len(df), NEIGHBOR_K)
+        if saved is not None:
+            nbrs, scores = saved
+            logger.info("Similarity neighbours loaded from prebuilt artifacts")
+        else:
+            nbrs, scores = build_neighbors(feats, NEIGHBOR_K)
+            logger.info("Similarity neighbours created successfully")
         # Force garbage collection to free temporary memory
         gc.collect()
         logger.info("Garbage collection completed after similarity matrix creation")
-        return data, similarity
+        if COMPACT_CATALOG:
+            df = compact_main_frame(df)
+        return {
+            'data': df,
+            'count_vectorizer': cv,
+            'features': feats,
+            'neighbors': nbrs,
+            'neighbor_scores': scores,
+            'title_index': build_title_index(df['movie_title']),
+            'data_key': data_key
+        }
     except Exception as e:
         logger.error(f"Error creating similarity: {e}")
-        return None, None
+        return None
+
+def load_browsing_data():
+    """Load and preprocess movies.csv for browsing.
+
+    Returns the browse artifacts as a dict of snapshot fields, or None on failure.
+    With CATALOG_BACKEND=sqlite the rows stay in an indexed database on disk instead.
+    """
+    try:
+        if CATALOG_BACKEND == 'sqlite':
+            catalog_db = CatalogDB.build(MOVIES_DATA_PATH, CATALOG_DB_PATH)
+            browsing = {'catalog_db': catalog_db, 'movies_data': None, 'movie_text': None, 'range_indexes': None}
+            browsing['home_rows'] = build_home_rows(ArtifactSnapshot(**browsing))
+            logger.info(f"Browsing database ready: {catalog_db.count()} movies in {CATALOG_DB_PATH}")
+            return browsing
+
+        # Served columns only, typed and preprocessed chunk by chunk as they are parsed
+        movie_text = None
+        if COMPACT_CATALOG:
+            # Each chunk is compacted and its long text written off-heap before the next is parsed
+            writer = ColdTextWriter(COLD_TEXT_COLUMNS, ARTIFACTS_DIR, file_key(MOVIES_DATA_PATH))
+
+            def compact_chunk(chunk):
+                chunk = prepare_movies(chunk)
+                writer.add(chunk)
+                return compact_movies_frame(chunk).drop(columns=COLD_TEXT_COLUMNS)
+
+            df = read_catalog(MOVIES_DATA_PATH, MOVIES_SCHEMA, compact_chunk)
+            movie_text = writer.close()
+        else:
+            df = read_movies(MOVIES_DATA_PATH)
+
+        logger.info(f"Browsing data loaded: {len(df)} movies")
+        browsing = {'movies_data': df, 'movie_text': movie_text, 'range_indexes': build_range_indexes(df),
+                    'catalog_db': None}
+        browsing['home_rows'] = build_home_rows(ArtifactSnapshot(**browsing))
+        return browsing
+    except Exception as e:
+        logger.error(f"Error loading browsing data: {e}")
+        return None
+
+def link_catalogs(movies_data, title_index, recommender_rows):
+    """Match browse movies to recommender rows by lowercased title.
+
+    Returns ({browse id: recommender row}, array giving each recommender row's
+    first matching browse position, or -1).
+    """
+    rows = movies_data['title'].astype(str).str.lower().map(title_index)
+    linked = rows.notna().to_numpy()
+    row_values = rows[linked].to_numpy(dtype=np.int64)
+    ids = pd.to_numeric(movies_data['id'][linked], errors='coerce').fillna(0).astype(np.int64)
+    movie_rows = dict(zip(ids.tolist(), row_values.tolist()))
+    row_movies = np.full(recommender_rows, -1, dtype=np.int64)
+    unique_rows, first = np.unique(row_values, return_index=True)
+    row_movies[unique_rows] = np.flatnonzero(linked)[first]
+    return movie_rows, row_movies
+
+def catalog_links(changes, base):
+    """movie_rows/row_movies fields for `base` updated with `changes` ({} until both catalogs are loaded)"""
+    movies_data = changes.get('movies_data', base.movies_data)
+    data = changes.get('data', base.data)
+    if movies_data is None or data is None:
+        return {}
+    movie_rows, row_movies = link_catalogs(movies_data, changes.get('title_index', base.title_index), len(data))
+    return {'movie_rows': movie_rows, 'row_movies': row_movies}
+
+def build_snapshot(previous=None):
+    """Load every artifact from disk into a new, unpublished snapshot.
+
+    Components that fail to load are carried over from `previous`, so a broken
+    file on disk never takes down a component that was already serving.
+    """
+    previous = previous or ArtifactSnapshot()
+    changes = {}
+    clf, vectorizer = load_models()
+    if clf is not None:
+        changes.update(clf=clf, vectorizer=vectorizer, sentiment=load_sentiment(clf, vectorizer))
+    recommender = create_similarity()
+    if recommender is not None:
+        changes.update(recommender)
+    browsing = load_browsing_data()
+    if browsing is not None:
+        changes.update(browsing)
+    changes.update(catalog_links(changes, previous))
+    return previous.replace(**changes)
+
+def reload_artifacts():
+    """Rebuild all artifacts off the read path and publish them atomically"""
+    global snapshot
+    with _snapshot_lock:
+        started = time.time()
+        new_snapshot = build_snapshot(snapshot)
+        # A single reference assignment: readers see either the old or the new bundle
+        snapshot = new_snapshot
+        logger.info(f"Published artifact snapshot v{new_snapshot.version} in {time.time() - started:.1f}s")
+        return new_snapshot
+
+def reload_recommender():
+    """Rebuild only the recommender from main_data.csv and publish it"""
+    global snapshot
+    with _snapshot_lock:
+        changes = create_similarity()
+        if changes is not None:
+            snapshot = snapshot.replace(**changes, **catalog_links(changes, snapshot))
+            logger.info(f"Published recommender snapshot v{snapshot.version}")
+        return snapshot
+
+def reload_artifacts_async(target=reload_artifacts):
+    """Start a background reload unless one is already running. Returns True if started."""
+    global _reload_thread
+    with _reload_thread_lock:
+        if _reload_thread is not None and _reload_thread.is_alive():
+            return False
+        _reload_thread = threading.Thread(target=target, name='artifact-reload', daemon=True)
+        _reload_thread.start()
+        return True
+
+class WarmingUp(Exception):
+    """A snapshot component is still loading, or waiting to retry a failed load"""
+
+    def __init__(self, component, retry_after):
+        super().__init__(f"{component} is warming up")
+        self.component = component
+        self.retry_after = retry_after
+
+class LazyLoader:
+    """Single-flight loading of one snapshot component, with backoff between failed attempts.
+
+    The first caller to find the component missing starts one background load;
+    every caller (including it) waits at most `timeout` for that load and then
+    gets WarmingUp, so concurrent requests never build the same artifacts twice.
+    """
+
+    def __init__(self, component, is_loaded, load):
+        self.component = component
+        self.is_loaded = is_loaded
+        self.load = load
+        self._lock = threading.Lock()
+        self._done = None
+        self._failures = 0
+        self._retry_at = 0.0
+
+    def ensure(self, timeout):
+        """Return a snapshot with the component loaded, or raise WarmingUp"""
+        snap = snapshot
+        if self.is_loaded(snap):
+            return snap
+        with self._lock:
+            done = self._done
+            if done is None:
+                backoff = self._retry_at - time.monotonic()
+                if backoff > 0:
+                    raise WarmingUp(self.component, backoff)
+                done = self._done = threading.Event()
+                threading.Thread(target=self._run, args=(done,), name=f'load-{self.component}', daemon=True).start()
+        done.wait(timeout)
+        snap = snapshot
+        if self.is_loaded(snap):
+            return snap
+        with self._lock:
+            retry_after = 1 if self._done is not None else max(1, self._retry_at - time.monotonic())
+        raise WarmingUp(self.component, retry_after)
+
+    def _run(self, done):
+        global snapshot
+        try:
+            with _snapshot_lock:
+                snap = snapshot
+                if not self.is_loaded(snap):
+                    changes = self.load()
+                    if changes is not None:
+                        snapshot = snap.replace(**changes, **catalog_links(changes, snap))
+            loaded = self.is_loaded(snapshot)
+        except Exception as e:
+            logger.error(f"Error loading {self.component}: {e}")
+            loaded = False
+        with self._lock:
+            if loaded:
+                self._failures, self._retry_at = 0, 0.0
+            else:
+                self._failures += 1
+                delay = min(LOAD_RETRY_BASE * 2 ** (self._failures - 1), LOAD_RETRY_MAX)
+                self._retry_at = time.monotonic() + delay
+                logger.error(f"Loading {self.component} failed ({self._failures}x); next attempt in {delay:.0f}s")
+            self._done = None
+        done.set()
+
+_loaders = {
+    'recommender': LazyLoader('recommender', lambda snap: snap.neighbors is not None, create_similarity),
+    'browsing': LazyLoader('browsing', lambda snap: snap.movies_data is not None or snap.catalog_db is not None,
+                           load_browsing_data),
+}
+
+def ensure_loaded(component):
+    """Snapshot with `component` ('recommender' or 'browsing') loaded; raises WarmingUp meanwhile"""
+    return _loaders[component].ensure(WARMUP_WAIT_SECONDS)
+
+def is_loaded(component, snap):
+    """Whether `component` ('recommender' or 'browsing') is loaded in `snap`"""
+    return _loaders[component].is_loaded(snap)
+
+def load_in_background(component):
+    """Start loading `component` if it is missing, without waiting for it"""
+    try:
+        _loaders[component].ensure(0)
+    except WarmingUp:
+        pass
+
+def requires(*components):
+    """Route decorator: answer 503 "warming up" until the components are loaded"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            for component in components:
+                ensure_loaded(component)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@app.errorhandler(WarmingUp)
+def _warming_up(e):
+    response = jsonify({'error': 'Service is warming up, please retry shortly', 'component': e.component})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(math.ceil(e.retry_after))
+    return response
+
+def _handle_reload_signal(signum, frame):
+    """SIGHUP handler: rebuild artifacts in the background without dropping requests"""
+    logger.info("Reload signal received")
+    # Never take locks inside a signal handler; hand off to a thread instead
+    threading.Thread(target=reload_artifacts_async, daemon=True).start()
+
+def _movie_record(movie):
+    """Normalize an ingestion payload into a main_data.csv row, or None if it has no title"""
+    title = str(movie.get('movie_title') or movie.get('title') or '').strip().lower()
+    if not title:
+        return None
+    row = {col: str(movie.get(col) or '').strip() for col in MAIN_DATA_COLUMNS[:5]}
+    row['movie_title'] = title
+    row['comb'] = ' '.join(row[col] for col in ['actor_1_name', 'actor_2_name', 'actor_3_name', 'director_name', 'genres'] if row[col])
+    return row
+
+@contextlib.contextmanager
+def main_data_lock():
+    """Exclusive lock on main_data.csv shared by every worker process"""
+    with open(f'{MAIN_DATA_PATH}.lock', 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def main_data_titles():
+    """Titles currently in main_data.csv, including rows other workers appended"""
+    return set(read_catalog(MAIN_DATA_PATH, {'movie_title': 'str'})['movie_title'].dropna())
+
+_catalog_checked_at = 0.0
+
+def check_catalog_source():
+    """Reload the recommender in the background when main_data.csv changed under this worker.
+
+    Ingestion appends through one worker; every other worker notices the new
+    file here, at most CATALOG_CHECK_SECONDS later, and rebuilds from it.
+    """
+    global _catalog_checked_at
+    now = time.monotonic()
+    if now - _catalog_checked_at < CATALOG_CHECK_SECONDS:
+        return
+    _catalog_checked_at = now
+    data_key = snapshot.data_key
+    try:
+        changed = data_key is not None and file_key(MAIN_DATA_PATH) != data_key
+    except OSError:
+        return
+    if changed and reload_artifacts_async(reload_recommender):
+        logger.info("main_data.csv changed on disk; reloading the recommender")
+
+@app.before_request
+def _check_catalog_source():
+    check_catalog_source()
+
+def ingest_movies(movies, persist=True):
+    """Append new movies to the catalog without refitting the vectorizer.
+
+    New movies are vectorized against the existing vocabulary, scored against the
+    catalog once (batch x N), and folded into the neighbour lists of any existing
+    movie they now outrank. Returns a dict with the added and skipped titles.
+
+    With `persist`, main_data.csv stays locked from the duplicate check through
+    the append, so concurrent ingests in several workers never add a title twice.
+    """
+    global snapshot
+    if snapshot.neighbors is None:
+        ensure_loaded('recommender')
+
+    with _snapshot_lock, (main_data_lock() if persist else contextlib.nullcontext()):
+        snap = snapshot
+        if persist and snap.neighbors is not None and snap.data_key != file_key(MAIN_DATA_PATH):
+            # Another worker appended since this snapshot was built: catch up so row numbers match the file
+            changes = create_similarity()
+            if changes is not None:
+                snap = snapshot = snap.replace(**changes, **catalog_links(changes, snap))
+        if snap.neighbors is None:
+            raise RuntimeError('Unable to load movie database')
+        data, features, title_index = snap.data, snap.features, snap.title_index
+        neighbors, neighbor_scores = snap.neighbors, snap.neighbor_scores
+        on_disk = main_data_titles() if persist else set()
+        added, skipped, seen = [], [], set()
+        for movie in movies:
+            row = _movie_record(movie)
+            if row is None:
+                skipped.append('')
+            elif row['movie_title'] in title_index or row['movie_title'] in on_disk or row['movie_title'] in seen:
+                skipped.append(row['movie_title'])
+            else:
+                seen.add(row['movie_title'])
+                added.append(row)
+        if not added:
+            return {'added': [], 'skipped': skipped, 'total': len(data)}
+
+        n, b = features.shape[0], len(added)
+        new_rows = pd.DataFrame(added, columns=MAIN_DATA_COLUMNS)
+        new_feats = normalize(snap.count_vectorizer.transform(new_rows['comb']).astype(np.float64)).tocsr()
+        for title, nnz in zip(new_rows['movie_title'], np.diff(new_feats.indptr)):
+            if nnz == 0:
+                logger.warning(f"Ingested movie '{title}' shares no terms with the existing vocabulary")
+        all_feats = sp.vstack([features, new_feats]).tocsr()
+
+        # One (b, N + b) block gives both the new movies' neighbours and their
+        # scores as candidates for every existing movie
+        sims = (new_feats @ all_feats.T).toarray()
+        new_nbrs, new_scores = top_k_rows(sims, neighbors.shape[1] or NEIGHBOR_K, np.arange(n, n + b))
+
+        nbrs, scores = neighbors.copy(), neighbor_scores.copy()
+        cand = sims[:, :n].T
+        affected = np.flatnonzero(cand.max(axis=1) > scores[:, -1]) if scores.shape[1] else np.arange(n)
+        if len(affected):
+            merged_idx = np.hstack([nbrs[affected], np.broadcast_to(np.arange(n, n + b), (len(affected), b))])
+            merged_scores = np.hstack([scores[affected], cand[affected]])
+            top, top_scores = top_k_rows(merged_scores, nbrs.shape[1])
+            nbrs[affected] = np.take_along_axis(merged_idx, top, axis=1)
+            scores[affected] = top_scores
+
+        # New movies may have fewer candidates than K when the catalog is tiny
+        width = nbrs.shape[1]
+        if new_nbrs.shape[1] < width:
+            pad = width - new_nbrs.shape[1]
+            new_nbrs = np.hstack([new_nbrs, np.full((b, pad), -1, dtype=np.int32)])
+            new_scores = np.hstack([new_scores, np.full((b, pad), -np.inf, dtype=np.float32)])
+
+        df = pd.concat([data, new_rows], ignore_index=True)
+        if COMPACT_CATALOG:
+            df = compact_main_frame(df)
+        index = dict(title_index)
+        for offset, title in enumerate(new_rows['movie_title']):
+            index[title] = n + offset
+
+        changes = {
+            'data': df,
+            'features': all_feats,
+            'title_index': index,
+            'neighbors': np.vstack([nbrs, new_nbrs[:, :width]]),
+            'neighbor_scores': np.vstack([scores, new_scores[:, :width]])
+        }
+        if persist:
+            new_rows.to_csv(MAIN_DATA_PATH, mode='a', header=False, index=False)
+            # This worker already holds the appended rows; only other workers reload
+            changes['data_key'] = file_key(MAIN_DATA_PATH)
+        snapshot = snap.replace(**changes, **catalog_links(changes, snap))
+        logger.info(f"Ingested {b} movies ({len(affected)} existing neighbour lists updated)")
+        return {'added': list(new_rows['movie_title']), 'skipped': skipped, 'total': len(df)}
 
 def rcmd(m):
     """Get movie recommendations based on similarity"""
-    global data, similarity
     m = m.lower()
     try:
-        if data is None or similarity is None:
-            create_similarity()
+        snap = snapshot
+        if snap.neighbors is None:
+            snap = ensure_loaded('recommender')
         
-        if data is None:
+        if snap.neighbors is None:
             return 'Error: Unable to load movie database'
             
-        if m not in data['movie_title'].unique():
+        with stage('resolve'):
+            i = snap.title_index.get(m)
+        if i is None:
             return 'Sorry! The movie you requested is not in our database. Please check the spelling or try with some other movies'
         else:
-            i = data.loc[data['movie_title']==m].index[0]
-            lst = list(enumerate(similarity[i]))
-            lst = sorted(lst, key=lambda x: x[1], reverse=True)
-            lst = lst[1:11]  # excluding first item since it is the requested movie itself
-            l = []
-            for i in range(len(lst)):
-                a = lst[i][0]
-                l.append(data['movie_title'][a])
-            return l
+            with stage('score'):
+                # Neighbour lists never contain the movie itself
+                top = snap.neighbors[i][:10]
+                titles = snap.data['movie_title']
+                return [titles[a] for a in top if a >= 0]
     except Exception as e:
         logger.error(f"Error in recommendation: {e}")
         return f'Error: {str(e)}'
 
+def score_rows(snap, rows, k):
+    """Top-k neighbours for several catalog rows in one vectorized step.
+
+    Gathers the rows' feature vectors, scores them against the whole catalog as
+    one (len(rows), N) block and selects each row's top-k with argpartition.
+    """
+    block = (snap.features[rows] @ snap.features.T).toarray()
+    top, _ = top_k_rows(block, k, rows)
+    return top
+
+def score_profiles(snap, seeds, k):
+    """Top-k rows for several taste profiles in one vectorized step.
+
+    `seeds` holds one (liked rows, disliked rows) pair per profile. The profiles
+    are a sparse (len(seeds), N) weight matrix times the features, the catalog is
+    scored against all of them as one block, and seed rows are never returned.
+    """
+    rows, cols, weights = [], [], []
+    for p, (like_rows, dislike_rows) in enumerate(seeds):
+        rows.extend([p] * (len(like_rows) + len(dislike_rows)))
+        cols.extend(like_rows + dislike_rows)
+        weights.extend([1.0] * len(like_rows) + [-DISLIKE_WEIGHT] * len(dislike_rows))
+    # Duplicate (profile, row) entries are summed, so a title liked twice counts twice
+    profiles = sp.csr_matrix((weights, (rows, cols)), shape=(len(seeds), snap.features.shape[0])) @ snap.features
+    block = (profiles @ snap.features.T).toarray()
+    for p, (like_rows, dislike_rows) in enumerate(seeds):
+        block[p, like_rows + dislike_rows] = -np.inf
+    top, _ = top_k_rows(block, k)
+    return top
+
+class MicroBatcher:
+    """Coalesces concurrent scoring requests into one vectorized call.
+
+    Callers block in submit(). A single worker thread takes the first queued
+    request, keeps collecting for up to `window_ms` or until `max_batch`
+    requests are waiting, scores them all with one `score_fn(items)` call and
+    hands each caller its own result.
+    """
+
+    def __init__(self, score_fn, window_ms=2.0, max_batch=64):
+        self.score_fn = score_fn
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name='microbatch', daemon=True)
+        self._worker.start()
+
+    def submit(self, item, timeout=None):
+        """Queue one item for scoring and wait for its result"""
+        future = Future()
+        self._queue.put((item, future))
+        return future.result(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                results = self.score_fn([item for item, _ in batch])
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+def score_microbatch(items):
+    """Score (snapshot, seeds, k) profiles collected by the micro-batcher, one block per snapshot.
+
+    Each block selects the largest k asked for; top_k_rows() order makes any
+    shorter request's answer a prefix of it.
+    """
+    results = [None] * len(items)
+    groups = {}
+    for pos, (snap, _, _) in enumerate(items):
+        groups.setdefault(id(snap), (snap, []))[1].append(pos)
+    for snap, positions in groups.values():
+        top = score_profiles(snap, [items[pos][1] for pos in positions], max(items[pos][2] for pos in positions))
+        for pos, row_top in zip(positions, top):
+            results[pos] = row_top[:items[pos][2]]
+    return results
+
+microbatcher = MicroBatcher(score_microbatch, MICROBATCH_WINDOW_MS, MICROBATCH_MAX) if MICROBATCH_WINDOW_MS > 0 else None
+
+def batch_rcmd(titles, k=10):
+    """Get recommendations for many titles at once.
+
+    Returns one entry per title: a list of recommended titles, or an error string
+    like rcmd() returns.
+    """
+    try:
+        snap = snapshot
+        if snap.neighbors is None:
+            snap = ensure_loaded('recommender')
+        
+        if snap.neighbors is None:
+            return ['Error: Unable to load movie database'] * len(titles)
+
+        with stage('resolve'):
+            rows = [snap.title_index.get(str(title).lower()) for title in titles]
+            found = [i for i in rows if i is not None]
+        with stage('score'):
+            top = score_rows(snap, np.array(found, dtype=np.int64), k) if found else []
+
+        names = snap.data['movie_title']
+        results, pos = [], 0
+        for i in rows:
+            if i is None:
+                results.append('Sorry! The movie you requested is not in our database. Please check the spelling or try with some other movies')
+            else:
+                results.append([names[a] for a in top[pos]])
+                pos += 1
+        return results
+    except Exception as e:
+        logger.error(f"Error in batch recommendation: {e}")
+        return [f'Error: {str(e)}'] * len(titles)
+
+def profile_rcmd(liked, disliked=(), k=10):
+    """Recommend from a taste profile built out of several liked (and disliked) titles.
+
+    The seeds' feature rows are summed into one profile vector (disliked titles are
+    subtracted with DISLIKE_WEIGHT) and the whole catalog is scored against it in
+    one sparse product, coalesced with concurrent profiles when micro-batching is
+    on. Seeds are never recommended back.
+    Returns (titles, unknown_titles) or an error string like rcmd().
+    """
+    try:
+        snap = snapshot
+        if snap.neighbors is None:
+            snap = ensure_loaded('recommender')
+        
+        if snap.neighbors is None:
+            return 'Error: Unable to load movie database'
+
+        unknown = []
+        def resolve(titles):
+            rows = []
+            for title in titles:
+                i = snap.title_index.get(str(title).lower())
+                if i is None:
+                    unknown.append(title)
+                else:
+                    rows.append(i)
+            return rows
+
+        with stage('resolve'):
+            like_rows, dislike_rows = resolve(liked), resolve(disliked)
+        if not like_rows:
+            return 'Sorry! None of the liked movies are in our database. Please check the spelling or try with some other movies'
+
+        with stage('score'):
+            seeds = (like_rows, dislike_rows)
+            if microbatcher is not None:
+                top = microbatcher.submit((snap, seeds, k))
+            else:
+                top = score_profiles(snap, [seeds], k)[0]
+        titles = snap.data['movie_title']
+        return [titles[a] for a in top], unknown
+    except Exception as e:
+        logger.error(f"Error in profile recommendation: {e}")
+        return f'Error: {str(e)}'
+
 def get_suggestions():
     """Get list of all movie titles for autocomplete"""
-    global data
     try:
-        if data is None:
-            data_path = os.path.join(os.path.dirname(__file__), 'Artifacts', 'main_data.csv')
-            data = pd.read_csv(data_path)
-        return list(data['movie_title'].str.capitalize())
+        snap = snapshot
+        if snap.data is None:
+            snap = ensure_loaded('recommender')
+        return list(snap.data['movie_title'].str.capitalize())
     except Exception as e:
         logger.error(f"Error getting suggestions: {e}")
         return []
 
-# Initialize similarity matrix at module load time (for gunicorn workers)
+# Columns filter_movies() reads; filtering works on these alone rather than copying every column
+QUERY_COLUMNS = ['title', 'genres', 'year', 'vote_average', 'popularity', 'release_date']
+
+# Range parameters of /api/movies: (parameter, column, parser, bounds low, bounds high)
+RANGE_PARAMS = [
+    ('year', 'year', int, True, True),
+    ('year_min', 'year', int, True, False),
+    ('year_max', 'year', int, False, True),
+    ('rating', 'vote_average', lambda value: float(value.replace('+', '').strip()), True, False), # "7+" -> 7.0
+    ('rating_min', 'vote_average', float, True, False),
+    ('rating_max', 'vote_average', float, False, True),
+]
+
+def range_filters(args):
+    """{column: (low, high)} from the RANGE_PARAMS in `args`; None leaves a side open"""
+    bounds = {}
+    for param, column, parse, bounds_low, bounds_high in RANGE_PARAMS:
+        value = args.get(param, '')
+        if not value or value == 'Any':
+            continue
+        try:
+            value = parse(value)
+        except ValueError:
+            continue # Ignore invalid values
+        low, high = bounds.get(column, (None, None))
+        if bounds_low:
+            low = value if low is None else max(low, value)
+        if bounds_high:
+            high = value if high is None else min(high, value)
+        bounds[column] = (low, high)
+    return bounds
+
+def filter_movies(movies_data, args, range_indexes=None):
+    """Index labels of the browse rows matching /api/movies query parameters, in sort order.
+
+    Year and rating ranges come from `range_indexes` (presorted columns) when given:
+    each range is a contiguous slice of row positions and ranges are intersected
+    before the text filters run on what is left.
+    """
+    search = args.get('search', '').lower()
+    genre = args.get('genre', '')
+    sort = args.get('sort', 'popularity.desc')
+
+    # Filtering
+    filtered = movies_data[QUERY_COLUMNS]
+
+    ranges = range_filters(args)
+    if ranges and range_indexes:
+        positions = None
+        for column, (low, high) in ranges.items():
+            hits = range_indexes[column].positions(low, high)
+            positions = hits if positions is None else intersect_sorted(positions, hits)
+        filtered = filtered.iloc[positions]
+    else:
+        for column, (low, high) in ranges.items():
+            if low is not None:
+                filtered = filtered[filtered[column] >= low]
+            if high is not None:
+                filtered = filtered[filtered[column] <= high]
+
+    if search:
+        filtered = filtered[filtered['title'].str.lower().str.contains(search, na=False)]
+
+    if genre and genre != 'All':
+        # 'Sci-Fi' also matches 'Science Fiction' (GENRE_ALIASES)
+        pattern = '|'.join(re.escape(label) for label in genre_labels(genre))
+        filtered = filtered[filtered['genres'].str.contains(pattern, na=False, case=False)]
+
+    # Sorting; stable, so ties keep CSV order and pages match CatalogDB's rowid tie-break
+    if sort == 'popularity.desc':
+        filtered = filtered.sort_values('popularity', ascending=False, kind='stable')
+    elif sort == 'vote_average.desc':
+        filtered = filtered.sort_values('vote_average', ascending=False, kind='stable')
+    elif sort == 'release_date.desc':
+        filtered = filtered.sort_values('release_date', ascending=False, kind='stable')
+
+    return filtered.index
+
+def page_bounds(args):
+    """(page, limit) of an /api/movies query; pages below 1 read as page 1"""
+    return max(1, int(args.get('page', 1))), max(1, min(int(args.get('limit', 20)), MAX_PAGE_LIMIT))
+
+def stream_bounds(args):
+    """(offset, limit) of an NDJSON /api/movies stream: every match unless ?limit= asks for one page"""
+    if 'limit' not in args:
+        return 0, None
+    limit = max(1, int(args['limit']))
+    return (max(1, int(args.get('page', 1))) - 1) * limit, limit
+
+def query_movies(movies_data, args, range_indexes=None):
+    """Filter, sort and paginate the browse catalog from /api/movies query parameters.
+
+    Returns (page rows with NaNs blanked, total matches, page, limit).
+    """
+    page, limit = page_bounds(args)
+    index = filter_movies(movies_data, args, range_indexes)
+
+    # Pagination
+    total = len(index)
+    start = (page - 1) * limit
+    end = start + limit
+
+    return movies_data.loc[index[start:end]].fillna(''), total, page, limit
+
+def catalog_filters(args):
+    """The filters and sort of an /api/movies query as CatalogDB.query() keywords"""
+    return {'search': args.get('search', '').lower(), 'genre': args.get('genre', ''),
+            'ranges': range_filters(args), 'sort': args.get('sort', 'popularity.desc')}
+
+def browse_movies(snap, args):
+    """query_movies() against whichever store holds `snap`'s browse catalog.
+
+    Returns (page rows as mappings, total matches, page, limit).
+    """
+    if snap.catalog_db is not None:
+        page, limit = page_bounds(args)
+        filters = catalog_filters(args)
+        sort = filters.pop('sort')
+        rows = list(snap.catalog_db.query(sort=sort, offset=max(0, (page - 1) * limit), limit=limit, **filters))
+        return rows, snap.catalog_db.count(**filters), page, limit
+    results, total, page, limit = query_movies(snap.movies_data, args, snap.range_indexes)
+    return [row for _, row in results.iterrows()], total, page, limit
+
+# Columns movie_summary() reads
+SUMMARY_COLUMNS = ['id', 'title', 'year', 'vote_average', 'genres']
+
+def stream_movies(movies_data, index, chunk_rows=MOVIES_STREAM_CHUNK):
+    """Yield /api/movies entries as NDJSON, formatting `chunk_rows` rows at a time.
+
+    Posters come from the cache (or a placeholder) only, so streaming never waits
+    on TMDB and memory stays at one chunk whatever the result size.
+    """
+    for start in range(0, len(index), chunk_rows):
+        rows = movies_data.loc[index[start:start + chunk_rows], SUMMARY_COLUMNS].fillna('')
+        yield ndjson_lines(rows.to_dict('records'))
+
+def movie_stream(snap, args):
+    """(total matches, NDJSON chunk generator) answering /api/movies?format=ndjson from `snap`"""
+    start, limit = stream_bounds(args)
+    if snap.catalog_db is not None:
+        filters = catalog_filters(args)
+        sort = filters.pop('sort')
+        total = snap.catalog_db.count(**filters)
+        return total, stream_catalog_rows(snap.catalog_db.query(sort=sort, offset=start, limit=limit, **filters))
+    index = filter_movies(snap.movies_data, args, snap.range_indexes)
+    total = len(index)
+    if limit is not None:
+        index = index[start:start + limit]
+    return total, stream_movies(snap.movies_data, index)
+
+def stream_catalog_rows(rows, chunk_rows=MOVIES_STREAM_CHUNK):
+    """stream_movies() for CatalogDB rows, pulled from the cursor one chunk at a time"""
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_rows))
+        if not chunk:
+            return
+        yield ndjson_lines(chunk)
+
+def ndjson_lines(records):
+    """/api/movies entries for `records`, one JSON object per line, with cached or placeholder posters"""
+    lines = []
+    for row in records:
+        movie_id_val = int(row['id']) if row['id'] != '' else 0
+        poster = cached_poster(poster_key(row['title'], movie_id_val)) or placeholder_poster(row['title'])
+        lines.append(json.dumps(movie_summary(row, poster), sort_keys=True, separators=(',', ':')))
+    return '\n'.join(lines) + '\n'
+
+def build_home_rows(snap):
+    """Run every HOME_ROWS query once on `snap`'s browse catalog; returns {key: row} with poster-less summaries"""
+    rows = {}
+    for key, title, params in HOME_ROWS:
+        results, total, _, _ = browse_movies(snap, dict(params, limit=HOME_ROW_LENGTH))
+        if total:
+            rows[key] = {
+                'key': key,
+                'title': title,
+                'params': params,
+                'movies': [movie_summary(row, None) for row in results]
+            }
+    return rows
+
+def movies_page(movies_list, total, page, limit):
+    """The /api/movies response body"""
+    return {
+        'movies': movies_list,
+        'total': total,
+        'page': page,
+        'pages': (total // limit) + (1 if total % limit > 0 else 0)
+    }
+
+def movie_summary(row, poster):
+    """One /api/movies list entry"""
+    return {
+        'id': int(row['id']) if row['id'] != '' else 0,
+        'title': str(row['title']),
+        'poster': poster,
+        'year': int(row['year']) if row['year'] != '' else 0,
+        'rating': float(row['vote_average']) if row['vote_average'] != '' else 0.0,
+        'genre': str(row['genres']).split(' ')[0] if row['genres'] else 'Unknown'
+    }
+
+def find_movie(snap, movie_id):
+    """The browse row for `movie_id` with NaNs blanked (cold text included), or None"""
+    if snap.catalog_db is not None:
+        return snap.catalog_db.find(movie_id)
+    movies_data, movie_text = snap.movies_data, snap.movie_text
+    movie = movies_data[movies_data['id'] == movie_id]
+    if len(movie) == 0:
+        return None
+    row = movie.iloc[0].fillna('')
+    if movie_text is not None:
+        # Compact mode: cold text lives off-heap, addressed by row position
+        row = pd.concat([row, pd.Series({field: movie_text.get(field, int(movie.index[0]))
+                                         for field in movie_text.fields})])
+    return row
+
+def linked_recommendations(snap, movie_id, k):
+    """Browse rows of the top-k neighbours of `movie_id`, via the id -> recommender row links.
+
+    Neighbours with no browse entry are skipped. Returns None when the movie has
+    no recommender row.
+    """
+    if snap.catalog_db is not None:
+        return _linked_catalog_rows(snap, movie_id, k)
+    i = snap.movie_rows.get(movie_id) if snap.movie_rows is not None else None
+    if i is None or snap.neighbors is None:
+        return None
+    positions = [snap.row_movies[a] for a in snap.neighbors[i] if a >= 0 and snap.row_movies[a] >= 0]
+    rows = [snap.movies_data.iloc[p].fillna('') for p in positions]
+    return [row for row in rows if row['id'] != movie_id][:k]
+
+def _linked_catalog_rows(snap, movie_id, k):
+    """linked_recommendations() for the SQLite catalog: titles are matched per request, not held in memory"""
+    movie = snap.catalog_db.find(movie_id)
+    if movie is None or snap.neighbors is None or snap.title_index is None:
+        return None
+    i = snap.title_index.get(str(movie['title']).lower())
+    if i is None:
+        return None
+    # Only a title's first recommender row links to the browse catalog, as in link_catalogs()
+    titles = [title for a in snap.neighbors[i] if a >= 0
+              for title in [snap.data['movie_title'].iloc[a]] if snap.title_index.get(title) == a]
+    browse = snap.catalog_db.first_by_titles(titles)
+    rows = [browse[title] for title in titles if title in browse]
+    return [row for row in rows if row['id'] != movie_id][:k]
+
+def movie_detail(row, poster):
+    """The /api/movie/<id> response body"""
+    return {
+        'id': int(row['id']) if row['id'] != '' else 0,
+        'title': str(row['title']),
+        'poster': poster,
+        'year': int(row['year']) if row['year'] != '' else 0,
+        'rating': float(row['vote_average']) if row['vote_average'] != '' else 0.0,
+        'genres': str(row['genres']).split(' ') if row['genres'] else [],
+        'overview': str(row['overview']),
+        'tagline': str(row['tagline']),
+        'runtime': int(row['runtime']) if row['runtime'] != '' else 0,
+        'director': str(row['director']) if row['director'] else 'Unknown',
+        'cast': str(row['cast']) if row['cast'] else '[]'
+    }
+
+def browse_ids(snap, titles):
+    """Browse catalog id of each recommender title, or None where it has no browse entry"""
+    if snap.catalog_db is not None:
+        rows = snap.catalog_db.first_by_titles([str(title).lower() for title in titles])
+        found = [rows.get(str(title).lower()) for title in titles]
+        return [int(row['id']) if row is not None and row['id'] != '' else None for row in found]
+    if snap.row_movies is None or snap.title_index is None:
+        return [None] * len(titles)
+    ids = []
+    for title in titles:
+        a = snap.title_index.get(title)
+        position = snap.row_movies[a] if a is not None else -1
+        movie_id = snap.movies_data['id'].iloc[position] if position >= 0 else None
+        ids.append(int(movie_id) if movie_id is not None and pd.notna(movie_id) else None)
+    return ids
+
+def poster_items(payload):
+    """(title, movie_id) pairs from an /api/posters body, or raise ValueError"""
+    movies = payload.get('movies')
+    if not isinstance(movies, list) or not movies:
+        raise ValueError('movies must be a non-empty list')
+    if len(movies) > MAX_POSTER_BATCH:
+        raise ValueError(f'At most {MAX_POSTER_BATCH} movies are allowed')
+    items = []
+    for movie in movies:
+        if isinstance(movie, str):
+            movie = {'title': movie}
+        if not isinstance(movie, dict) or not movie.get('title'):
+            raise ValueError('each movie must be a title or an object with a title')
+        items.append((str(movie['title']), int(movie['id']) if movie.get('id') else None))
+    return items
+
+def posters_page(items, posters):
+    """The /api/posters response body"""
+    return {
+        'posters': [{'title': title, 'id': movie_id, 'poster': poster}
+                    for (title, movie_id), poster in zip(items, posters)],
+        'count': len(items)
+    }
+
+# Initialize all artifacts at module load time (for gunicorn workers)
 logger.info("Initializing similarity matrix at startup...")
 try:
-    create_similarity()
-    logger.info(f"Startup initialization complete. Loaded {len(data) if data is not None else 0} movies.")
+    reload_artifacts()
+    loaded = len(snapshot.data) if snapshot.data is not None else 0
+    logger.info(f"Startup initialization complete. Loaded {loaded} movies.")
 except Exception as e:
     logger.error(f"Error during startup initialization: {e}")
 
+# `kill -HUP <worker pid>` refreshes artifacts in place (signals can only be set from the main thread)
+if hasattr(signal, 'SIGHUP') and threading.current_thread() is threading.main_thread():
+    signal.signal(signal.SIGHUP, _handle_reload_signal)
+
 @app.route("/")
 @app.route("/home")
 def home():
@@ -123,8 +1280,14 @@ def home():
         "endpoints": {
             "health": "GET /health (lightweight keep-alive)",
             "recommendations": "POST /recommend",
+            "batch_recommendations": "POST /recommend/batch",
+            "profile_recommendations": "POST /recommend/profile",
             "similarity": "POST /similarity",
-            "suggestions": "GET /api/suggestions"
+            "movie_page": "GET /api/movie/<id>/full",
+            "suggestions": "GET /api/suggestions",
+            "sentiment": "POST /api/sentiment",
+            "home_rows": "GET /api/rows",
+            "metrics": "GET /metrics (Prometheus format)"
         }
     })
 
@@ -133,216 +1296,545 @@ def health_check():
     """Lightweight keep-alive endpoint for uptime monitoring"""
     return jsonify({"status": "active", "platform": "Hugging Face Spaces"}), 200
 
-# Browsing Data
-movies_data = None
-
-def load_browsing_data():
-    """Load and preprocess movies.csv for browsing"""
-    global movies_data
-    try:
-        path = os.path.join(os.path.dirname(__file__), 'Artifacts', 'movies.csv')
-        df = pd.read_csv(path)
-        
-        # Preprocess
-        df['release_date'] = pd.to_datetime(df['release_date'], errors='coerce')
-        df['year'] = df['release_date'].dt.year.fillna(0).astype(int)
-        df['vote_average'] = df['vote_average'].fillna(0)
-        df['popularity'] = df['popularity'].fillna(0)
-        df['genres'] = df['genres'].fillna('')
-        
-        movies_data = df
-        logger.info(f"Browsing data loaded: {len(df)} movies")
-    except Exception as e:
-        logger.error(f"Error loading browsing data: {e}")
-
-# Initialize browsing data on startup
-try:
-    load_browsing_data()
-except Exception as e:
-    logger.error(f"Startup browsing data error: {e}")
-
 @app.route("/api/movies", methods=["GET"])
+@requires('browsing')
 def get_movies():
-    """Get movies with filtering, sorting, and pagination"""
-    global movies_data
-    if movies_data is None:
-        load_browsing_data()
-        if movies_data is None:
-            return jsonify({'error': 'Data not available'}), 500
+    """Get movies with filtering, sorting, and pagination.
+
+    ?format=ndjson streams every match (or one page when ?limit= is given) as one
+    JSON object per line with cached posters only; the total is in X-Total-Count.
+    """
+    snap = snapshot
             
     try:
-        # Parameters
-        search = request.args.get('search', '').lower()
-        genre = request.args.get('genre', '')
-        year = request.args.get('year', '')
-        rating = request.args.get('rating', '') # format: "7+" -> 7.0
-        sort = request.args.get('sort', 'popularity.desc')
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 20))
-        
-        # Filtering
-        filtered = movies_data.copy()
-        
-        if search:
-            filtered = filtered[filtered['title'].str.lower().str.contains(search, na=False)]
-            
-        if genre and genre != 'All':
-            filtered = filtered[filtered['genres'].str.contains(genre, na=False, case=False)]
-            
-        if year and year != 'Any':
-            try:
-                target_year = int(year)
-                filtered = filtered[filtered['year'] == target_year]
-            except:
-                pass # Ignore invalid year
-                
-        if rating and rating != 'Any':
-            try:
-                min_rating = float(rating.replace('+', '').strip())
-                filtered = filtered[filtered['vote_average'] >= min_rating]
-            except:
-                pass
-                
-        # Sorting
-        if sort == 'popularity.desc':
-            filtered = filtered.sort_values('popularity', ascending=False)
-        elif sort == 'vote_average.desc':
-            filtered = filtered.sort_values('vote_average', ascending=False)
-        elif sort == 'release_date.desc':
-            filtered = filtered.sort_values('release_date', ascending=False)
-            
-        # Pagination
-        total = len(filtered)
-        start = (page - 1) * limit
-        end = start + limit
-        
-        results = filtered.iloc[start:end].fillna('')
+        if request.args.get('format') == 'ndjson':
+            with stage('query'):
+                total, chunks = movie_stream(snap, request.args)
+            # The generator only touches data captured here, so it needs no request context
+            return Response(chunks, mimetype='application/x-ndjson', headers={'X-Total-Count': str(total)})
+
+        with stage('query'):
+            results, total, page, limit = browse_movies(snap, request.args)
         
-        # Format response
-        movies_list = []
-        for _, row in results.iterrows():
-            movie_id_val = int(row['id']) if row['id'] != '' else 0
-            poster = fetch_poster(row['title'], movie_id_val)
-            movies_list.append({
-                'id': int(row['id']) if row['id'] != '' else 0,
-                'title': str(row['title']),
-                'poster': poster,
-                'year': int(row['year']) if row['year'] != '' else 0,
-                'rating': float(row['vote_average']) if row['vote_average'] != '' else 0.0,
-                'genre': str(row['genres']).split(' ')[0] if row['genres'] else 'Unknown'
-            })
+        with stage('posters'):
+            # Format response
+            movies_list = []
+            for row in results:
+                movie_id_val = int(row['id']) if row['id'] != '' else 0
+                poster = fetch_poster(row['title'], movie_id_val)
+                movies_list.append(movie_summary(row, poster))
             
-        return jsonify({
-            'movies': movies_list,
-            'total': total,
-            'page': page,
-            'pages': (total // limit) + (1 if total % limit > 0 else 0)
-        })
+        return respond(movies_page(movies_list, total, page, limit))
         
     except Exception as e:
         logger.error(f"Error in get_movies: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route("/api/rows", methods=["GET"])
+@requires('browsing')
+def get_rows():
+    """Home page rows in one call, served from lists built when the catalog loaded.
+
+    Optional ?rows=popular,action selects and orders rows; ?limit= trims each row.
+    Returns JSON: {"rows": [{"key": ..., "title": ..., "params": {...}, "movies": [...]}]}
+    """
+    snap = snapshot
+    try:
+        keys = [key for key in request.args.get('rows', '').split(',') if key] or list(snap.home_rows)
+        limit = max(1, min(int(request.args.get('limit', HOME_ROW_LENGTH)), HOME_ROW_LENGTH))
+        selected = [snap.home_rows[key] for key in keys if key in snap.home_rows]
+
+        with stage('posters'):
+            # A movie that appears in several rows is resolved once
+            keys = list(dict.fromkeys((movie['id'], movie['title']) for row in selected for movie in row['movies'][:limit]))
+            posters = dict(zip(keys, fetch_posters([(title, movie_id) for movie_id, title in keys])))
+
+        return respond({'rows': [
+            dict(row, movies=[dict(movie, poster=posters[(movie['id'], movie['title'])])
+                              for movie in row['movies'][:limit]])
+            for row in selected
+        ]})
+
+    except Exception as e:
+        logger.error(f"Error in get_rows: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route("/api/movie/<int:movie_id>", methods=["GET"])
+@requires('browsing')
 def get_movie_details(movie_id):
     """Get single movie details by ID"""
-    global movies_data
-    if movies_data is None:
-        load_browsing_data()
+    snap = snapshot
         
     try:
         # Find movie by ID
-        movie = movies_data[movies_data['id'] == movie_id]
+        with stage('lookup'):
+            row = find_movie(snap, movie_id)
         
-        if len(movie) == 0:
+        if row is None:
             return jsonify({'error': 'Movie not found'}), 404
             
-        row = movie.iloc[0].fillna('')
         movie_id_val = int(row['id']) if row['id'] != '' else 0
         poster = fetch_poster(row['title'], movie_id_val)
         
-        return jsonify({
-            'id': int(row['id']) if row['id'] != '' else 0,
-            'title': str(row['title']),
-            'poster': poster,
-            'year': int(row['year']) if row['year'] != '' else 0,
-            'rating': float(row['vote_average']) if row['vote_average'] != '' else 0.0,
-            'genres': str(row['genres']).split(' ') if row['genres'] else [],
-            'overview': str(row['overview']),
-            'tagline': str(row['tagline']),
-            'runtime': int(row['runtime']) if row['runtime'] != '' else 0,
-            'director': str(row['director']) if row['director'] else 'Unknown',
-            'cast': str(row['cast']) if row['cast'] else '[]'
-        })
+        return respond(movie_detail(row, poster))
         
     except Exception as e:
         logger.error(f"Error fetching movie {movie_id}: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route("/api/movie/<int:movie_id>/full", methods=["GET"])
+@requires('browsing')
+def get_movie_full(movie_id):
+    """Movie details plus top-k recommendations, each with its poster, in one round trip.
+
+    Returns JSON: the /api/movie/<id> fields plus "recommendations": [{id, title, poster,
+    year, rating, genre}] (empty when the movie is not in the recommender catalog, or
+    while the recommender is still loading, so the details never wait on it).
+    """
+    snap = snapshot
+
+    try:
+        if snap.neighbors is None:
+            load_in_background('recommender')
+        limit = max(1, min(int(request.args.get('limit', MOVIE_PAGE_RECOMMENDATIONS)), MAX_PROFILE_RESULTS))
+        with stage('lookup'):
+            row = find_movie(snap, movie_id)
+        if row is None:
+            return jsonify({'error': 'Movie not found'}), 404
+        movie_id_val = int(row['id']) if row['id'] != '' else 0
+
+        # The details poster resolves while the recommendations are scored
+        with stage('posters'):
+            poster = _poster_pool.submit(fetch_poster, row['title'], movie_id_val) if not g.get('degraded') else None
+            with stage('score'):
+                recs = linked_recommendations(snap, movie_id_val, limit) or []
+            rec_posters = fetch_posters([(rec['title'], int(rec['id'])) for rec in recs])
+            poster = poster.result() if poster is not None else fetch_poster(row['title'], movie_id_val)
+
+        return respond(dict(movie_detail(row, poster),
+                            recommendations=[movie_summary(rec, p) for rec, p in zip(recs, rec_posters)]))
+
+    except Exception as e:
+        logger.error(f"Error fetching full movie {movie_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route("/api/sentiment", methods=["POST"])
+def sentiment_route():
+    """Classify review snippets with the compiled sentiment model.
+
+    Accepts JSON: {"reviews": ["Loved every minute", ...]}
+    Returns JSON: {"sentiments": ["Good", ...], "scores": [...], "count": n}
+    """
+    model = snapshot.sentiment
+    if model is None:
+        return jsonify({'error': 'Sentiment model not available'}), 500
+    try:
+        payload = request.get_json(silent=True) or {}
+        reviews = payload.get('reviews')
+        if not isinstance(reviews, list) or not reviews:
+            return jsonify({'error': 'reviews must be a non-empty list'}), 400
+        if len(reviews) > MAX_SENTIMENT_REVIEWS:
+            return jsonify({'error': f'At most {MAX_SENTIMENT_REVIEWS} reviews are allowed'}), 400
+
+        with stage('score'):
+            scores = model.decision_function([str(review) for review in reviews])
+        return respond({
+            'sentiments': [SENTIMENT_NAMES.get(label, str(label)) for label in model.labels(scores)],
+            'scores': [round(float(score), 4) for score in scores],
+            'count': len(reviews)
+        })
+
+    except Exception as e:
+        logger.error(f"Error in sentiment route: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route("/api/suggestions", methods=["GET"])
+@requires('recommender')
 def get_suggestions_api():
     """API endpoint to get movie suggestions for autocomplete"""
     suggestions = get_suggestions()
-    return jsonify({
+    return respond({
         'suggestions': suggestions
     })
 
+def _is_admin_request():
+    """Check the X-Admin-Token header against ADMIN_TOKEN"""
+    if not ADMIN_TOKEN:
+        return False
+    token = request.headers.get('X-Admin-Token', '')
+    return hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
 
-def fetch_poster(movie_title, movie_id=None):
-    """Fetch movie poster URL from TMDB API using movie_id (preferred) or title search.
-    
-    If movie_id is provided, we can fetch the poster directly, which is faster and more reliable.
-    Falls back to title search if movie_id fetch fails.
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Prometheus scrape endpoint: request and stage latency histograms, TMDB and cache counters"""
+    return Response(render_all(), mimetype='text/plain; version=0.0.4')
+
+def _process_rss_bytes():
+    """Resident set size of this worker from /proc (None where unavailable)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+@app.route("/admin/memory", methods=["GET"])
+def admin_memory():
+    """Approximate bytes held per artifact in this worker, plus its RSS.
+
+    `heap_bytes` is private to the worker; `mapped_bytes` is file-backed and
+    shared between workers mapping the same files.
+    """
+    if not _is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    try:
+        snap = snapshot
+        structures = {}
+        for field in ArtifactSnapshot.FIELDS:
+            value = getattr(snap, field)
+            if value is None:
+                continue
+            entry = {'heap_bytes': object_bytes(value)}
+            if isinstance(value, (ColdTextStore, CatalogDB)):
+                entry['mapped_bytes'] = value.mapped_bytes()
+            elif isinstance(value, np.ndarray) and entry['heap_bytes'] == 0:
+                entry['mapped_bytes'] = int(value.nbytes)
+            elif field in ('clf', 'vectorizer'):
+                # Fitted sklearn objects have no cheap deep size; the pickle size is a fair proxy
+                entry['heap_bytes'] = len(pickle.dumps(value))
+            if isinstance(value, pd.DataFrame):
+                entry['rows'] = len(value)
+                entry['columns'] = {c: str(t) for c, t in value.dtypes.items()}
+            structures[field] = entry
+        with _poster_cache_lock:
+            structures['poster_cache'] = {'heap_bytes': object_bytes(dict(_poster_cache)),
+                                          'entries': len(_poster_cache)}
+        return jsonify({
+            'pid': os.getpid(),
+            'compact_catalog': COMPACT_CATALOG,
+            'snapshot_version': snap.version,
+            'rss_bytes': _process_rss_bytes(),
+            'heap_bytes_total': sum(entry['heap_bytes'] for entry in structures.values()),
+            'structures': structures
+        })
+    except Exception as e:
+        logger.error(f"Error in admin memory report: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route("/admin/reload", methods=["POST"])
+def admin_reload():
+    """Rebuild all artifacts in the background and swap them in atomically.
+
+    Pass ?wait=1 to block until the new snapshot is published.
+    """
+    if not _is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    try:
+        if request.args.get('wait') == '1':
+            snap = reload_artifacts()
+            return jsonify({'status': 'reloaded', 'version': snap.version})
+        started = reload_artifacts_async()
+        return jsonify({
+            'status': 'reloading' if started else 'reload already in progress',
+            'version': snapshot.version
+        }), 202
+    except Exception as e:
+        logger.error(f"Error in admin reload: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def _profile_requested():
+    """A request opts in with X-Profile: 1 (or ?_profile=1) plus a valid admin token"""
+    flagged = request.headers.get('X-Profile') == '1' or request.args.get('_profile') == '1'
+    return flagged and _is_admin_request()
+
+def _start_profiler():
+    if _profile_requested():
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+def _finish_profiler(response):
+    """Stop the request's profiler, store the dump plus a top-N summary, and return its id"""
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    profiler.disable()
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.endpoint or 'unknown'}-{uuid.uuid4().hex[:8]}"
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f"{profile_id}.prof"))
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(PROFILE_TOP_N)
+        with open(os.path.join(PROFILE_DIR, f"{profile_id}.txt"), 'w') as f:
+            f.write(summary.getvalue())
+        response.headers['X-Profile-Id'] = profile_id
+        logger.info(f"Stored request profile {profile_id}")
+    except Exception as e:
+        logger.error(f"Error storing request profile: {e}")
+    return response
+
+# Hooks are only installed when profiling is enabled, so it costs nothing otherwise
+if PROFILING_ENABLED:
+    app.before_request(_start_profiler)
+    app.after_request(_finish_profiler)
+
+@app.route("/admin/profiles", methods=["GET"])
+@app.route("/admin/profiles/<profile_id>", methods=["GET"])
+def admin_profiles(profile_id=None):
+    """List stored request profiles, or return one profile's top-N cumulative summary"""
+    if not _is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    try:
+        if profile_id is None:
+            names = sorted(os.listdir(PROFILE_DIR)) if os.path.isdir(PROFILE_DIR) else []
+            return jsonify({'profiles': [name[:-4] for name in names if name.endswith('.txt')]})
+        if not re.fullmatch(r'[\w.-]+', profile_id):
+            return jsonify({'error': 'Invalid profile id'}), 400
+        path = os.path.join(PROFILE_DIR, f"{profile_id}.txt")
+        if not os.path.exists(path):
+            return jsonify({'error': 'Profile not found'}), 404
+        with open(path, 'r') as f:
+            return Response(f.read(), mimetype='text/plain')
+    except Exception as e:
+        logger.error(f"Error reading profiles: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route("/admin/ingest", methods=["POST"])
+def admin_ingest():
+    """Append new movies to the recommender catalog without a restart.
+
+    Accepts JSON: {"movies": [{"movie_title": ..., "director_name": ..., "actor_1_name": ...,
+    "actor_2_name": ..., "actor_3_name": ..., "genres": ...}]}
+    """
+    if not _is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    try:
+        payload = request.get_json(silent=True)
+        movies = payload.get('movies') if isinstance(payload, dict) else payload
+        if not isinstance(movies, list) or not movies:
+            return jsonify({'error': 'movies must be a non-empty list'}), 400
+        if not all(isinstance(movie, dict) for movie in movies):
+            return jsonify({'error': 'each movie must be an object'}), 400
+        return jsonify(ingest_movies(movies))
+    except WarmingUp:
+        raise
+    except Exception as e:
+        logger.error(f"Error in admin ingest: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+def placeholder_poster(movie_title):
+    """Styled placeholder image with the movie's initials"""
+    initials = ''.join([word[0].upper() for word in movie_title.split()[:2]]) if movie_title else 'MV'
+    return f"https://api.dicebear.com/7.x/initials/svg?seed={initials}&backgroundColor=1a1a2e&textColor=e94560"
+
+def _cache_poster(key, url):
+    with _poster_cache_lock:
+        _poster_cache[key] = url
+        _poster_cache.move_to_end(key)
+        while len(_poster_cache) > POSTER_CACHE_SIZE:
+            _poster_cache.popitem(last=False)
+
+def poster_key(movie_title, movie_id=None):
+    """Poster cache key: the browse id when it is known, otherwise the lowercased title.
+
+    Browse rows and recommender titles (lowercase main_data titles) then share entries.
     """
+    return (movie_id, '') if movie_id else (0, str(movie_title).lower())
+
+def cached_poster(key):
+    """Poster URL cached under a poster_key(), counting the hit or miss"""
+    with _poster_cache_lock:
+        cached = _poster_cache.get(key)
+        if cached is not None:
+            _poster_cache.move_to_end(key)
+    POSTER_CACHE.inc('hit' if cached is not None else 'miss')
+    return cached
+
+def known_poster(movie_title, movie_id=None):
+    """A poster already resolved for this movie (by id, else by title), without calling TMDB; else None"""
     if not TMDB_API_KEY:
-        # Return a high-quality placeholder with movie initials
-        initials = ''.join([word[0].upper() for word in movie_title.split()[:2]]) if movie_title else 'MV'
-        return f"https://api.dicebear.com/7.x/initials/svg?seed={initials}&backgroundColor=1a1a2e&textColor=e94560"
-    
-    # Determine auth method: Bearer Token (JWT) vs API Key (v3)
+        return placeholder_poster(movie_title)
+    return cached_poster(poster_key(movie_title, movie_id))
+
+def tmdb_auth():
+    """Headers and query parameters authenticating a TMDB call"""
     headers = {
         "Content-Type": "application/json"
     }
     params = {}
     
+    # Determine auth method: Bearer Token (JWT) vs API Key (v3)
     if len(TMDB_API_KEY) > 100: # It's likely a JWT Bearer Token
         headers["Authorization"] = f"Bearer {TMDB_API_KEY}"
     else: # It's likely a v3 API Key
         params["api_key"] = TMDB_API_KEY
+    return headers, params
+
+def _tmdb_get(method, url, headers, params):
+    """GET a TMDB endpoint, recording latency and outcome under `method`"""
+    with POSTER_FETCH_LATENCY.time(method):
+        try:
+            response = requests.get(url, headers=headers, params=params, timeout=5)
+        except Exception:
+            TMDB_REQUESTS.inc(method, 'error')
+            raise
+    TMDB_REQUESTS.inc(method, str(response.status_code))
+    return response
+
+def poster_url(poster_path, size=None):
+    """Public URL of a TMDB poster path such as '/abc.jpg', at `size` (default POSTER_SIZE)"""
+    return f"{POSTER_URL_BASE}/{size or POSTER_SIZE}{poster_path}"
+
+def fetch_posters(items):
+    """fetch_poster() for several (title, movie_id) pairs, misses resolved concurrently.
+
+    Degraded requests stay on the calling thread (the pool has no request context,
+    and cache/placeholder lookups are cheap anyway).
+    """
+    if not TMDB_API_KEY or (has_request_context() and g.get('degraded')) or len(items) < 2:
+        return [fetch_poster(title, movie_id) for title, movie_id in items]
+    return list(_poster_pool.map(lambda item: fetch_poster(*item), items))
+
+def fetch_poster(movie_title, movie_id=None):
+    """Fetch movie poster URL from TMDB API using movie_id (preferred) or title search.
+    
+    If movie_id is provided, we can fetch the poster directly, which is faster and more reliable.
+    Falls back to title search if movie_id fetch fails. Answers from TMDB (including
+    "no poster") are kept in a bounded LRU cache; failed calls are not cached.
+    """
+    if not TMDB_API_KEY:
+        # Return a high-quality placeholder with movie initials
+        return placeholder_poster(movie_title)
+
+    key = poster_key(movie_title, movie_id)
+    cached = cached_poster(key)
+    if cached is not None:
+        return cached
+    if has_request_context() and g.get('degraded'):
+        # Over the endpoint's admission limit: never wait on TMDB, and don't cache the stand-in
+        return placeholder_poster(movie_title)
+    
+    headers, params = tmdb_auth()
 
     try:
         # Method 1: Direct fetch using TMDB movie_id (most reliable)
         if movie_id and movie_id != 0:
-            url = f"https://api.themoviedb.org/3/movie/{movie_id}"
-            response = requests.get(url, headers=headers, params=params, timeout=5)
+            url = f"{TMDB_API_BASE}/movie/{movie_id}"
+            response = _tmdb_get('id', url, headers, params)
             if response.status_code == 200:
                 data = response.json()
                 poster_path = data.get('poster_path')
                 if poster_path:
-                    return f"https://image.tmdb.org/t/p/w500{poster_path}"
+                    poster = poster_url(poster_path)
+                    _cache_poster(key, poster)
+                    return poster
         
         # Method 2: Fallback to title search
-        url = "https://api.themoviedb.org/3/search/movie"
+        url = f"{TMDB_API_BASE}/search/movie"
         search_params = params.copy()
         search_params["query"] = movie_title
         
-        response = requests.get(url, headers=headers, params=search_params, timeout=5)
+        response = _tmdb_get('search', url, headers, search_params)
         if response.status_code == 200:
             data = response.json()
             if data.get('results') and len(data['results']) > 0:
                 poster_path = data['results'][0].get('poster_path')
                 if poster_path:
-                    return f"https://image.tmdb.org/t/p/w500{poster_path}"
+                    poster = poster_url(poster_path)
+                    _cache_poster(key, poster)
+                    return poster
         
-        # Method 3: Return styled placeholder
-        initials = ''.join([word[0].upper() for word in movie_title.split()[:2]]) if movie_title else 'MV'
-        return f"https://api.dicebear.com/7.x/initials/svg?seed={initials}&backgroundColor=1a1a2e&textColor=e94560"
+        # Method 3: Return styled placeholder (cached only when TMDB answered)
+        poster = placeholder_poster(movie_title)
+        if response.status_code == 200:
+            _cache_poster(key, poster)
+        return poster
     except Exception as e:
         logger.error(f"Error fetching poster for {movie_title}: {e}")
-        initials = ''.join([word[0].upper() for word in movie_title.split()[:2]]) if movie_title else 'MV'
-        return f"https://api.dicebear.com/7.x/initials/svg?seed={initials}&backgroundColor=1a1a2e&textColor=e94560"
+        return placeholder_poster(movie_title)
+
+_image_cache = None
+_image_cache_lock = threading.Lock()
+# Image key -> Event set when the thread fetching it finishes, so a cold poster is fetched once
+_image_fetches = {}
+
+def image_cache():
+    """The poster proxy's disk cache, created on first use"""
+    global _image_cache
+    with _image_cache_lock:
+        if _image_cache is None:
+            _image_cache = ImageCache(POSTER_CACHE_DIR, POSTER_CACHE_MAX_BYTES)
+        return _image_cache
+
+def proxied_image(size, poster_path):
+    """(digest, content type) of a TMDB image, fetched into the disk cache on a miss.
+
+    Returns (None, status) when TMDB has no such image or fails.
+    """
+    cache = image_cache()
+    key = f"{size}/{poster_path}"
+    while True:
+        hit = cache.get(key)
+        if hit is not None:
+            IMAGE_CACHE.inc('hit')
+            return hit
+        with _image_cache_lock:
+            pending = _image_fetches.get(key)
+            if pending is None:
+                pending = _image_fetches[key] = threading.Event()
+                break
+        # Another thread in this worker is fetching this image: wait for it and serve what it
+        # stored; if it failed, answer 502 rather than sending the same request upstream again
+        if not pending.wait(10):
+            return None, 504
+        if cache.get(key) is None:
+            return None, 502
+
+    IMAGE_CACHE.inc('miss')
+    try:
+        response = _tmdb_get('image', f"{TMDB_IMAGE_BASE}/{size}/{poster_path}", {}, {})
+        content_type = response.headers.get('Content-Type', '')
+        if response.status_code != 200 or not content_type.startswith('image/'):
+            return None, 404 if response.status_code == 404 else 502
+        return cache.put(key, response.content, content_type), content_type
+    finally:
+        with _image_cache_lock:
+            _image_fetches.pop(key, None)
+        pending.set()
+
+@app.route("/img/<size>/<poster_path>", methods=["GET"])
+def poster_image(size, poster_path):
+    """TMDB poster image served from the local disk cache.
+
+    Images are immutable per path, so responses carry a one-year immutable
+    Cache-Control and the content digest as ETag (If-None-Match gets a 304).
+    """
+    if size not in POSTER_SIZES or not re.fullmatch(r'[\w-]+\.(jpg|jpeg|png|webp)', poster_path):
+        return jsonify({'error': 'Image not found'}), 404
+    try:
+        for _ in range(2):
+            digest, content_type = proxied_image(size, poster_path)
+            if digest is None:
+                status = content_type
+                return jsonify({'error': 'Image not found' if status == 404 else 'Upstream image unavailable'}), status
+            try:
+                response = send_file(image_cache().object_path(digest), mimetype=content_type, etag=digest,
+                                     conditional=True, max_age=365 * 24 * 3600)
+            except FileNotFoundError:
+                # Evicted by another worker since the lookup; its ref now reads as a miss, so fetch again
+                continue
+            response.cache_control.immutable = True
+            return response
+        # Still evicted after a refetch (the cache is thrashing): let the client load it from TMDB
+        return redirect(f"{TMDB_IMAGE_BASE}/{size}/{poster_path}")
+    except Exception as e:
+        logger.error(f"Error proxying poster {size}/{poster_path}: {e}")
+        return jsonify({'error': str(e)}), 500
 
 @app.route("/similarity", methods=["POST"])
+@requires('recommender')
 def similarity_route():
     """Get similar movies based on input"""
     try:
@@ -361,7 +1853,7 @@ def similarity_route():
             return jsonify({'error': rc}), 404
         else:
             # Success - return list of similar movies
-            return jsonify({
+            return respond({
                 'movies': rc,
                 'query': movie
             })
@@ -370,18 +1862,22 @@ def similarity_route():
         return jsonify({'error': str(e)}), 500
 
 @app.route("/recommend", methods=["POST"])
+@requires('recommender')
 def recommend():
     """Get movie recommendations with posters.
     
-    Accepts JSON: {"movie_title": "Inception"}
-    Returns JSON: {"movies": [...], "posters": [...], "query": "..."}
+    Accepts JSON: {"movie_title": "Inception", "posters": "inline" | "deferred"}
+    Returns JSON: {"movies": [...], "posters": [...], "query": "..."}; deferred mode answers
+    without waiting on TMDB and adds "ids", with null posters for /api/posters to resolve.
     """
     try:
         # Support both JSON and form data input
         if request.is_json:
             movie_title = request.json.get('movie_title', '')
+            poster_mode = request.json.get('posters') or request.args.get('posters', RECOMMEND_POSTERS)
         else:
             movie_title = request.form.get('movie_title', '') or request.form.get('name', '')
+            poster_mode = request.form.get('posters') or request.args.get('posters', RECOMMEND_POSTERS)
         
         if not movie_title:
             return jsonify({'error': 'movie_title is required'}), 400
@@ -395,15 +1891,23 @@ def recommend():
         
         # Build response with movie titles
         movies = rc
+
+        ids = browse_ids(snapshot, movies)
+        if poster_mode == 'deferred':
+            return respond({
+                'movies': movies,
+                'ids': ids,
+                'posters': [known_poster(movie, movie_id) for movie, movie_id in zip(movies, ids)],
+                'query': movie_title,
+                'count': len(movies)
+            })
         
         # Fetch posters server-side to avoid exposing API key to frontend
-        posters = []
-        for movie in movies:
-            poster = fetch_poster(movie)
-            posters.append(poster)
+        with stage('posters'):
+            posters = fetch_posters(list(zip(movies, ids)))
         
         # Return the recommendations with posters
-        return jsonify({
+        return respond({
             'movies': movies,
             'posters': posters,
             'query': movie_title,
@@ -414,10 +1918,109 @@ def recommend():
         logger.error(f"Error in recommend route: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route("/api/posters", methods=["POST"])
+def get_posters():
+    """Poster URLs for many movies in one call, cache misses resolved concurrently.
+
+    Lets clients render /recommend (posters=deferred) or list text first and fill
+    images in afterwards. The id is optional and makes the TMDB lookup exact.
+    Accepts JSON: {"movies": [{"title": "Avatar", "id": 19995}, "Inception", ...]}
+    Returns JSON: {"posters": [{"title": ..., "id": ..., "poster": url}], "count": n}
+    """
+    try:
+        items = poster_items(request.get_json(silent=True) or {})
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        with stage('posters'):
+            # Duplicates share one lookup
+            unique = list(dict.fromkeys(items))
+            resolved = dict(zip(unique, fetch_posters(unique)))
+        return respond(posters_page(items, [resolved[item] for item in items]))
+    except Exception as e:
+        logger.error(f"Error in posters route: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route("/recommend/batch", methods=["POST"])
+@requires('recommender')
+def recommend_batch():
+    """Get recommendations with posters for several titles in one call.
+
+    Accepts JSON: {"titles": ["Inception", "Avatar"], "limit": 10}
+    Returns JSON: {"results": [{"query": ..., "movies": [...], "posters": [...], "count": n}
+                               or {"query": ..., "error": ...}], "count": n}
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        titles = payload.get('titles') or []
+        if not isinstance(titles, list) or not titles:
+            return jsonify({'error': 'titles must be a non-empty list'}), 400
+        if len(titles) > MAX_BATCH_TITLES:
+            return jsonify({'error': f'At most {MAX_BATCH_TITLES} titles are allowed'}), 400
+        limit = max(1, min(int(payload.get('limit', 10)), MAX_PROFILE_RESULTS))
+
+        recs = batch_rcmd([str(title) for title in titles], limit)
+
+        # Resolve each distinct title's poster once across the whole batch
+        movies = list(dict.fromkeys(movie for rc in recs if not isinstance(rc, str) for movie in rc))
+        posters = dict(zip(movies, fetch_posters(list(zip(movies, browse_ids(snapshot, movies))))))
+
+        results = []
+        for title, rc in zip(titles, recs):
+            if isinstance(rc, str):
+                results.append({'query': title, 'error': rc})
+            else:
+                results.append({
+                    'query': title,
+                    'movies': rc,
+                    'posters': [posters[movie] for movie in rc],
+                    'count': len(rc)
+                })
+        return respond({'results': results, 'count': len(results)})
+
+    except Exception as e:
+        logger.error(f"Error in recommend batch route: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route("/recommend/profile", methods=["POST"])
+@requires('recommender')
+def recommend_profile():
+    """Get recommendations for a whole taste profile in one call.
+
+    Accepts JSON: {"liked": ["Inception", ...], "disliked": [...], "limit": 10}
+    Returns JSON: {"movies": [...], "posters": [...], "seeds": [...], "unknown": [...], "count": n}
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        liked = payload.get('liked') or []
+        disliked = payload.get('disliked') or []
+        if not isinstance(liked, list) or not isinstance(disliked, list):
+            return jsonify({'error': 'liked and disliked must be lists of titles'}), 400
+        if not liked:
+            return jsonify({'error': 'liked is required'}), 400
+        if len(liked) + len(disliked) > MAX_PROFILE_SEEDS:
+            return jsonify({'error': f'At most {MAX_PROFILE_SEEDS} seed titles are allowed'}), 400
+        limit = max(1, min(int(payload.get('limit', 10)), MAX_PROFILE_RESULTS))
+
+        rc = profile_rcmd(liked, disliked, limit)
+        if isinstance(rc, str):
+            return jsonify({'error': rc}), 404
+        movies, unknown = rc
+
+        posters = fetch_posters(list(zip(movies, browse_ids(snapshot, movies))))
+        return respond({
+            'movies': movies,
+            'posters': posters,
+            'seeds': [title for title in liked if title not in unknown],
+            'unknown': unknown,
+            'count': len(movies)
+        })
+
+    except Exception as e:
+        logger.error(f"Error in recommend profile route: {e}")
+        return jsonify({'error': str(e)}), 500
+
 if __name__ == '__main__':
-    # Initialize similarity matrix on startup
-    create_similarity()
-    
     # Get port from environment variable for deployment
     port = int(os.environ.get('PORT', 5000))
     app.run(debug=False, host="0.0.0.0", port=port)
\ No newline at end of file
@@ -0,0 +1,394 @@
+"""
+Asynchronous (ASGI) entry point for the I/O-bound endpoints.
+
+Serves /recommend, /similarity, /api/movies, /api/movie/<id>, /api/movie/<id>/full,
+/api/posters, /api/suggestions, /health and /metrics with the same JSON contracts as the Flask app, sharing its
+artifacts, poster cache and metrics. Posters are resolved with a non-blocking
+httpx client, so a request waiting on TMDB holds a coroutine rather than a
+thread; scoring and pandas queries run on a thread pool so they never block
+the event loop.
+
+Usage:
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import functools
+import json
+import logging
+import math
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import httpx
+
+import app as core
+from metrics import ERRORS, POSTER_FETCH_LATENCY, REQUEST_LATENCY, TMDB_REQUESTS, render_all
+
+logger = logging.getLogger(__name__)
+
+# Threads running rcmd() and catalog queries
+CPU_WORKERS = int(os.environ.get('ASYNC_CPU_WORKERS', os.cpu_count() or 4))
+
+# Upper bound on TMDB calls in flight from this process
+TMDB_MAX_CONCURRENCY = int(os.environ.get('TMDB_MAX_CONCURRENCY', 64))
+
+executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix='asgi-cpu')
+
+# Created on first use so they bind to the server's event loop
+_client = None
+_upstream = None
+# Poster key -> task resolving it, so concurrent requests share one TMDB round trip
+_inflight = {}
+
+
+class Request:
+    """The parts of an ASGI HTTP request the handlers need"""
+
+    def __init__(self, scope, body):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope['headers']}
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True)
+        self.args = {key: values[0] for key, values in query.items()}
+        self.body = body
+
+    @property
+    def is_json(self):
+        mimetype = self.headers.get('content-type', '').split(';')[0].strip().lower()
+        return mimetype == 'application/json' or (mimetype.startswith('application/') and mimetype.endswith('+json'))
+
+    def json(self):
+        return json.loads(self.body or b'null')
+
+    def form(self):
+        query = parse_qs(self.body.decode('utf-8', 'replace'), keep_blank_values=True)
+        return {key: values[0] for key, values in query.items()}
+
+
+class Stream:
+    """A response body sent chunk by chunk; each chunk is produced on the CPU pool"""
+
+    def __init__(self, chunks, content_type, headers=()):
+        self.chunks = chunks
+        self.content_type = content_type
+        self.headers = list(headers)
+
+
+def run_cpu(fn, *args):
+    """Run blocking work on the CPU pool"""
+    return asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+def http_client():
+    global _client, _upstream
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=5, limits=httpx.Limits(max_connections=TMDB_MAX_CONCURRENCY))
+        _upstream = asyncio.Semaphore(TMDB_MAX_CONCURRENCY)
+    return _client
+
+
+async def _tmdb_get(method, url, headers, params):
+    """GET a TMDB endpoint, recording latency and outcome under `method`"""
+    client = http_client()
+    async with _upstream:
+        with POSTER_FETCH_LATENCY.time(method):
+            try:
+                response = await client.get(url, headers=headers, params=params)
+            except Exception:
+                TMDB_REQUESTS.inc(method, 'error')
+                raise
+    TMDB_REQUESTS.inc(method, str(response.status_code))
+    return response
+
+
+async def _resolve_poster(key, movie_title, movie_id):
+    """fetch_poster()'s id lookup, title search and placeholder fallback, without blocking"""
+    headers, params = core.tmdb_auth()
+    try:
+        if movie_id:
+            response = await _tmdb_get('id', f"{core.TMDB_API_BASE}/movie/{movie_id}", headers, params)
+            if response.status_code == 200:
+                poster_path = response.json().get('poster_path')
+                if poster_path:
+                    poster = core.poster_url(poster_path)
+                    core._cache_poster(key, poster)
+                    return poster
+
+        response = await _tmdb_get('search', f"{core.TMDB_API_BASE}/search/movie", headers,
+                                   dict(params, query=movie_title))
+        if response.status_code == 200:
+            results = response.json().get('results')
+            poster_path = results[0].get('poster_path') if results else None
+            if poster_path:
+                poster = core.poster_url(poster_path)
+                core._cache_poster(key, poster)
+                return poster
+
+        poster = core.placeholder_poster(movie_title)
+        if response.status_code == 200:
+            core._cache_poster(key, poster)
+        return poster
+    except Exception as e:
+        logger.error(f"Error fetching poster for {movie_title}: {e}")
+        return core.placeholder_poster(movie_title)
+
+
+async def fetch_poster(movie_title, movie_id=None):
+    """Async fetch_poster(): shared LRU cache first, then one TMDB resolution per key"""
+    if not core.TMDB_API_KEY:
+        return core.placeholder_poster(movie_title)
+    key = core.poster_key(movie_title, movie_id)
+    cached = core.cached_poster(key)
+    if cached is not None:
+        return cached
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_resolve_poster(key, movie_title, movie_id))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+def requires(*components):
+    """Handler decorator: the Flask app's single-flight lazy loading, off the event loop"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(request, *args):
+            for component in components:
+                if not core.is_loaded(component, core.snapshot):
+                    # Only a cold component needs the (blocking) single-flight load
+                    await run_cpu(core.ensure_loaded, component)
+            return await handler(request, *args)
+        return wrapper
+    return decorator
+
+
+def _movie_id(row):
+    return int(row['id']) if row['id'] != '' else 0
+
+
+async def health_check(request):
+    return 200, {"status": "active", "platform": "Hugging Face Spaces"}
+
+
+@requires('recommender')
+async def get_suggestions_api(request):
+    return 200, {'suggestions': await run_cpu(core.get_suggestions)}
+
+
+@requires('recommender')
+async def similarity_route(request):
+    if request.is_json:
+        payload = request.json()
+        movie = payload.get('name', '') or payload.get('movie_title', '')
+    else:
+        movie = request.form().get('name', '')
+    if not movie:
+        return 400, {'error': 'Movie name is required'}
+    with core.stage('score', 'similarity_route'):
+        rc = await run_cpu(core.rcmd, movie)
+    if isinstance(rc, str):
+        return 404, {'error': rc}
+    return 200, {'movies': rc, 'query': movie}
+
+
+@requires('recommender')
+async def recommend(request):
+    if request.is_json:
+        payload = request.json()
+        movie_title = payload.get('movie_title', '')
+        poster_mode = payload.get('posters') or request.args.get('posters', core.RECOMMEND_POSTERS)
+    else:
+        form = request.form()
+        movie_title = form.get('movie_title', '') or form.get('name', '')
+        poster_mode = form.get('posters') or request.args.get('posters', core.RECOMMEND_POSTERS)
+    if not movie_title:
+        return 400, {'error': 'movie_title is required'}
+    with core.stage('score', 'recommend'):
+        rc = await run_cpu(core.rcmd, movie_title)
+    if isinstance(rc, str):
+        return 404, {'error': rc}
+    with core.stage('posters', 'recommend'):
+        ids = await run_cpu(core.browse_ids, core.snapshot, rc)
+        if poster_mode == 'deferred':
+            posters = [core.known_poster(movie, movie_id) for movie, movie_id in zip(rc, ids)]
+            return 200, {'movies': rc, 'ids': ids, 'posters': posters, 'query': movie_title, 'count': len(rc)}
+        posters = await asyncio.gather(*(fetch_poster(movie, movie_id) for movie, movie_id in zip(rc, ids)))
+    return 200, {'movies': rc, 'posters': list(posters), 'query': movie_title, 'count': len(rc)}
+
+
+@requires('browsing')
+async def get_movies(request):
+    if request.args.get('format') == 'ndjson':
+        with core.stage('query', 'get_movies'):
+            total, chunks = await run_cpu(core.movie_stream, core.snapshot, request.args)
+        return 200, Stream(chunks, b'application/x-ndjson', [(b'x-total-count', str(total).encode())])
+    with core.stage('query', 'get_movies'):
+        rows, total, page, limit = await run_cpu(core.browse_movies, core.snapshot, request.args)
+    with core.stage('posters', 'get_movies'):
+        posters = await asyncio.gather(*(fetch_poster(row['title'], _movie_id(row)) for row in rows))
+    movies_list = [core.movie_summary(row, poster) for row, poster in zip(rows, posters)]
+    return 200, core.movies_page(movies_list, total, page, limit)
+
+
+@requires('browsing')
+async def get_movie_details(request, movie_id):
+    snap = core.snapshot
+    with core.stage('lookup', 'get_movie_details'):
+        row = await run_cpu(core.find_movie, snap, int(movie_id))
+    if row is None:
+        return 404, {'error': 'Movie not found'}
+    poster = await fetch_poster(row['title'], _movie_id(row))
+    return 200, core.movie_detail(row, poster)
+
+
+@requires('browsing')
+async def get_movie_full(request, movie_id):
+    snap = core.snapshot
+    if snap.neighbors is None:
+        # Details are served without recommendations until the recommender is loaded
+        core.load_in_background('recommender')
+    limit = max(1, min(int(request.args.get('limit', core.MOVIE_PAGE_RECOMMENDATIONS)), core.MAX_PROFILE_RESULTS))
+    with core.stage('lookup', 'get_movie_full'):
+        row = await run_cpu(core.find_movie, snap, int(movie_id))
+    if row is None:
+        return 404, {'error': 'Movie not found'}
+    poster = asyncio.ensure_future(fetch_poster(row['title'], _movie_id(row)))
+    with core.stage('score', 'get_movie_full'):
+        recs = await run_cpu(core.linked_recommendations, snap, _movie_id(row), limit) or []
+    with core.stage('posters', 'get_movie_full'):
+        rec_posters = await asyncio.gather(*(fetch_poster(rec['title'], _movie_id(rec)) for rec in recs))
+    return 200, dict(core.movie_detail(row, await poster),
+                     recommendations=[core.movie_summary(rec, p) for rec, p in zip(recs, rec_posters)])
+
+
+async def get_posters(request):
+    try:
+        items = core.poster_items((request.json() if request.is_json else None) or {})
+    except (TypeError, ValueError) as e:
+        return 400, {'error': str(e)}
+    unique = list(dict.fromkeys(items))
+    with core.stage('posters', 'get_posters'):
+        resolved = dict(zip(unique, await asyncio.gather(*(fetch_poster(title, movie_id) for title, movie_id in unique))))
+    return 200, core.posters_page(items, [resolved[item] for item in items])
+
+
+async def metrics_endpoint(request):
+    return 200, render_all()
+
+
+# (method, path pattern, handler); handler names match the Flask endpoints for metrics
+ROUTES = [
+    ('GET', re.compile(r'/health'), health_check),
+    ('GET', re.compile(r'/api/suggestions'), get_suggestions_api),
+    ('GET', re.compile(r'/api/movies'), get_movies),
+    ('GET', re.compile(r'/api/movie/(\d+)'), get_movie_details),
+    ('GET', re.compile(r'/api/movie/(\d+)/full'), get_movie_full),
+    ('POST', re.compile(r'/similarity'), similarity_route),
+    ('POST', re.compile(r'/recommend'), recommend),
+    ('POST', re.compile(r'/api/posters'), get_posters),
+    ('GET', re.compile(r'/metrics'), metrics_endpoint),
+]
+
+
+def _cors_headers(request):
+    origin = request.headers.get('origin')
+    if origin not in core.CORS_ORIGINS:
+        return []
+    return [(b'access-control-allow-origin', origin.encode()), (b'vary', b'Origin')]
+
+
+async def _dispatch(request):
+    """Returns (status, payload, endpoint name, extra headers)"""
+    matched = [(method, match, handler) for method, pattern, handler in ROUTES
+               for match in [pattern.fullmatch(request.path)] if match]
+    if not matched:
+        return 404, {'error': 'Not found'}, 'not_found', []
+    route = next(((match, handler) for method, match, handler in matched if method == request.method), None)
+    if route is None:
+        return 405, {'error': 'Method not allowed'}, 'method_not_allowed', []
+    match, handler = route
+    headers = []
+    core.check_catalog_source()
+    try:
+        status, payload = await handler(request, *match.groups())
+    except core.WarmingUp as e:
+        status = 503
+        payload = {'error': 'Service is warming up, please retry shortly', 'component': e.component}
+        headers = [(b'retry-after', str(math.ceil(e.retry_after)).encode())]
+    except Exception as e:
+        logger.error(f"Error in {handler.__name__}: {e}")
+        status, payload = 500, {'error': str(e)}
+    return status, payload, handler.__name__, headers
+
+
+def _encode(payload):
+    """Serialize like Flask's jsonify (sorted keys, compact, trailing newline)"""
+    if isinstance(payload, str):
+        return payload.encode(), b'text/plain; version=0.0.4'
+    return (json.dumps(payload, sort_keys=True, separators=(',', ':')) + '\n').encode(), b'application/json'
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if _client is not None:
+                await _client.aclose()
+            executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI application"""
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    started = time.perf_counter()
+    body, more = b'', True
+    while more:
+        message = await receive()
+        body += message.get('body', b'')
+        more = message.get('more_body', False)
+    request = Request(scope, body)
+
+    if request.method == 'OPTIONS' and request.headers.get('access-control-request-method'):
+        # CORS preflight
+        headers = _cors_headers(request)
+        if headers:
+            headers += [(b'access-control-allow-methods', b'GET, POST, OPTIONS')]
+            requested = request.headers.get('access-control-request-headers')
+            if requested:
+                headers.append((b'access-control-allow-headers', requested.encode()))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+
+    status, payload, endpoint, headers = await _dispatch(request)
+    if isinstance(payload, Stream):
+        headers = [(b'content-type', payload.content_type)] + payload.headers + headers
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers + _cors_headers(request)})
+        while True:
+            chunk = await run_cpu(next, payload.chunks, None)
+            if chunk is None:
+                break
+            await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    else:
+        with core.stage('serialize', endpoint):
+            data, content_type = _encode(payload)
+        headers = [(b'content-type', content_type), (b'content-length', str(len(data)).encode())] + headers
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers + _cors_headers(request)})
+        await send({'type': 'http.response.body', 'body': data})
+
+    REQUEST_LATENCY.observe(time.perf_counter() - started, endpoint, request.method, str(status))
+    if status >= 500:
+        ERRORS.inc(endpoint)
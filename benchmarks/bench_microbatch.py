@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Micro-batching benchmark for /recommend/profile scoring.
+Compares profile_rcmd()-style scoring of three liked titles at several concurrency levels:
+
+  direct      - one full-catalog scoring call per request (score_profiles with a single profile)
+  microbatch  - the same scoring coalesced across threads by MicroBatcher
+
+(/recommend itself is a lookup in the precomputed neighbour lists and is never batched.)
+
+Usage:
+    python benchmarks/bench_microbatch.py --concurrency 1 2 4 8 16 32 --window-ms 2
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import app  # noqa: E402
+
+
+def run_level(score_one, rows, concurrency, requests_per_thread):
+    """Run `requests_per_thread` calls on each of `concurrency` threads; return throughput and latencies"""
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local = []
+        barrier.wait()
+        for _ in range(requests_per_thread):
+            seeds = ([rows[rng.randrange(len(rows))] for _ in range(3)], [])
+            start = time.perf_counter()
+            score_one(seeds)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    lat = np.array(latencies) * 1000
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(float(np.percentile(lat, 50)), 3),
+        'p95_ms': round(float(np.percentile(lat, 95)), 3),
+        'p99_ms': round(float(np.percentile(lat, 99)), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cross-request micro-batching of profile scoring")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--requests', type=int, default=200, help="Requests per thread")
+    parser.add_argument('--window-ms', type=float, default=2.0)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--json', help="Write results to this file")
+    args = parser.parse_args()
+
+    snap = app.snapshot
+    if snap.neighbors is None:
+        print("Recommender artifacts failed to load")
+        sys.exit(1)
+    rows = list(range(snap.features.shape[0]))
+    batcher = app.MicroBatcher(app.score_microbatch, args.window_ms, args.max_batch)
+
+    modes = {
+        'direct': lambda seeds: app.score_profiles(snap, [seeds], 10)[0],
+        'microbatch': lambda seeds: batcher.submit((snap, seeds, 10)),
+    }
+
+    results = {}
+    print(f"{'mode':<11} {'threads':>7} {'req/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for mode, score_one in modes.items():
+        results[mode] = []
+        for concurrency in args.concurrency:
+            level = run_level(score_one, rows, concurrency, args.requests)
+            results[mode].append(level)
+            print(f"{mode:<11} {concurrency:>7} {level['throughput_rps']:>10} "
+                  f"{level['p50_ms']:>8} {level['p95_ms']:>8} {level['p99_ms']:>8}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'window_ms': args.window_ms, 'max_batch': args.max_batch,
+                       'catalog_size': len(rows), 'results': results}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
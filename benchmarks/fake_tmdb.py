@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Local TMDB stand-in for load tests.
+Serves the endpoints fetch_poster() uses (/3/movie/<id>, /3/search/movie) and
+poster images (/t/p/<size>/<path>) with configurable latency, error rate and
+rate limiting, so production-like upstream behaviour can be reproduced offline.
+
+Usage:
+    python benchmarks/fake_tmdb.py --port 8765 --profile slow
+    TMDB_API_BASE=http://127.0.0.1:8765/3 TMDB_IMAGE_BASE=http://127.0.0.1:8765/t/p python app.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Named upstream behaviours: mean latency (ms), jitter (ms), 5xx rate, requests/sec limit
+PROFILES = {
+    'fast': {'latency_ms': 20, 'jitter_ms': 5, 'error_rate': 0.0, 'rate_limit': 0},
+    'slow': {'latency_ms': 300, 'jitter_ms': 150, 'error_rate': 0.0, 'rate_limit': 0},
+    'flaky': {'latency_ms': 100, 'jitter_ms': 50, 'error_rate': 0.05, 'rate_limit': 0},
+    'rate-limited': {'latency_ms': 40, 'jitter_ms': 10, 'error_rate': 0.0, 'rate_limit': 40},
+}
+
+
+class UpstreamBehaviour:
+    """Latency, error and token-bucket rate-limit settings shared by all handler threads"""
+
+    def __init__(self, latency_ms=20, jitter_ms=5, error_rate=0.0, rate_limit=0, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(rate_limit)
+        self._refilled = time.monotonic()
+
+    def admit(self):
+        """Return the HTTP status to simulate for the next request (200, 429 or 500)"""
+        with self._lock:
+            self.requests += 1
+            if self.rate_limit:
+                now = time.monotonic()
+                self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+                self._refilled = now
+                if self._tokens < 1:
+                    return 429
+                self._tokens -= 1
+            if self._rng.random() < self.error_rate:
+                return 500
+            delay = max(0.0, self._rng.gauss(self.latency_ms, self.jitter_ms)) / 1000
+        time.sleep(delay)
+        return 200
+
+
+def fake_image(size, path):
+    """Deterministic bytes standing in for a poster image (larger sizes give larger bodies)"""
+    width = int(size[1:]) if size[1:].isdigit() else 780
+    seed = hashlib.sha256(f"{size}{path}".encode()).digest()
+    return b'\xff\xd8\xff\xe0' + seed * max(1, width // 8)
+
+
+def make_handler(behaviour):
+    class FakeTMDBHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, content_type='application/json', headers=None):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            status = behaviour.admit()
+            if status == 429:
+                return self._send(429, b'{"status_message": "rate limited"}', headers={'Retry-After': '1'})
+            if status == 500:
+                return self._send(500, b'{"status_message": "internal error"}')
+
+            url = urlparse(self.path)
+            movie = re.fullmatch(r'/3/movie/(\d+)', url.path)
+            image = re.fullmatch(r'/t/p/(\w+)(/.+)', url.path)
+            if movie:
+                body = {'id': int(movie.group(1)), 'poster_path': f'/{movie.group(1)}.jpg'}
+                return self._send(200, json.dumps(body).encode())
+            if url.path == '/3/search/movie':
+                query = parse_qs(url.query).get('query', [''])[0]
+                digest = hashlib.md5(query.encode()).hexdigest()[:12]
+                body = {'results': [{'title': query, 'poster_path': f'/{digest}.jpg'}] if query else []}
+                return self._send(200, json.dumps(body).encode())
+            if image:
+                return self._send(200, fake_image(image.group(1), image.group(2)), 'image/jpeg')
+            return self._send(404, b'{"status_message": "not found"}')
+
+    return FakeTMDBHandler
+
+
+def start_server(port=0, behaviour=None):
+    """Start the fake TMDB on a background thread; returns (server, behaviour)"""
+    behaviour = behaviour or UpstreamBehaviour()
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(behaviour))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='fake-tmdb', daemon=True).start()
+    return server, behaviour
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local TMDB stand-in")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='fast')
+    parser.add_argument('--latency-ms', type=float)
+    parser.add_argument('--jitter-ms', type=float)
+    parser.add_argument('--error-rate', type=float)
+    parser.add_argument('--rate-limit', type=float, help="Requests per second before 429s (0 = unlimited)")
+    args = parser.parse_args()
+
+    settings = dict(PROFILES[args.profile])
+    for key in settings:
+        value = getattr(args, key)
+        if value is not None:
+            settings[key] = value
+    server, _ = start_server(args.port, UpstreamBehaviour(**settings))
+    print(f"Fake TMDB ({args.profile}: {settings}) on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
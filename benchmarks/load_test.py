@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test against a local TMDB stand-in.
+
+Boots the app under gunicorn (once per worker/thread configuration) with
+TMDB_API_BASE pointed at benchmarks/fake_tmdb.py, drives a realistic mix of
+/recommend, /api/movies, /api/movie/<id> and /api/suggestions traffic from
+concurrent clients, and reports throughput, p50/p95/p99 latency and error
+rate per endpoint.
+
+Usage:
+    python benchmarks/load_test.py --configs 1x8 2x4 --clients 32 --duration 30 --profile slow
+    python benchmarks/load_test.py --catalog synthetic --rows 50000 --json load.json
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_tmdb import PROFILES, UpstreamBehaviour, start_server  # noqa: E402
+from synthetic_catalog import generate_catalog  # noqa: E402
+
+# Share of traffic per endpoint, roughly what the Next.js frontend generates
+DEFAULT_MIX = {'recommend': 0.25, 'movies': 0.35, 'movie': 0.25, 'suggestions': 0.15}
+MOVIES_QUERIES = ['limit=15', 'genre=Action&limit=15', 'sort=vote_average.desc&limit=15',
+                  'rating=7%2B&limit=20', 'search=the&limit=20', 'page=5&limit=20']
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_until_ready(base_url, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def start_app(artifacts_dir, tmdb_url, workers, threads, extra_env):
+    """Start gunicorn serving app:app; returns (process, base_url)"""
+    port = free_port()
+    env = dict(os.environ, ARTIFACTS_DIR=artifacts_dir, TMDB_API_KEY='load-test-key',
+               TMDB_API_BASE=f"{tmdb_url}/3", TMDB_IMAGE_BASE=f"{tmdb_url}/t/p", **extra_env)
+    cmd = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+           '--threads', str(threads), '--timeout', '0', 'app:app']
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return proc, f"http://127.0.0.1:{port}"
+
+
+def drive(base_url, titles, ids, mix, clients, duration, seed):
+    """Run `clients` closed-loop clients for `duration` seconds; returns per-endpoint samples"""
+    samples = {name: [] for name in mix}
+    lock = threading.Lock()
+    names, weights = list(mix), list(mix.values())
+    stop_at = time.perf_counter() + duration
+
+    def client(index):
+        rng = random.Random(seed + index)
+        session = requests.Session()
+        local = {name: [] for name in mix}
+        while time.perf_counter() < stop_at:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                if name == 'recommend':
+                    response = session.post(f"{base_url}/recommend", json={'movie_title': rng.choice(titles)}, timeout=60)
+                elif name == 'movies':
+                    response = session.get(f"{base_url}/api/movies?{rng.choice(MOVIES_QUERIES)}", timeout=60)
+                elif name == 'movie':
+                    response = session.get(f"{base_url}/api/movie/{rng.choice(ids)}", timeout=60)
+                else:
+                    response = session.get(f"{base_url}/api/suggestions", timeout=60)
+                status = response.status_code
+            except requests.RequestException:
+                status = 0
+            local[name].append((time.perf_counter() - started, status))
+        with lock:
+            for name, values in local.items():
+                samples[name].extend(values)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def report(samples, duration):
+    """Throughput, latency percentiles and error rate per endpoint"""
+    results = {}
+    for name, values in samples.items():
+        if not values:
+            continue
+        latencies = np.array([latency for latency, _ in values]) * 1000
+        errors = sum(1 for _, status in values if status == 0 or status >= 500)
+        results[name] = {
+            'requests': len(values),
+            'throughput_rps': round(len(values) / duration, 1),
+            'p50_ms': round(float(np.percentile(latencies, 50)), 1),
+            'p95_ms': round(float(np.percentile(latencies, 95)), 1),
+            'p99_ms': round(float(np.percentile(latencies, 99)), 1),
+            'error_rate': round(errors / len(values), 4),
+            'status_counts': {str(s): sum(1 for _, st in values if st == s) for s in sorted({st for _, st in values})},
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the app against a local fake TMDB")
+    parser.add_argument('--configs', nargs='+', default=['1x8'], help="WORKERSxTHREADS gunicorn configurations")
+    parser.add_argument('--clients', type=int, default=32, help="Concurrent closed-loop clients")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds of traffic per configuration")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='fast', help="Fake TMDB behaviour")
+    parser.add_argument('--latency-ms', type=float)
+    parser.add_argument('--jitter-ms', type=float)
+    parser.add_argument('--error-rate', type=float)
+    parser.add_argument('--rate-limit', type=float)
+    parser.add_argument('--catalog', choices=['shipped', 'synthetic'], default='shipped')
+    parser.add_argument('--rows', type=int, default=5000, help="Synthetic catalog size")
+    parser.add_argument('--startup-timeout', type=float, default=300)
+    parser.add_argument('--env', nargs='*', default=[], help="Extra KEY=VALUE settings for the app")
+    parser.add_argument('--json', help="Write results to this file")
+    args = parser.parse_args()
+
+    settings = dict(PROFILES[args.profile])
+    for key in settings:
+        if getattr(args, key) is not None:
+            settings[key] = getattr(args, key)
+    server, behaviour = start_server(0, UpstreamBehaviour(**settings))
+    tmdb_url = f"http://127.0.0.1:{server.server_address[1]}"
+    extra_env = dict(item.split('=', 1) for item in args.env)
+
+    with tempfile.TemporaryDirectory(prefix='load-catalog-') as tmp:
+        if args.catalog == 'synthetic':
+            generate_catalog(args.rows, tmp, recommender_rows=min(args.rows, 50000))
+            artifacts_dir = tmp
+        else:
+            artifacts_dir = os.path.join(ROOT, 'Artifacts')
+        titles = pd.read_csv(os.path.join(artifacts_dir, 'main_data.csv'), usecols=['movie_title'])['movie_title'].tolist()
+        movies_path = os.path.join(artifacts_dir, 'movies.csv')
+        ids = pd.read_csv(movies_path, usecols=['id'])['id'].dropna().astype(int).tolist() if os.path.exists(movies_path) else [0]
+
+        all_results = {}
+        for config in args.configs:
+            workers, threads = (int(part) for part in config.lower().split('x'))
+            proc, base_url = start_app(artifacts_dir, tmdb_url, workers, threads, extra_env)
+            try:
+                if not wait_until_ready(base_url, args.startup_timeout):
+                    print(f"✗ {config}: app did not become ready")
+                    continue
+                upstream_before = behaviour.requests
+                samples = drive(base_url, titles, ids, DEFAULT_MIX, args.clients, args.duration, seed=0)
+                results = report(samples, args.duration)
+                results['_upstream_requests'] = behaviour.requests - upstream_before
+                all_results[config] = results
+            finally:
+                proc.terminate()
+                proc.wait(timeout=30)
+
+            print(f"\n{config} (workers x threads), {args.clients} clients, TMDB profile '{args.profile}'")
+            print(f"  {'endpoint':<12} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+            for name, r in all_results[config].items():
+                if name.startswith('_'):
+                    continue
+                print(f"  {name:<12} {r['throughput_rps']:>8} {r['p50_ms']:>9} {r['p95_ms']:>9} "
+                      f"{r['p99_ms']:>9} {r['error_rate']:>8.2%}")
+            print(f"  upstream TMDB requests: {all_results[config]['_upstream_requests']}")
+
+    server.shutdown()
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'profile': args.profile, 'tmdb': settings, 'clients': args.clients,
+                       'duration': args.duration, 'results': all_results}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark suite for the recommender and browse hot paths.
+
+Each catalog is benchmarked in a fresh interpreter with ARTIFACTS_DIR pointing
+at it and fetch_poster() stubbed out, so only our own code is timed:
+
+  startup            importing app.py (models, recommender and browse data)
+  create_similarity  vectorizing main_data.csv and building the neighbour lists
+  rcmd               single-title recommendations
+  get_suggestions    the autocomplete title list
+  get_movies/*       /api/movies filter, sort and page combinations
+  get_movie_details  /api/movie/<id>
+
+Catalogs are the shipped Artifacts/ directory plus synthetic catalogs of the
+requested sizes. Synthetic recommender catalogs are capped at
+--max-similarity-rows because the neighbour build is O(N²); browse catalogs
+always use the full size.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 5000 50000 500000 --out bench.json
+    python benchmarks/run_benchmarks.py --compare before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+# /api/movies query strings covering each filter, sort and deep pagination
+MOVIES_QUERIES = {
+    'default': 'limit=20',
+    'genre': 'genre=Action&limit=20',
+    'year': 'year=2010&limit=20',
+    'rating': 'rating=7%2B&limit=20',
+    'search': 'search=night&limit=20',
+    'sort_rating': 'sort=vote_average.desc&limit=20',
+    'sort_release': 'sort=release_date.desc&limit=20',
+    'deep_page': 'page=200&limit=20',
+    'combined': 'genre=Drama&rating=6%2B&sort=release_date.desc&page=3&limit=20',
+    'large_limit': 'limit=500',
+}
+
+
+def summarize(times):
+    """Latency summary in milliseconds"""
+    ms = np.array(times) * 1000
+    return {
+        'runs': len(ms),
+        'mean_ms': round(float(ms.mean()), 4),
+        'p50_ms': round(float(np.percentile(ms, 50)), 4),
+        'p95_ms': round(float(np.percentile(ms, 95)), 4),
+        'min_ms': round(float(ms.min()), 4),
+        'ops_per_sec': round(float(1000 / ms.mean()), 1) if ms.mean() > 0 else None,
+    }
+
+
+def measure(fn, repeat, warmup=1):
+    """Time fn(i) for i in range(repeat) after `warmup` untimed calls"""
+    for i in range(warmup):
+        fn(i)
+    times = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        fn(i)
+        times.append(time.perf_counter() - started)
+    return summarize(times)
+
+
+def run_worker(repeat):
+    """Benchmark the app loaded from $ARTIFACTS_DIR and print JSON results"""
+    import logging
+    logging.disable(logging.CRITICAL)
+    import app
+
+    app.fetch_poster = lambda movie_title, movie_id=None: app.placeholder_poster(movie_title)
+    client = app.app.test_client()
+    snap = app.snapshot
+    results = {}
+    rng = random.Random(0)
+
+    if snap.data is not None:
+        results['recommender_rows'] = len(snap.data)
+        build_repeat = 1 if len(snap.data) > 20000 else 3
+        results['create_similarity'] = measure(lambda i: app.create_similarity(), build_repeat, warmup=0)
+        titles = list(snap.title_index)
+        sample = [rng.choice(titles) for _ in range(repeat)]
+        results['rcmd'] = measure(lambda i: app.rcmd(sample[i]), repeat)
+        results['get_suggestions'] = measure(lambda i: app.get_suggestions(), max(repeat // 10, 5))
+    else:
+        results['recommender_skipped'] = 'main_data.csv failed to load'
+
+    if snap.movies_data is not None:
+        results['browse_rows'] = len(snap.movies_data)
+        for name, query in MOVIES_QUERIES.items():
+            results[f'get_movies/{name}'] = measure(lambda i, q=query: client.get(f'/api/movies?{q}'),
+                                                    max(repeat // 10, 5))
+        ids = snap.movies_data['id'].dropna().astype(int).tolist()
+        id_sample = [rng.choice(ids) for _ in range(repeat)]
+        results['get_movie_details'] = measure(lambda i: client.get(f'/api/movie/{id_sample[i]}'), repeat)
+    else:
+        results['browse_skipped'] = 'movies.csv failed to load'
+
+    print(json.dumps(results))
+
+
+def run_catalog(artifacts_dir, repeat, startup_repeat):
+    """Benchmark one catalog in child interpreters; returns its results dict"""
+    env = dict(os.environ, ARTIFACTS_DIR=artifacts_dir)
+    env.pop('TMDB_API_KEY', None)
+    env.pop('MICROBATCH_WINDOW_MS', None)
+
+    startup = []
+    for _ in range(startup_repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'import app'], cwd=ROOT, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        startup.append(time.perf_counter() - started)
+
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', '--repeat', str(repeat)],
+                          cwd=ROOT, env=env, check=True, capture_output=True, text=True)
+    results = json.loads(proc.stdout.strip().splitlines()[-1])
+    results['startup'] = summarize(startup)
+    return results
+
+
+def compare(before_path, after_path, threshold):
+    """Print mean latency changes between two result files; exit 1 on regressions"""
+    with open(before_path) as f:
+        before = json.load(f)['catalogs']
+    with open(after_path) as f:
+        after = json.load(f)['catalogs']
+    regressions = 0
+    print(f"{'catalog':<18} {'benchmark':<28} {'before ms':>10} {'after ms':>10} {'ratio':>7}")
+    for catalog in sorted(set(before) & set(after)):
+        for name in sorted(set(before[catalog]) & set(after[catalog])):
+            old, new = before[catalog][name], after[catalog][name]
+            if not isinstance(old, dict) or not isinstance(new, dict):
+                continue
+            ratio = new['mean_ms'] / old['mean_ms'] if old['mean_ms'] else float('inf')
+            flag = '  REGRESSION' if ratio > threshold else ''
+            regressions += bool(flag)
+            print(f"{catalog:<18} {name:<28} {old['mean_ms']:>10.3f} {new['mean_ms']:>10.3f} {ratio:>7.2f}{flag}")
+    print(f"\n{regressions} regression(s) above {threshold:.2f}x")
+    sys.exit(1 if regressions else 0)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recommender and browse hot paths")
+    parser.add_argument('--sizes', type=int, nargs='*', default=[5000, 50000, 500000],
+                        help="Synthetic catalog sizes (rows)")
+    parser.add_argument('--no-shipped', action='store_true', help="Skip the shipped Artifacts/ catalog")
+    parser.add_argument('--max-similarity-rows', type=int, default=50000,
+                        help="Cap synthetic main_data.csv at this many rows")
+    parser.add_argument('--repeat', type=int, default=200, help="Timed calls per benchmark")
+    parser.add_argument('--startup-repeat', type=int, default=3)
+    parser.add_argument('--out', default='bench_results.json')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'))
+    parser.add_argument('--threshold', type=float, default=1.2, help="Regression ratio for --compare")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.repeat)
+        return
+    if args.compare:
+        compare(args.compare[0], args.compare[1], args.threshold)
+        return
+
+    from synthetic_catalog import generate_catalog
+
+    catalogs = {}
+    if not args.no_shipped:
+        print("Benchmarking shipped artifacts...")
+        catalogs['shipped'] = run_catalog(os.path.join(ROOT, 'Artifacts'), args.repeat, args.startup_repeat)
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory(prefix=f'catalog-{size}-') as tmp:
+            print(f"Benchmarking synthetic catalog with {size:,} rows...")
+            generate_catalog(size, tmp, recommender_rows=args.max_similarity_rows)
+            catalogs[f'synthetic-{size}'] = run_catalog(tmp, args.repeat, args.startup_repeat)
+
+    output = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'cpu_count': os.cpu_count(),
+            'repeat': args.repeat,
+        },
+        'catalogs': catalogs,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(output, f, indent=2)
+
+    for catalog, results in catalogs.items():
+        print(f"\n{catalog}")
+        for name, value in results.items():
+            if isinstance(value, dict):
+                print(f"  {name:<28} mean {value['mean_ms']:>10.3f} ms   p95 {value['p95_ms']:>10.3f} ms")
+    print(f"\nResults written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Synthetic catalog generator for benchmarks and load tests.
+Writes a main_data.csv (recommender) and movies.csv (browsing) with the same
+columns and roughly the same value distributions as the production files.
+
+Usage:
+    python benchmarks/synthetic_catalog.py /tmp/catalog-50k --rows 50000
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+GENRES = ['Action', 'Adventure', 'Animation', 'Comedy', 'Crime', 'Documentary', 'Drama', 'Family',
+          'Fantasy', 'History', 'Horror', 'Music', 'Mystery', 'Romance', 'Science Fiction',
+          'Thriller', 'War', 'Western']
+FIRST_NAMES = ['James', 'Mary', 'John', 'Linda', 'Robert', 'Sofia', 'Michael', 'Aiko', 'David', 'Priya',
+               'Carlos', 'Emma', 'Luca', 'Fatima', 'Kenji', 'Olga', 'Noah', 'Zara', 'Ivan', 'Chloe']
+LAST_NAMES = ['Smith', 'Garcia', 'Chen', 'Kowalski', 'Okafor', 'Rossi', 'Tanaka', 'Novak', 'Silva',
+              'Müller', 'Dubois', 'Khan', 'Larsen', 'Haddad', 'Petrov', 'Moreau', 'Ibrahim', 'Walsh']
+TITLE_WORDS = ['night', 'return', 'last', 'city', 'star', 'shadow', 'river', 'king', 'dream', 'storm',
+               'secret', 'love', 'war', 'edge', 'ghost', 'summer', 'code', 'road', 'fire', 'island']
+
+
+def _people(rng, pool_size, n):
+    """Draw n names from a Zipf-like pool so a few people appear in many movies"""
+    first = rng.choice(FIRST_NAMES, pool_size)
+    last = rng.choice(LAST_NAMES, pool_size)
+    pool = np.array([f"{f} {l}{i}" for i, (f, l) in enumerate(zip(first, last))])
+    ranks = np.minimum(rng.zipf(1.3, n), pool_size) - 1
+    return pool[ranks]
+
+
+def generate_catalog(rows, out_dir, seed=0, recommender_rows=None):
+    """Write main_data.csv and movies.csv for a synthetic catalog of `rows` movies.
+
+    `recommender_rows` caps main_data.csv (the recommender's O(N²) build) while
+    movies.csv keeps the full size.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+
+    words = rng.choice(TITLE_WORDS, (rows, 3))
+    titles = np.array([f"the {a} {b} {c} {i}" for i, (a, b, c) in enumerate(words)])
+    genre_count = rng.integers(1, 4, rows)
+    genres = np.array([' '.join(rng.choice(GENRES, k, replace=False)) for k in genre_count])
+    pool = max(rows // 4, 100)
+    directors = _people(rng, pool // 4, rows)
+    actors = [_people(rng, pool, rows) for _ in range(3)]
+
+    main_rows = min(rows, recommender_rows or rows)
+    main = pd.DataFrame({
+        'director_name': directors,
+        'actor_1_name': actors[0],
+        'actor_2_name': actors[1],
+        'actor_3_name': actors[2],
+        'genres': genres,
+        'movie_title': titles,
+    }).iloc[:main_rows]
+    main['comb'] = (main['actor_1_name'] + ' ' + main['actor_2_name'] + ' ' + main['actor_3_name'] + ' '
+                    + main['director_name'] + ' ' + main['genres'])
+    main.to_csv(os.path.join(out_dir, 'main_data.csv'), index=False)
+
+    release = pd.to_datetime('1930-01-01') + pd.to_timedelta(rng.integers(0, 34000, rows), unit='D')
+    movies = pd.DataFrame({
+        'id': np.arange(1, rows + 1) * 3 + 5,
+        'title': pd.Series(titles).str.title(),
+        'genres': genres,
+        'release_date': release.strftime('%Y-%m-%d'),
+        'vote_average': np.round(rng.normal(6.2, 1.2, rows).clip(0, 10), 1),
+        'vote_count': rng.integers(0, 30000, rows),
+        'popularity': np.round(rng.exponential(15, rows), 3),
+        'overview': [f"A story about {t}. " + 'Something happens and then something else. ' * 6 for t in titles],
+        'tagline': [f"The {w} is coming." for w in words[:, 0]],
+        'runtime': rng.integers(70, 200, rows),
+        'director': directors,
+        'cast': [f"{a}, {b}, {c}" for a, b, c in zip(*actors)],
+        'budget': rng.integers(0, 200_000_000, rows),
+        'keywords': [' '.join(w) for w in words],
+    })
+    # Real exports have gaps in these columns
+    missing = rng.random(rows) < 0.01
+    movies.loc[missing, 'release_date'] = None
+    movies.loc[rng.random(rows) < 0.01, 'vote_average'] = None
+    movies.to_csv(os.path.join(out_dir, 'movies.csv'), index=False)
+    return main_rows, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic movie catalog")
+    parser.add_argument('out_dir')
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--recommender-rows', type=int, default=None,
+                        help="Cap main_data.csv at this many rows")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    main_rows, movie_rows = generate_catalog(args.rows, args.out_dir, args.seed, args.recommender_rows)
+    print(f"Wrote {main_rows} recommender rows and {movie_rows} browse rows to {args.out_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,399 @@
+"""
+Browse catalog storage helpers.
+
+The compact catalog mode (COMPACT_CATALOG=1) keeps only the columns the API
+serves, with categorical strings and narrow numeric dtypes, and moves long
+text fields off the Python heap into a memory-mapped file that is decoded one
+row at a time when a detail page asks for it.
+
+Numeric columns /api/movies filters by range are also kept presorted
+(SortedColumnIndex), so a range filter is a binary search rather than a scan.
+
+The SQLite catalog mode (CATALOG_BACKEND=sqlite) keeps no browse rows in the
+worker at all: CatalogDB answers list, search and detail queries from an
+indexed on-disk database with a trigram FTS index on titles.
+"""
+import contextlib
+import hashlib
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from catalog_csv import MOVIES_SCHEMA, iter_catalog, prepare_movies
+
+# Columns /api/movies and /api/movie/<id> actually serve
+SERVED_COLUMNS = ['id', 'title', 'genres', 'release_date', 'vote_average', 'popularity',
+                  'runtime', 'director', 'overview', 'tagline', 'cast']
+
+# Long, detail-only text kept off-heap in compact mode
+COLD_TEXT_COLUMNS = ['overview', 'tagline', 'cast']
+
+# Numeric columns with a SortedColumnIndex for the year/rating range filters
+RANGE_COLUMNS = ['year', 'vote_average']
+
+# Genre labels that name the same genre; filtering on any of them matches them all
+GENRE_ALIASES = [['Sci-Fi', 'Science Fiction']]
+
+
+class ColdTextStore:
+    """Text columns stored as one UTF-8 blob plus per-row offsets, both memory-mapped.
+
+    Values cost no heap memory until requested; pages of the blob are shared by
+    every worker process that maps the same file.
+    """
+
+    def __init__(self, blob_path, offsets_path, fields):
+        self.fields = list(fields)
+        self.blob_path = blob_path
+        self.offsets_path = offsets_path
+        self._blob = np.memmap(blob_path, dtype=np.uint8, mode='r') if os.path.getsize(blob_path) else np.zeros(0, np.uint8)
+        self._offsets = np.load(offsets_path, mmap_mode='r')
+
+    @classmethod
+    def build(cls, df, fields, directory, key):
+        """Write `fields` of `df` to `directory` (reusing files already built for `key`)"""
+        writer = ColdTextWriter(fields, directory, key)
+        writer.add(df)
+        return writer.close()
+
+    def get(self, field, row):
+        """Decode one value"""
+        i = self.fields.index(field)
+        start, stop = int(self._offsets[i, row]), int(self._offsets[i, row + 1])
+        return bytes(self._blob[start:stop]).decode('utf-8')
+
+    def heap_bytes(self):
+        return 0
+
+    def mapped_bytes(self):
+        return int(self._blob.nbytes + self._offsets.nbytes)
+
+
+class ColdTextWriter:
+    """Builds a ColdTextStore from frames added chunk by chunk, so the text never sits on the heap whole.
+
+    Each field is spooled to its own temporary file and the parts are joined
+    into the store's blob on close(). Nothing is written if the store for
+    `key` already exists.
+    """
+
+    def __init__(self, fields, directory, key):
+        self.fields = list(fields)
+        self.directory = directory
+        self.key = key
+        self.blob_path = os.path.join(directory, f'movies_text-{key}.bin')
+        self.offsets_path = os.path.join(directory, f'movies_text-{key}.npy')
+        self.built = os.path.exists(self.blob_path) and os.path.exists(self.offsets_path)
+        if not self.built:
+            self._part_paths = [f'{self.blob_path}.{os.getpid()}.{i}.tmp' for i in range(len(self.fields))]
+            self._parts = [open(path, 'wb') for path in self._part_paths]
+            self._ends = [[np.zeros(1, dtype=np.int64)] for _ in self.fields]
+
+    def add(self, df):
+        """Append the rows of `df`"""
+        if self.built:
+            return
+        for i, field in enumerate(self.fields):
+            lengths = []
+            for value in df[field].fillna('').astype(str):
+                encoded = value.encode('utf-8')
+                self._parts[i].write(encoded)
+                lengths.append(len(encoded))
+            ends = np.cumsum(lengths, dtype=np.int64) + self._ends[i][-1][-1]
+            self._ends[i].append(ends)
+
+    def close(self):
+        """Finish the files and map them"""
+        if not self.built:
+            for part in self._parts:
+                part.close()
+            offsets = np.vstack([np.concatenate(ends) for ends in self._ends]) if self.fields else np.zeros((0, 1), np.int64)
+            tmp_blob = f'{self.blob_path}.{os.getpid()}.tmp'
+            position = 0
+            with open(tmp_blob, 'wb') as f:
+                for i, path in enumerate(self._part_paths):
+                    offsets[i] += position
+                    position = int(offsets[i, -1])
+                    with open(path, 'rb') as part:
+                        shutil.copyfileobj(part, f)
+                    os.remove(path)
+            tmp_offsets = f'{self.offsets_path}.{os.getpid()}.tmp.npy'
+            np.save(tmp_offsets, offsets)
+            # Several workers may build concurrently; identical content makes the last rename win harmlessly
+            os.replace(tmp_offsets, self.offsets_path)
+            os.replace(tmp_blob, self.blob_path)
+            # Stores built for earlier versions of the CSV; workers still mapping them keep their pages
+            for name in os.listdir(self.directory):
+                if name.startswith('movies_text-') and self.key not in name and not name.endswith('.tmp'):
+                    os.remove(os.path.join(self.directory, name))
+            self.built = True
+        return ColdTextStore(self.blob_path, self.offsets_path, self.fields)
+
+
+class SortedColumnIndex:
+    """A numeric column's values in ascending order, alongside the row positions holding them.
+
+    Every [low, high] range is one contiguous slice located with two binary
+    searches, so a range filter costs O(log N + hits) instead of a full scan.
+    NaN values are left out and never match.
+    """
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        rows = np.flatnonzero(~np.isnan(values))
+        order = rows[np.argsort(values[rows], kind='stable')]
+        self.values = values[order]
+        self.rows = order.astype(np.int32)
+
+    def positions(self, low=None, high=None):
+        """Ascending row positions with low <= value <= high (None leaves a side open)"""
+        start = 0 if low is None else int(np.searchsorted(self.values, low, side='left'))
+        stop = len(self.values) if high is None else int(np.searchsorted(self.values, high, side='right'))
+        return np.sort(self.rows[start:stop])
+
+    def heap_bytes(self):
+        return int(self.values.nbytes + self.rows.nbytes)
+
+
+def build_range_indexes(df):
+    """{column: SortedColumnIndex} for the RANGE_COLUMNS present in `df`"""
+    return {column: SortedColumnIndex(df[column]) for column in RANGE_COLUMNS if column in df.columns}
+
+
+def intersect_sorted(a, b):
+    """Intersection of two ascending arrays of unique positions, probing the larger with the smaller"""
+    if len(a) > len(b):
+        a, b = b, a
+    if not len(a):
+        return a
+    found = np.searchsorted(b, a)
+    found[found == len(b)] = 0
+    return a[b[found] == a]
+
+
+# Browse sorts /api/movies supports, by the column each one orders on (descending)
+SORT_COLUMNS = {'popularity.desc': 'popularity', 'vote_average.desc': 'vote_average',
+                'release_date.desc': 'release_date'}
+
+# Rows inserted per transaction while building the database
+DB_BUILD_CHUNK = 50000
+
+# Bumped when the table contents change for the same CSV, so existing databases are rebuilt
+DB_LAYOUT = 2
+
+
+def _like_pattern(text):
+    """'%text%' with LIKE wildcards in `text` escaped (ESCAPE '\\')"""
+    return '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+class CatalogDB:
+    """The browse catalog in an embedded SQLite database, read through per-thread connections.
+
+    Rows keep their CSV order as rowid, so "row position" means the same thing
+    as in the in-memory frame. Values come back as dicts with NULL as '', like
+    the frame's fillna('').
+    """
+
+    COLUMNS = ['id', 'title', 'title_lower', 'genres', 'release_date', 'year', 'vote_average',
+               'popularity', 'runtime', 'director', 'overview', 'tagline', 'cast']
+    SUMMARY = 'id, title, year, vote_average, genres'
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    @classmethod
+    def build(cls, csv_path, db_path):
+        """Open the database for `csv_path`, (re)building it first when the CSV changed"""
+        key = f'{file_key(csv_path)}-v{DB_LAYOUT}'
+        if os.path.exists(db_path):
+            try:
+                # sqlite3's own context manager only commits; closing() releases the file handle
+                with contextlib.closing(sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)) as conn:
+                    if conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone() == (key,):
+                        return cls(db_path)
+            except sqlite3.DatabaseError:
+                pass # Unreadable or from an older layout: rebuild
+
+        tmp_path = f'{db_path}.{os.getpid()}.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.execute('PRAGMA journal_mode = OFF')
+            conn.execute('PRAGMA synchronous = OFF')
+            conn.execute('CREATE TABLE movies (rowid INTEGER PRIMARY KEY, id INTEGER, title TEXT, title_lower TEXT, '
+                         'genres TEXT, release_date TEXT, year INTEGER, vote_average REAL, popularity REAL, '
+                         'runtime REAL, director TEXT, overview TEXT, tagline TEXT, "cast" TEXT)')
+            insert = f"INSERT INTO movies ({', '.join(_quoted(c) for c in cls.COLUMNS)}) VALUES ({', '.join('?' * len(cls.COLUMNS))})"
+            for chunk in iter_catalog(csv_path, MOVIES_SCHEMA, prepare_movies, DB_BUILD_CHUNK):
+                conn.executemany(insert, _catalog_records(chunk, cls.COLUMNS))
+                conn.commit()
+            for column in ('id', 'title_lower', 'year', 'vote_average', 'popularity', 'release_date'):
+                conn.execute(f'CREATE INDEX movies_{column} ON movies ({column})')
+            conn.execute("CREATE VIRTUAL TABLE movies_fts USING fts5(title, content='movies', content_rowid='rowid', "
+                         "tokenize='trigram')")
+            conn.execute("INSERT INTO movies_fts (movies_fts) VALUES ('rebuild')")
+            conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+            conn.execute("INSERT INTO meta VALUES ('source', ?)", (key,))
+            conn.commit()
+            conn.execute('ANALYZE')
+        finally:
+            conn.close()
+        # Workers may build concurrently; identical content makes the last rename win harmlessly
+        os.replace(tmp_path, db_path)
+        return cls(db_path)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True, check_same_thread=False)
+            # Pages are read through a shared mapping, so the page cache is not duplicated per worker
+            conn.execute('PRAGMA mmap_size = 268435456')
+            conn.execute('PRAGMA cache_size = -4096')
+            self._local.conn = conn
+        return conn
+
+    def _rows(self, sql, params):
+        cursor = self._conn().execute(sql, params)
+        names = [d[0] for d in cursor.description]
+        for values in cursor:
+            yield {name: '' if value is None else value for name, value in zip(names, values)}
+
+    def _where(self, search, genre, ranges):
+        clauses, params = [], []
+        if search:
+            if len(search) >= 3:
+                # Trigram FTS: case-insensitive substring match served from the index
+                clauses.append('rowid IN (SELECT rowid FROM movies_fts WHERE movies_fts MATCH ?)')
+                params.append('"' + search.replace('"', '""') + '"')
+            else:
+                clauses.append("title_lower LIKE ? ESCAPE '\\'")
+                params.append(_like_pattern(search))
+        if genre and genre != 'All':
+            labels = genre_labels(genre)
+            clauses.append('(' + ' OR '.join(["genres LIKE ? ESCAPE '\\'"] * len(labels)) + ')')
+            params.extend(_like_pattern(label) for label in labels)
+        for column, (low, high) in ranges.items():
+            if low is not None:
+                clauses.append(f'{column} >= ?')
+                params.append(low)
+            if high is not None:
+                clauses.append(f'{column} <= ?')
+                params.append(high)
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def count(self, search='', genre='', ranges=None):
+        where, params = self._where(search, genre, ranges or {})
+        return self._conn().execute(f'SELECT COUNT(*) FROM movies{where}', params).fetchone()[0]
+
+    def query(self, search='', genre='', ranges=None, sort='popularity.desc', offset=0, limit=None,
+              columns=None):
+        """Matching rows as dicts in sort order (ties by row position), from `offset`"""
+        where, params = self._where(search, genre, ranges or {})
+        order = f'{SORT_COLUMNS[sort]} DESC, rowid' if sort in SORT_COLUMNS else 'rowid'
+        sql = f'SELECT {columns or self.SUMMARY} FROM movies{where} ORDER BY {order} LIMIT ? OFFSET ?'
+        return self._rows(sql, params + [-1 if limit is None else limit, offset])
+
+    def find(self, movie_id):
+        """Every column of the first row with `movie_id`, or None"""
+        return next(self._rows(f'SELECT {", ".join(_quoted(c) for c in self.COLUMNS)} FROM movies '
+                               f'WHERE id = ? ORDER BY rowid LIMIT 1', [movie_id]), None)
+
+    def first_by_titles(self, titles_lower):
+        """{lowercased title: summary row of its first browse entry} for the titles present"""
+        if not titles_lower:
+            return {}
+        placeholders = ', '.join('?' * len(titles_lower))
+        rows = {}
+        for row in self._rows(f'SELECT title_lower, {self.SUMMARY} FROM movies WHERE title_lower IN ({placeholders}) '
+                              f'ORDER BY rowid', list(titles_lower)):
+            rows.setdefault(row.pop('title_lower'), row)
+        return rows
+
+    def heap_bytes(self):
+        return 0
+
+    def mapped_bytes(self):
+        return os.path.getsize(self.path)
+
+
+def genre_labels(genre):
+    """Labels a genre filter matches: the genre itself plus its GENRE_ALIASES"""
+    for labels in GENRE_ALIASES:
+        if genre.lower() in (label.lower() for label in labels):
+            return labels
+    return [genre]
+
+
+def _quoted(column):
+    return f'"{column}"'
+
+
+def _catalog_records(chunk, columns):
+    """Database rows from a movies.csv chunk preprocessed by prepare_movies()"""
+    frame = chunk.assign(title_lower=chunk['title'].astype(str).str.lower(),
+                         release_date=chunk['release_date'].dt.strftime('%Y-%m-%d'))
+    frame = frame[columns].astype(object)
+    return frame.where(frame.notna(), None).itertuples(index=False, name=None)
+
+
+def file_key(path):
+    """Short key identifying a file's current contents by path, size and mtime"""
+    stat = os.stat(path)
+    return hashlib.sha1(f'{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}'.encode()).hexdigest()[:12]
+
+
+def compact_movies_frame(df):
+    """Shrink a preprocessed browse frame: served columns only, narrow dtypes, categorical strings"""
+    df = df[[c for c in SERVED_COLUMNS + ['year'] if c in df.columns]].reset_index(drop=True)
+    df['id'] = pd.to_numeric(df['id'], errors='coerce').fillna(0).astype(np.int32)
+    # float32 rather than int16 so undated movies keep NaN and stay out of year ranges
+    df['year'] = df['year'].astype(np.float32)
+    # vote_average stays float64: it is served as-is and float32 would print as 7.300000190734863
+    df['popularity'] = df['popularity'].astype(np.float32)
+    if 'runtime' in df.columns:
+        df['runtime'] = pd.to_numeric(df['runtime'], errors='coerce').astype(np.float32)
+    for column in ('genres', 'director'):
+        if column in df.columns:
+            # '' must be a category so the handlers' fillna('') keeps working
+            df[column] = df[column].fillna('').astype('category')
+            if '' not in df[column].cat.categories:
+                df[column] = df[column].cat.add_categories('')
+    return df
+
+
+def compact_main_frame(df):
+    """Recommender metadata after vectorization: repeated names become categories, `comb` is dropped"""
+    df = df.drop(columns=['comb'], errors='ignore')
+    for column in ('director_name', 'actor_1_name', 'actor_2_name', 'actor_3_name', 'genres'):
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+
+def object_bytes(obj):
+    """Approximate heap bytes held by an artifact (DataFrame, ndarray, sparse matrix, dict, or anything with heap_bytes())"""
+    if obj is None:
+        return 0
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, np.memmap):
+        return 0
+    if isinstance(obj, np.ndarray):
+        return 0 if isinstance(obj.base, np.memmap) else int(obj.nbytes)
+    if hasattr(obj, 'indptr'):
+        return int(obj.data.nbytes + obj.indices.nbytes + obj.indptr.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(sys.getsizeof(k) + (v.heap_bytes() if isinstance(v, SortedColumnIndex)
+                                                            else sys.getsizeof(v)) for k, v in obj.items())
+    if hasattr(obj, 'heap_bytes'):
+        # ColdTextStore, CatalogDB, SortedColumnIndex and the compiled sentiment model
+        return obj.heap_bytes()
+    return sys.getsizeof(obj)
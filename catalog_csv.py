@@ -0,0 +1,115 @@
+"""
+Schema-typed, chunked reads of the catalog CSVs.
+
+Every loader of main_data.csv and movies.csv goes through read_catalog(): only
+the columns in the file's schema are parsed (`usecols`), each with an explicit
+dtype so pandas never infers types or holds a column as Python objects first,
+and rows arrive in chunks that are converted as they stream in. Unused
+columns (budget, keywords, vote_count, ...) never reach memory.
+
+Only converted chunks are kept, and they are joined one column at a time, each
+chunk's copy released as its column is built. A `convert` that compacts or
+drops columns therefore bounds the peak at the converted frame plus one raw
+chunk and one column; without one the peak is about the typed frame itself.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Rows parsed per chunk
+CHUNK_ROWS = int(os.environ.get('CSV_CHUNK_ROWS', 10000))
+
+# main_data.csv: recommender metadata and the `comb` text the vectorizer reads
+MAIN_DATA_SCHEMA = {
+    'director_name': 'str',
+    'actor_1_name': 'str',
+    'actor_2_name': 'str',
+    'actor_3_name': 'str',
+    'genres': 'str',
+    'movie_title': 'str',
+    'comb': 'str',
+}
+
+# movies.csv: the columns the browse API serves (catalog.SERVED_COLUMNS);
+# release_date is parsed by prepare_movies()
+MOVIES_SCHEMA = {
+    'id': 'float64',
+    'title': 'str',
+    'genres': 'str',
+    'release_date': 'str',
+    'vote_average': 'float64',
+    'popularity': 'float64',
+    'runtime': 'float64',
+    'director': 'str',
+    'overview': 'str',
+    'tagline': 'str',
+    'cast': 'str',
+}
+
+
+def iter_catalog(path, schema, convert=None, chunk_rows=CHUNK_ROWS):
+    """Yield chunks of `path` holding the schema's columns, typed, each passed through `convert`.
+
+    Schema columns missing from the file come back empty (all NaN) rather than failing the read.
+    """
+    with pd.read_csv(path, usecols=lambda column: column in schema, dtype=schema, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            missing = {column: dtype for column, dtype in schema.items() if column not in chunk.columns}
+            if missing:
+                chunk = chunk.reindex(columns=list(chunk.columns) + list(missing)).astype(missing)
+            yield convert(chunk) if convert is not None else chunk
+
+
+def read_catalog(path, schema, convert=None, chunk_rows=CHUNK_ROWS):
+    """The whole file as one frame, built from iter_catalog() chunks"""
+    chunks = list(iter_catalog(path, schema, convert, chunk_rows))
+    if not chunks:
+        return pd.DataFrame(columns=list(schema))
+    if len(chunks) == 1:
+        return chunks[0].reset_index(drop=True)
+    return pd.DataFrame({column: concat_column([chunk.pop(column) for chunk in chunks])
+                         for column in list(chunks[0].columns)})
+
+
+def concat_column(parts):
+    """One column from its per-chunk pieces, copied into a single pre-sized array.
+
+    Categorical pieces are merged with union_categoricals so chunks with
+    different categories stay categorical.
+    """
+    dtype = parts[0].dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return pd.Series(union_categoricals(parts, sort_categories=True))
+    if not isinstance(dtype, np.dtype) or any(part.dtype != dtype for part in parts):
+        return pd.concat(parts, ignore_index=True)
+    values = np.empty(sum(len(part) for part in parts), dtype=dtype)
+    start = 0
+    for part in parts:
+        values[start:start + len(part)] = part.to_numpy()
+        start += len(part)
+    return pd.Series(values)
+
+
+def prepare_movies(chunk):
+    """Browse preprocessing of a movies.csv chunk: parsed dates, year, and blanks for missing values.
+
+    Missing ids become 0, as in the compact catalog and the catalog links. A
+    missing year or rating stays NaN, so range filters never match it; responses
+    still show it as 0.
+    """
+    chunk['id'] = chunk['id'].fillna(0).astype(np.int64)
+    chunk['release_date'] = pd.to_datetime(chunk['release_date'], errors='coerce')
+    chunk['year'] = chunk['release_date'].dt.year.astype(np.float64)
+    chunk['popularity'] = chunk['popularity'].fillna(0)
+    chunk['genres'] = chunk['genres'].fillna('')
+    return chunk
+
+
+def read_main_data(path, chunk_rows=CHUNK_ROWS):
+    return read_catalog(path, MAIN_DATA_SCHEMA, chunk_rows=chunk_rows)
+
+
+def read_movies(path, chunk_rows=CHUNK_ROWS):
+    return read_catalog(path, MOVIES_SCHEMA, prepare_movies, chunk_rows)
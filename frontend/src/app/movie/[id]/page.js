@@ -4,7 +4,7 @@ import React, { useState, useEffect, use } from 'react'
 import { Star, Calendar, Clock, Play, Heart, Share2, ArrowLeft, Check } from 'lucide-react'
 import { useRouter } from 'next/navigation'
 import { motion } from 'framer-motion'
-import { getMovieDetails, getRecommendations, searchMovieByTitle } from '@/services/api'
+import { getMovieFull } from '@/services/api'
 import MovieCard from '@/components/MovieCard'
 import { cn } from '@/lib/utils'
 import { useAuth } from '@/context/AuthContext'
@@ -57,9 +57,10 @@ export default function MovieDetailsPage({ params }) {
     const fetchData = async () => {
         setLoading(true);
         try {
-            // 1. Get Details
-            const details = await getMovieDetails(id);
+            // 1. Details, recommendations and posters in one round trip
+            const { recommendations: recs = [], ...details } = await getMovieFull(id, 6);
             setMovie(details);
+            setRecommendations(recs.filter(rec => rec.id));
 
             // 2. Add to recents
             if (details) {
@@ -73,47 +74,6 @@ export default function MovieDetailsPage({ params }) {
                 };
                 addToRecents(user?.uid || null, recentMovie);
             }
-
-            // 3. Get Recommendations based on title
-            if (details.title) {
-                try {
-                    const recData = await getRecommendations(details.title);
-                    if (recData.movies && recData.posters && recData.movies.length > 0) {
-                        // Fetch full movie details for each recommendation to get proper IDs and ratings
-                        const recPromises = recData.movies.slice(0, 6).map(async (title) => {
-                            try {
-                                const movieDetails = await searchMovieByTitle(title);
-                                if (movieDetails && movieDetails.id && !isNaN(parseInt(movieDetails.id))) {
-                                    // Only return valid movies with real IDs
-                                    return {
-                                        id: movieDetails.id,
-                                        title: movieDetails.title,
-                                        poster_path: movieDetails.poster_path || movieDetails.poster,
-                                        poster: movieDetails.poster_path || movieDetails.poster,
-                                        vote_average: movieDetails.vote_average || movieDetails.rating,
-                                        rating: movieDetails.vote_average || movieDetails.rating,
-                                        year: movieDetails.year,
-                                        genre: movieDetails.genre || 'Recommended'
-                                    };
-                                }
-                            } catch (err) {
-                                // Silently skip failed recommendation fetches
-                            }
-                            // Return null for failed fetches - filtered out later
-                            return null;
-                        });
-                        
-                        const recs = await Promise.all(recPromises);
-                        // Filter out null values (failed fetches) - only show valid movies
-                        const validRecs = recs.filter(rec => rec !== null);
-                        setRecommendations(validRecs);
-                    }
-                } catch (err) {
-                    // Silently fail - recommendations are optional
-                    // Error is already logged in the API service
-                    setRecommendations([]);
-                }
-            }
         } catch (err) {
             console.error(err);
             setError("Failed to monitor transmission.");
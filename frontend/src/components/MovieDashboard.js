@@ -6,7 +6,7 @@ import { motion, AnimatePresence } from 'framer-motion'
 import MovieCard from '@/components/MovieCard'
 import MovieCardSkeleton from '@/components/MovieCardSkeleton'
 import MovieRow from '@/components/MovieRow'
-import { getSuggestions, getMovies, getRecommendations, searchMovieByTitle } from '@/services/api'
+import { getSuggestions, getMovies, getHomeRows, getRecommendations, getProfileRecommendations, searchMovieByTitle } from '@/services/api'
 import { cn } from '@/lib/utils'
 import { useAuth } from '@/context/AuthContext'
 import { getRecents, getLastViewed } from '@/lib/recents'
@@ -63,6 +63,8 @@ export default function MovieDashboard({
     const [hasRecents, setHasRecents] = useState(false)
     const [loadingRecents, setLoadingRecents] = useState(true)
     const [loadingRecs, setLoadingRecs] = useState(true)
+    const [homeRows, setHomeRows] = useState(null)
+    const [homeRowsPending, setHomeRowsPending] = useState(mode === 'home')
     const dropdownRef = useRef(null)
     const recentsRowRef = useRef(null)
     const recsRowRef = useRef(null)
@@ -90,6 +92,15 @@ export default function MovieDashboard({
         return () => document.removeEventListener('mousedown', handleClickOutside);
     }, []);
 
+    // All category rows in one request; on failure each row falls back to its own query
+    useEffect(() => {
+        if (mode !== 'home') return;
+        getHomeRows(['action', 'top_rated', 'sci_fi'])
+            .then(rows => setHomeRows(Object.fromEntries(rows.map(row => [row.key, row.movies]))))
+            .catch(() => setHomeRows(null))
+            .finally(() => setHomeRowsPending(false));
+    }, [mode]);
+
     // Load recents and smart recommendations
     useEffect(() => {
         if (mode === 'home') {
@@ -108,11 +119,14 @@ export default function MovieDashboard({
             setHasRecents(recentMovies.length > 0);
             setLoadingRecents(false);
 
-            // Load smart recommendations based on last viewed
+            // Load smart recommendations from the whole watch history (falls back to last viewed)
             const lastViewed = await getLastViewed(user?.uid || null);
-            if (lastViewed?.title) {
+            const likedTitles = recentMovies.map(movie => movie.title).filter(Boolean);
+            if (lastViewed?.title || likedTitles.length > 0) {
                 try {
-                    const recData = await getRecommendations(lastViewed.title);
+                    const recData = likedTitles.length > 1
+                        ? await getProfileRecommendations(likedTitles)
+                        : await getRecommendations(lastViewed?.title || likedTitles[0]);
                     if (recData.movies && recData.posters && recData.movies.length > 0) {
                         // Fetch full movie details for each recommendation to get proper IDs and ratings
                         const recPromises = recData.movies.slice(0, 10).map(async (title, i) => {
@@ -403,9 +417,9 @@ export default function MovieDashboard({
                         )}
 
                         {/* Category Rows - Always show */}
-                        <MovieRow title="Action Hits" params={{ genre: 'Action' }} mockData={MOCK_MOVIES.filter(m => m.genre === 'Action')} />
-                        <MovieRow title="Trending Now" params={{ sort: 'vote_average.desc' }} mockData={MOCK_MOVIES.slice(5, 13)} />
-                        <MovieRow title="Sci-Fi Adventures" params={{ genre: 'Sci-Fi' }} mockData={MOCK_MOVIES.filter(m => m.genre === 'Sci-Fi')} />
+                        <MovieRow title="Action Hits" params={{ genre: 'Action' }} movies={homeRows?.action} pending={homeRowsPending} mockData={MOCK_MOVIES.filter(m => m.genre === 'Action')} />
+                        <MovieRow title="Trending Now" params={{ sort: 'vote_average.desc' }} movies={homeRows?.top_rated} pending={homeRowsPending} mockData={MOCK_MOVIES.slice(5, 13)} />
+                        <MovieRow title="Sci-Fi Adventures" params={{ genre: 'Sci-Fi' }} movies={homeRows?.sci_fi} pending={homeRowsPending} mockData={MOCK_MOVIES.filter(m => m.genre === 'Sci-Fi')} />
                     </div>
                 ) : (
                     <>
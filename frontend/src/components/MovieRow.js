@@ -18,12 +18,20 @@ const DEFAULT_MOCK = [
 
 const SKELETON_COUNT = 6; // Number of skeleton cards to show while loading
 
-export default function MovieRow({ title, params, mockData }) {
+// `movies` lets a parent pass a row it already fetched (e.g. from /api/rows); while `pending`
+// is set the parent is still fetching, and without either the row queries /api/movies itself
+export default function MovieRow({ title, params, mockData, movies: preloaded, pending }) {
     const [movies, setMovies] = useState([])
     const [loading, setLoading] = useState(true)
     const rowRef = useRef(null)
 
     useEffect(() => {
+        if (pending) return
+        if (preloaded) {
+            setMovies(preloaded.length > 0 ? preloaded : (mockData || DEFAULT_MOCK))
+            setLoading(false)
+            return
+        }
         setLoading(true)
         getMovies({ ...params, limit: 15 }).then(data => {
             if (data.movies && data.movies.length > 0) {
@@ -37,7 +45,7 @@ export default function MovieRow({ title, params, mockData }) {
         }).finally(() => {
             setLoading(false)
         })
-    }, [title, params, mockData])
+    }, [title, params, mockData, preloaded, pending])
 
     const scroll = (direction) => {
         if (rowRef.current) {
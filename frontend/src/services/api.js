@@ -32,6 +32,16 @@ export const getMovies = async (params) => {
     }
 };
 
+export const getHomeRows = async (rowKeys, limit = 15) => {
+    try {
+        const response = await api.get('/api/rows', { params: { rows: rowKeys.join(','), limit } });
+        return response.data.rows;
+    } catch (error) {
+        console.error("Error fetching home rows:", error);
+        throw error;
+    }
+};
+
 export const getMovieDetails = async (id) => {
     try {
         const response = await api.get(`/api/movie/${id}`);
@@ -42,9 +52,21 @@ export const getMovieDetails = async (id) => {
     }
 };
 
-export const getRecommendations = async (movieTitle) => {
+export const getMovieFull = async (id, limit = 10) => {
+    try {
+        const response = await api.get(`/api/movie/${id}/full`, { params: { limit } });
+        return response.data;
+    } catch (error) {
+        console.error(`Error fetching movie page for ${id}:`, error);
+        throw error;
+    }
+};
+
+export const getRecommendations = async (movieTitle, { deferPosters = false } = {}) => {
     try {
-        const response = await api.post('/recommend', { movie_title: movieTitle });
+        const body = { movie_title: movieTitle };
+        if (deferPosters) body.posters = 'deferred';
+        const response = await api.post('/recommend', body);
         return response.data;
     } catch (error) {
         // Log detailed error information
@@ -57,6 +79,41 @@ export const getRecommendations = async (movieTitle) => {
     }
 };
 
+// Resolve posters for [{ title, id }] in one call (e.g. the null posters of a deferred /recommend)
+export const getPosters = async (movies) => {
+    try {
+        const response = await api.post('/api/posters', { movies });
+        return response.data.posters;
+    } catch (error) {
+        console.error("Error fetching posters:", error);
+        throw error;
+    }
+};
+
+export const getBatchRecommendations = async (movieTitles, limit = 10) => {
+    try {
+        const response = await api.post('/recommend/batch', { titles: movieTitles, limit });
+        return response.data.results;
+    } catch (error) {
+        console.error("Error fetching batch recommendations:", error.message || error);
+        throw error;
+    }
+};
+
+export const getProfileRecommendations = async (liked, disliked = [], limit = 10) => {
+    try {
+        const response = await api.post('/recommend/profile', { liked, disliked, limit });
+        return response.data;
+    } catch (error) {
+        if (error.response?.status === 404) {
+            console.warn("None of the profile titles are in the recommendation database");
+        } else {
+            console.error("Error fetching profile recommendations:", error.message || error);
+        }
+        throw error;
+    }
+};
+
 export const searchMovieByTitle = async (title) => {
     try {
         const response = await api.get('/api/movies', { 
@@ -0,0 +1,123 @@
+"""
+Content-addressed on-disk cache for proxied poster images.
+
+Image bytes are stored once per SHA-256 digest under objects/, and each
+upstream key (e.g. "w185/abc.jpg") points at its digest through a small file
+under refs/, so identical images are stored once and the digest doubles as a
+strong ETag. Everything lives in files, so every worker process serving the
+same directory shares one cache. When the objects exceed `max_bytes`, the least
+recently used ones (by mtime, bumped on every hit) are deleted together with
+the refs pointing at them. A ref that outlives its object (written while an
+eviction was running) reads as a miss and is rewritten by the next fetch.
+"""
+import hashlib
+import os
+import threading
+
+# Eviction deletes down to this share of max_bytes, so it doesn't run on every insert
+LOW_WATER = 0.9
+
+
+class ImageCache:
+    """Size-bounded, content-addressed image files shared across processes"""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'refs'), exist_ok=True)
+        self._bytes = sum(size for _, size, _ in self._objects())
+
+    def object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2], digest)
+
+    def _ref_path(self, key):
+        return os.path.join(self.directory, 'refs', hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def _refs(self):
+        """(path, digest) of every ref"""
+        root = os.path.join(self.directory, 'refs')
+        for name in os.listdir(root):
+            if name.endswith('.tmp'):
+                continue
+            path = os.path.join(root, name)
+            try:
+                with open(path, encoding='utf-8') as f:
+                    yield path, f.read().split('\n', 1)[0]
+            except FileNotFoundError:
+                continue
+
+    def _objects(self):
+        """(path, size, mtime) of every stored object"""
+        root = os.path.join(self.directory, 'objects')
+        for prefix in os.listdir(root):
+            for name in os.listdir(os.path.join(root, prefix)):
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, prefix, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue # Evicted by another worker
+                yield path, stat.st_size, stat.st_mtime
+
+    def get(self, key):
+        """(digest, content type) for `key`, or None; a hit marks the object recently used"""
+        try:
+            with open(self._ref_path(key), encoding='utf-8') as f:
+                digest, content_type = f.read().split('\n', 1)
+            os.utime(self.object_path(digest))
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            return None # Half-written ref from a crashed writer
+        return digest, content_type
+
+    def put(self, key, data, content_type):
+        """Store `data` for `key`; returns its digest"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_atomic(path, data)
+            with self._lock:
+                self._bytes += len(data)
+        _write_atomic(self._ref_path(key), f'{digest}\n{content_type}'.encode('utf-8'))
+        if self._bytes > self.max_bytes:
+            self.evict()
+        return digest
+
+    def evict(self):
+        """Delete least recently used objects and their refs until the cache is under LOW_WATER x max_bytes"""
+        with self._lock:
+            objects = sorted(self._objects(), key=lambda item: item[2])
+            total = sum(size for _, size, _ in objects)
+            evicted = set()
+            for path, size, _ in objects:
+                if total <= self.max_bytes * LOW_WATER:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                evicted.add(os.path.basename(path))
+                total -= size
+            for path, digest in self._refs():
+                if digest in evicted:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+            # Recounted from disk, so bytes written by other workers are accounted for too
+            self._bytes = total
+
+    def stats(self):
+        return {'bytes': self._bytes, 'max_bytes': self.max_bytes}
+
+
+def _write_atomic(path, data):
+    tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Incremental catalog ingestion.
+Sends new movies to a running backend's /admin/ingest endpoint, which appends
+them to main_data.csv and folds them into the recommender without a restart.
+
+Usage:
+    ADMIN_TOKEN=... python ingest_movies.py new_releases.csv --url http://localhost:5000
+
+The input file is a CSV or JSON list with the main_data.csv columns
+(movie_title, director_name, actor_1_name, actor_2_name, actor_3_name, genres).
+"""
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+import requests
+
+
+def load_movies(path):
+    """Read new movie records from a CSV or JSON file"""
+    if path.lower().endswith('.json'):
+        with open(path, 'r') as f:
+            movies = json.load(f)
+        return movies.get('movies', []) if isinstance(movies, dict) else movies
+    df = pd.read_csv(path, dtype=str).fillna('')
+    return df.to_dict(orient='records')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append new movies to the recommender catalog")
+    parser.add_argument('path', help="CSV or JSON file with the new movies")
+    parser.add_argument('--url', default=os.environ.get('BACKEND_URL', 'http://localhost:5000'),
+                        help="Base URL of the running backend")
+    parser.add_argument('--token', default=os.environ.get('ADMIN_TOKEN'),
+                        help="Admin token (defaults to $ADMIN_TOKEN)")
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help="Movies sent per request")
+    args = parser.parse_args()
+
+    if not args.token:
+        print("ADMIN_TOKEN is required (set the env var or pass --token)")
+        sys.exit(1)
+
+    movies = load_movies(args.path)
+    added, skipped = 0, 0
+    for start in range(0, len(movies), args.batch_size):
+        batch = movies[start:start + args.batch_size]
+        response = requests.post(f"{args.url.rstrip('/')}/admin/ingest",
+                                 json={'movies': batch},
+                                 headers={'X-Admin-Token': args.token},
+                                 timeout=300)
+        if response.status_code != 200:
+            print(f"✗ Batch starting at {start} failed ({response.status_code}): {response.text}")
+            sys.exit(1)
+        result = response.json()
+        added += len(result['added'])
+        skipped += len(result['skipped'])
+        print(f"✓ Batch {start // args.batch_size + 1}: added {len(result['added'])}, "
+              f"skipped {len(result['skipped'])}, catalog size {result['total']}")
+
+    print(f"\nDone: {added} added, {skipped} skipped")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+In-process metrics for the serving path, exposed in Prometheus text format.
+
+Histograms and counters are plain Python objects keyed by label values; each
+observation is a dict lookup, a bisect and two additions under a lock, so
+recording on the hot path costs on the order of a microsecond. Metrics are
+per process: with several gunicorn workers each one reports its own series.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds, from sub-millisecond lookups to slow upstream calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {value}')
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *label_values):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        for label_values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels, label_values, ("le", le))} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labels, label_values)} {total}')
+            lines.append(f'{self.name}_count{_format_labels(self.labels, label_values)} {count}')
+        return lines
+
+
+REQUEST_LATENCY = Histogram('http_request_duration_seconds',
+                            'Time spent handling a request, by endpoint and status',
+                            ('endpoint', 'method', 'status'))
+STAGE_LATENCY = Histogram('stage_duration_seconds',
+                          'Time spent in each stage of request handling',
+                          ('endpoint', 'stage'))
+POSTER_FETCH_LATENCY = Histogram('poster_fetch_duration_seconds',
+                                 'Time spent in each upstream TMDB poster call',
+                                 ('method',))
+TMDB_REQUESTS = Counter('tmdb_requests_total', 'TMDB API calls by method and outcome', ('method', 'outcome'))
+POSTER_CACHE = Counter('poster_cache_requests_total', 'Poster cache lookups by result', ('result',))
+IMAGE_CACHE = Counter('image_cache_requests_total', 'Poster proxy disk cache lookups by result', ('result',))
+ERRORS = Counter('errors_total', 'Errors caught while handling requests', ('endpoint',))
+ADMISSION = Counter('admission_overload_total', 'Requests over their endpoint concurrency limit by action',
+                    ('endpoint', 'action'))
+
+REGISTRY = [REQUEST_LATENCY, STAGE_LATENCY, POSTER_FETCH_LATENCY, TMDB_REQUESTS, POSTER_CACHE, IMAGE_CACHE, ERRORS,
+            ADMISSION]
+
+
+def render_all():
+    """Serialize every registered metric in Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,259 @@
+"""
+Compact inference path for the review sentiment model.
+
+compile_sentiment() folds the TF-IDF vectorizer and a linear or multinomial
+naive Bayes classifier into one weight vector over the vocabulary, so scoring
+a text is: regex-tokenize, look terms up in a dict, and take a normalized
+sparse dot product in NumPy. Labels are identical to the sklearn pipeline.
+Models trained by train_sentiment.py use a HashingVectorizer instead; their
+terms are hashed the same way sklearn hashes them rather than looked up.
+
+Verify against sklearn and time both paths:
+    python sentiment.py --reviews Artifacts/reviews.txt
+"""
+import argparse
+import functools
+import os
+import pickle
+import re
+import sys
+import time
+import unicodedata
+
+import numpy as np
+from sklearn.utils import murmurhash3_32
+
+ARTIFACTS_DIR = os.environ.get('ARTIFACTS_DIR', os.path.join(os.path.dirname(__file__), 'Artifacts'))
+
+
+def _strip_accents_ascii(text):
+    """sklearn's strip_accents='ascii'"""
+    if text.isascii():
+        return text
+    return unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('ASCII')
+
+
+def _strip_accents_unicode(text):
+    """sklearn's strip_accents='unicode': NFKD, then drop the combining marks"""
+    if text.isascii():
+        return text
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+
+# strip_accents settings the compiled model reproduces; anything else is refused
+ACCENT_STRIPPERS = {None: None, 'ascii': _strip_accents_ascii, 'unicode': _strip_accents_unicode}
+
+
+@functools.lru_cache(maxsize=2 ** 18)
+def _murmur(token):
+    return murmurhash3_32(token, seed=0)
+
+
+def _tfidf_settings(vectorizer):
+    """(idf, norm, sublinear_tf) from a fitted TfidfVectorizer, including pickles from old sklearn"""
+    tfidf = getattr(vectorizer, '_tfidf', vectorizer)
+    idf = getattr(tfidf, 'idf_', None)
+    if idf is None and getattr(tfidf, '_idf_diag', None) is not None:
+        # sklearn < 1.0 kept idf as a sparse diagonal matrix
+        idf = tfidf._idf_diag.diagonal()
+    if not getattr(tfidf, 'use_idf', True) or idf is None:
+        idf = np.ones(len(vectorizer.vocabulary_))
+    return np.asarray(idf, dtype=np.float64).ravel(), getattr(tfidf, 'norm', 'l2'), getattr(tfidf, 'sublinear_tf', False)
+
+
+class CompiledSentiment:
+    """A binary linear text classifier: sign(w . tfidf(text) + b) picks the label.
+
+    `term_weights` is w premultiplied by idf, so only the normalization needs
+    the idf values at scoring time. With `vocabulary=None` terms are hashed
+    into len(term_weights) buckets like sklearn's HashingVectorizer.
+    """
+
+    def __init__(self, vocabulary, term_weights, idf, bias, classes, token_pattern=r'(?u)\b\w\w+\b',
+                 lowercase=True, strip_accents=None, norm='l2', sublinear_tf=False,
+                 stop_words=None, alternate_sign=False):
+        self.vocabulary = vocabulary
+        self.stop_words = frozenset(stop_words or ())
+        self.alternate_sign = alternate_sign
+        self.term_weights = term_weights
+        self.idf = idf
+        self.bias = float(bias)
+        self.classes = np.asarray(classes)
+        self.token_re = re.compile(token_pattern)
+        self.lowercase = lowercase
+        if not isinstance(strip_accents, (str, type(None))) or strip_accents not in ACCENT_STRIPPERS:
+            raise ValueError(f'strip_accents={strip_accents!r} cannot be compiled')
+        self.strip_accents = strip_accents
+        self._strip = ACCENT_STRIPPERS[strip_accents]
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+
+    def _terms(self, text):
+        """Term indices of a text, plus their signs when hashing with alternate_sign"""
+        if self.lowercase:
+            text = text.lower()
+        if self._strip is not None:
+            text = self._strip(text)
+        tokens = self.token_re.findall(text)
+        vocabulary = self.vocabulary
+        if vocabulary is not None:
+            return [vocabulary[token] for token in tokens if token in vocabulary], None
+
+        n_features = len(self.idf)
+        terms, signs = [], []
+        for token in tokens:
+            if token in self.stop_words:
+                continue
+            h = _murmur(token)
+            # abs(-2**31) overflows in sklearn's int32 arithmetic; mirror its result
+            terms.append(abs(h) % n_features if h != -2 ** 31 else (2 ** 31 - 1 - (n_features - 1)) % n_features)
+            signs.append(-1.0 if h < 0 else 1.0)
+        return terms, signs if self.alternate_sign else None
+
+    def decision_function(self, texts):
+        """Signed scores for a list of texts; > 0 means classes[1]"""
+        docs, terms, signs = [], [], []
+        for d, text in enumerate(texts):
+            found, found_signs = self._terms(text)
+            docs.extend([d] * len(found))
+            terms.extend(found)
+            if found_signs is not None:
+                signs.extend(found_signs)
+        n = len(texts)
+        if not terms:
+            return np.full(n, self.bias)
+
+        # Term counts per (doc, term) pair: the sparse tf matrix in coordinate form
+        keys = np.asarray(docs, dtype=np.int64) * len(self.idf) + np.asarray(terms, dtype=np.int64)
+        if signs:
+            keys, inverse = np.unique(keys, return_inverse=True)
+            tf = np.bincount(inverse, np.asarray(signs), minlength=len(keys))
+        else:
+            keys, tf = np.unique(keys, return_counts=True)
+            tf = tf.astype(np.float64)
+        doc, term = np.divmod(keys, len(self.idf))
+        if self.sublinear_tf:
+            tf = np.log(tf) + 1
+        score = np.bincount(doc, tf * self.term_weights[term], minlength=n)
+        if self.norm == 'l2':
+            length = np.sqrt(np.bincount(doc, (tf * self.idf[term]) ** 2, minlength=n))
+        elif self.norm == 'l1':
+            length = np.bincount(doc, np.abs(tf * self.idf[term]), minlength=n)
+        else:
+            length = np.ones(n)
+        # Documents without known terms score as the zero vector, like sklearn
+        return np.divide(score, length, out=np.zeros(n), where=length > 0) + self.bias
+
+    def labels(self, scores):
+        """Class labels for decision_function() scores"""
+        return self.classes[(np.asarray(scores) > 0).astype(int)]
+
+    def predict(self, texts):
+        return self.labels(self.decision_function(texts))
+
+    def heap_bytes(self):
+        """Approximate bytes held by the weight arrays and the vocabulary dict"""
+        size = self.term_weights.nbytes + self.idf.nbytes + self.classes.nbytes
+        if self.vocabulary is not None:
+            size += sys.getsizeof(self.vocabulary) + sum(sys.getsizeof(term) + sys.getsizeof(i)
+                                                         for term, i in self.vocabulary.items())
+        return int(size)
+
+
+def compile_sentiment(clf, vectorizer):
+    """Fold a fitted TfidfVectorizer or a HashingVectorizer + binary linear/NB classifier into a CompiledSentiment"""
+    if getattr(vectorizer, 'analyzer', 'word') != 'word' or tuple(getattr(vectorizer, 'ngram_range', (1, 1))) != (1, 1):
+        raise ValueError('only unigram word analyzers can be compiled')
+    if getattr(vectorizer, 'preprocessor', None) is not None or getattr(vectorizer, 'tokenizer', None) is not None:
+        raise ValueError('custom preprocessors and tokenizers cannot be compiled')
+    if getattr(vectorizer, 'binary', False):
+        raise ValueError('binary term counts are not supported')
+    if len(clf.classes_) != 2:
+        raise ValueError('only binary classifiers can be compiled')
+
+    if hasattr(clf, 'feature_log_prob_'):
+        # Naive Bayes: log P(c) + x . log P(t|c); the label follows the difference of the two classes
+        weights = clf.feature_log_prob_[1] - clf.feature_log_prob_[0]
+        bias = clf.class_log_prior_[1] - clf.class_log_prior_[0]
+    elif hasattr(clf, 'coef_'):
+        weights, bias = np.ravel(clf.coef_), np.ravel(clf.intercept_)[0]
+    else:
+        raise ValueError(f'{type(clf).__name__} is not a linear model')
+
+    if getattr(vectorizer, 'vocabulary_', None) is None and hasattr(vectorizer, 'n_features'):
+        # HashingVectorizer: raw (signed) term counts, normalized, no idf
+        if len(weights) != vectorizer.n_features:
+            raise ValueError('classifier and hashing vectorizer disagree on n_features')
+        return CompiledSentiment(None, np.asarray(weights, dtype=np.float64), np.ones(vectorizer.n_features), bias,
+                                 clf.classes_, token_pattern=vectorizer.token_pattern, lowercase=vectorizer.lowercase,
+                                 strip_accents=vectorizer.strip_accents, norm=vectorizer.norm,
+                                 stop_words=vectorizer.get_stop_words(), alternate_sign=vectorizer.alternate_sign)
+
+    idf, norm, sublinear_tf = _tfidf_settings(vectorizer)
+    # Stop words never reach the vocabulary, so the vocabulary lookup filters them too
+    vocabulary = {term: int(i) for term, i in vectorizer.vocabulary_.items()}
+    return CompiledSentiment(vocabulary, np.asarray(weights, dtype=np.float64) * idf, idf, bias, clf.classes_,
+                             token_pattern=vectorizer.token_pattern, lowercase=vectorizer.lowercase,
+                             strip_accents=vectorizer.strip_accents, norm=norm, sublinear_tf=sublinear_tf)
+
+
+def read_reviews(path):
+    """(labels, texts) from a "label<TAB>text" file"""
+    labels, texts = [], []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            label, _, text = line.rstrip('\n').partition('\t')
+            if text:
+                labels.append(int(label))
+                texts.append(text)
+    return np.array(labels), texts
+
+
+def _reference_pipeline(clf, vectorizer):
+    """The sklearn predict path, patched so pickles from sklearn < 1.0 still transform"""
+    tfidf = getattr(vectorizer, '_tfidf', None)
+    if tfidf is not None and getattr(tfidf, 'idf_', None) is None and getattr(tfidf, '_idf_diag', None) is not None:
+        tfidf.idf_ = np.asarray(tfidf._idf_diag.diagonal()).ravel()
+        tfidf.n_features_in_ = len(tfidf.idf_)
+    return lambda texts: clf.predict(vectorizer.transform(texts))
+
+
+def _per_text_seconds(fn, texts, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn([text])
+    return (time.perf_counter() - started) / (repeat * len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify the compiled sentiment model against sklearn")
+    parser.add_argument('--artifacts', default=ARTIFACTS_DIR)
+    parser.add_argument('--reviews', default=os.path.join(ARTIFACTS_DIR, 'reviews.txt'))
+    parser.add_argument('--timing-texts', type=int, default=500, help="Texts timed one call each")
+    args = parser.parse_args()
+
+    with open(os.path.join(args.artifacts, 'nlp_model.pkl'), 'rb') as f:
+        clf = pickle.load(f)
+    with open(os.path.join(args.artifacts, 'tranform.pkl'), 'rb') as f:
+        vectorizer = pickle.load(f)
+    compiled = compile_sentiment(clf, vectorizer)
+    reference = _reference_pipeline(clf, vectorizer)
+
+    labels, texts = read_reviews(args.reviews)
+    expected = reference(texts)
+    got = compiled.predict(texts)
+    mismatches = int((expected != got).sum())
+    print(f"{len(texts)} reviews: {mismatches} label mismatches vs sklearn, "
+          f"accuracy {float((got == labels).mean()):.4f}")
+
+    sample = texts[:args.timing_texts]
+    sklearn_s = _per_text_seconds(reference, sample, 1)
+    compiled_s = _per_text_seconds(compiled.predict, sample, 3)
+    print(f"per text: sklearn {sklearn_s * 1e6:.1f} us, compiled {compiled_s * 1e6:.1f} us "
+          f"({sklearn_s / compiled_s:.1f}x)")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Similarity neighbour lists for the movie recommender.
+
+Holds the vectorization and top-K math shared by app.py, plus an offline build
+command that computes every movie's neighbours in row blocks on a process pool
+and streams them to disk, so peak memory is proportional to the block size
+rather than N x N:
+
+    python similarity.py --workers 4 --block-size 1024 --k 50
+
+The app loads Artifacts/neighbors.npy and Artifacts/neighbor_scores.npy at
+startup when Artifacts/neighbors.json matches the current main_data.csv, and
+builds them in-process otherwise.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+from catalog_csv import read_main_data
+
+logger = logging.getLogger(__name__)
+
+ARTIFACTS_DIR = os.environ.get('ARTIFACTS_DIR', os.path.join(os.path.dirname(__file__), 'Artifacts'))
+NEIGHBORS_FILE = 'neighbors.npy'
+SCORES_FILE = 'neighbor_scores.npy'
+META_FILE = 'neighbors.json'
+
+
+def vectorize_catalog(comb):
+    """Fit a CountVectorizer on the combined features and L2-normalize the rows.
+
+    With unit-length rows, cosine similarity is a plain sparse dot product.
+    """
+    cv = CountVectorizer()
+    count_matrix = cv.fit_transform(comb)
+    return cv, normalize(count_matrix.astype(np.float64)).tocsr()
+
+
+def catalog_fingerprint(comb):
+    """Hash of the combined-feature column, used to tell if saved neighbours are stale"""
+    digest = hashlib.sha256()
+    for value in comb:
+        digest.update(str(value).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def top_k_rows(block, k, self_rows=None):
+    """Return (indices, scores) of the k highest scores in each row of a dense block.
+
+    `self_rows[r]` is the column holding row r's own movie, which is never returned
+    as its own neighbour. Results are ordered by descending score, then ascending id.
+    """
+    block = np.array(block, dtype=np.float64, copy=True)
+    if self_rows is not None:
+        block[np.arange(block.shape[0]), self_rows] = -np.inf
+    k = min(k, block.shape[1] - (1 if self_rows is not None else 0))
+    if k <= 0:
+        return np.empty((block.shape[0], 0), dtype=np.int32), np.empty((block.shape[0], 0), dtype=np.float32)
+    # The k-th largest score per row; everything above it is in, and ties at the
+    # boundary are filled in ascending column order so results never depend on
+    # argpartition's arbitrary choice among equal scores
+    kth = np.take_along_axis(block, np.argpartition(-block, k - 1, axis=1)[:, k - 1:k], axis=1)
+    above = block > kth
+    ties = block == kth
+    need = k - above.sum(axis=1, keepdims=True)
+    selected = above | (ties & (np.cumsum(ties, axis=1) <= need))
+    idx = np.nonzero(selected)[1].reshape(block.shape[0], k)
+    scores = np.take_along_axis(block, idx, axis=1)
+    order = np.argsort(-scores, axis=1, kind='stable')
+    return np.take_along_axis(idx, order, axis=1).astype(np.int32), np.take_along_axis(scores, order, axis=1).astype(np.float32)
+
+
+def neighbor_block(feats, feats_t, start, stop, k):
+    """Top-k neighbours for rows [start, stop); only this block is ever dense"""
+    block = (feats[start:stop] @ feats_t).toarray()
+    return top_k_rows(block, k, np.arange(start, stop))
+
+
+def build_neighbors(feats, k, block_size=1024):
+    """Compute top-k cosine neighbours for every row of `feats`, one row block at a time"""
+    n = feats.shape[0]
+    nbrs = np.empty((n, min(k, max(n - 1, 0))), dtype=np.int32)
+    scores = np.empty(nbrs.shape, dtype=np.float32)
+    feats_t = feats.T.tocsc()
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        nbrs[start:stop], scores[start:stop] = neighbor_block(feats, feats_t, start, stop, k)
+    return nbrs, scores
+
+
+# Per-process copies of the feature matrix, set once by the pool initializer
+_worker_feats = None
+_worker_feats_t = None
+
+
+def _init_worker(feats):
+    global _worker_feats, _worker_feats_t
+    _worker_feats = feats
+    _worker_feats_t = feats.T.tocsc()
+
+
+def _worker_block(args):
+    start, stop, k = args
+    nbrs, scores = neighbor_block(_worker_feats, _worker_feats_t, start, stop, k)
+    return start, stop, nbrs, scores
+
+
+def _store_block(result, nbrs_out, scores_out):
+    start, stop, block_nbrs, block_scores = result
+    nbrs_out[start:stop] = block_nbrs
+    scores_out[start:stop] = block_scores
+    return stop - start
+
+
+def build_neighbors_to_disk(feats, k, out_dir, fingerprint, block_size=1024, workers=None):
+    """Build neighbour lists on a process pool and stream them into .npy files.
+
+    Blocks are written into memory-mapped output files as they complete, with at
+    most two blocks per worker in flight, so memory stays bounded by the block
+    size. Files are written under temporary names and renamed when complete.
+    Returns the number of rows per second.
+    """
+    n = feats.shape[0]
+    width = min(k, max(n - 1, 0))
+    workers = workers or os.cpu_count() or 1
+    tmp_nbrs = os.path.join(out_dir, NEIGHBORS_FILE + '.tmp')
+    tmp_scores = os.path.join(out_dir, SCORES_FILE + '.tmp')
+    nbrs_out = np.lib.format.open_memmap(tmp_nbrs, mode='w+', dtype=np.int32, shape=(n, width))
+    scores_out = np.lib.format.open_memmap(tmp_scores, mode='w+', dtype=np.float32, shape=(n, width))
+
+    tasks = [(start, min(start + block_size, n), k) for start in range(0, n, block_size)]
+    started = time.perf_counter()
+    done_rows = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(feats,)) as pool:
+        pending = set()
+        for task in tasks:
+            if len(pending) >= 2 * workers:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done_rows += _store_block(future.result(), nbrs_out, scores_out)
+                logger.info(f"{done_rows}/{n} rows ({done_rows / (time.perf_counter() - started):,.0f} rows/sec)")
+            pending.add(pool.submit(_worker_block, task))
+        for future in pending:
+            done_rows += _store_block(future.result(), nbrs_out, scores_out)
+
+    nbrs_out.flush()
+    scores_out.flush()
+    del nbrs_out, scores_out
+    # Drop the old metadata first so a crash mid-swap can never pair it with new arrays
+    meta_path = os.path.join(out_dir, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    os.replace(tmp_nbrs, os.path.join(out_dir, NEIGHBORS_FILE))
+    os.replace(tmp_scores, os.path.join(out_dir, SCORES_FILE))
+    with open(meta_path, 'w') as f:
+        json.dump({'rows': n, 'k': width, 'fingerprint': fingerprint, 'built_at': time.time()}, f)
+    return n / (time.perf_counter() - started)
+
+
+def load_neighbors(out_dir, fingerprint, rows, k):
+    """Memory-map saved neighbour lists if they match the catalog, else return None"""
+    try:
+        with open(os.path.join(out_dir, META_FILE), 'r') as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return None
+    if meta.get('fingerprint') != fingerprint or meta.get('rows') != rows:
+        logger.info("Saved neighbour lists do not match main_data.csv; rebuilding in-process")
+        return None
+    if meta.get('k', 0) < min(k, rows - 1):
+        logger.info(f"Saved neighbour lists keep {meta.get('k')} neighbours, {k} requested; rebuilding in-process")
+        return None
+    nbrs = np.load(os.path.join(out_dir, NEIGHBORS_FILE), mmap_mode='r')[:, :k]
+    scores = np.load(os.path.join(out_dir, SCORES_FILE), mmap_mode='r')[:, :k]
+    return nbrs, scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build recommender neighbour lists in parallel row blocks")
+    parser.add_argument('--data', default=os.path.join(ARTIFACTS_DIR, 'main_data.csv'))
+    parser.add_argument('--out-dir', default=ARTIFACTS_DIR)
+    parser.add_argument('--k', type=int, default=int(os.environ.get('NEIGHBOR_K', 50)),
+                        help="Neighbours kept per movie")
+    parser.add_argument('--block-size', type=int, default=1024, help="Rows scored per task")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    df = read_main_data(args.data)
+    _, feats = vectorize_catalog(df['comb'])
+    logger.info(f"Vectorized {feats.shape[0]} movies over {feats.shape[1]} terms")
+    rate = build_neighbors_to_disk(feats, args.k, args.out_dir, catalog_fingerprint(df['comb']),
+                                   args.block_size, args.workers)
+    print(f"Built neighbour lists for {feats.shape[0]} movies at {rate:,.0f} rows/sec -> {args.out_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.py loads its artifacts at import; point it at an empty directory so tests
+# build the small catalogs they need instead of loading the real ones
+_artifacts = tempfile.mkdtemp(prefix='movie-tests-')
+os.environ.setdefault('ARTIFACTS_DIR', _artifacts)
+os.environ.setdefault('POSTER_CACHE_DIR', os.path.join(_artifacts, 'posters'))
+os.environ.pop('TMDB_API_KEY', None)
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+from similarity import build_neighbors, vectorize_catalog
+
+PEOPLE = ['ann', 'bob', 'cy', 'dee', 'eve', 'fay', 'gus']
+GENRES = ['Action', 'Drama', 'Comedy', 'Horror']
+
+
+def movie(i, rng):
+    actors = rng.choice(PEOPLE, 3, replace=False)
+    return {'director_name': rng.choice(PEOPLE), 'actor_1_name': actors[0], 'actor_2_name': actors[1],
+            'actor_3_name': actors[2], 'genres': rng.choice(GENRES), 'movie_title': f'movie {i}'}
+
+
+@pytest.fixture
+def recommender(monkeypatch):
+    """A 40-movie recommender snapshot, published as app.snapshot for the test"""
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame([app._movie_record(movie(i, rng)) for i in range(40)], columns=app.MAIN_DATA_COLUMNS)
+    cv, feats = vectorize_catalog(df['comb'])
+    nbrs, scores = build_neighbors(feats, 5)
+    snap = app.ArtifactSnapshot(data=df, count_vectorizer=cv, features=feats, neighbors=nbrs,
+                                neighbor_scores=scores, title_index=app.build_title_index(df['movie_title']))
+    monkeypatch.setattr(app, 'snapshot', snap)
+    return rng
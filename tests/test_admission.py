@@ -0,0 +1,41 @@
+import threading
+import time
+
+import app
+
+
+def test_waiter_gets_the_released_slot():
+    limiter = app.AdmissionLimiter(1, 1, wait_ms=2000)
+    assert limiter.acquire()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(limiter.acquire()))
+    waiter.start()
+    time.sleep(0.05)
+    limiter.release()
+    waiter.join(5)
+    assert got == [True]
+
+
+def test_full_queue_is_refused_without_waiting():
+    limiter = app.AdmissionLimiter(1, 1, wait_ms=500)
+    assert limiter.acquire()
+    waiter = threading.Thread(target=limiter.acquire)
+    waiter.start()
+    time.sleep(0.05)
+    started = time.perf_counter()
+    assert not limiter.acquire()
+    assert time.perf_counter() - started < 0.1
+    waiter.join(5)
+
+
+def test_wait_is_bounded():
+    limiter = app.AdmissionLimiter(1, 4, wait_ms=20)
+    assert limiter.acquire()
+    assert not limiter.acquire()
+
+
+def test_limits_parse_over_defaults():
+    limiters = app.build_admission_limiters(' get_movies=2:3, recommend=0 ,extra=1', {'get_movies': (4, 8), 'recommend': (4, 8)}, 50)
+    assert set(limiters) == {'get_movies', 'extra'}
+    assert (limiters['get_movies'].concurrency, limiters['get_movies'].queue_size) == (2, 3)
+    assert limiters['extra'].queue_size == 0
@@ -0,0 +1,71 @@
+import asyncio
+
+import httpx
+import pandas as pd
+import pytest
+
+import app
+import asgi_app
+from catalog import build_range_indexes
+
+
+@pytest.fixture
+def browse_snapshot(monkeypatch):
+    df = pd.DataFrame({
+        'id': [1, 2, 3, 4],
+        'title': ['Alpha', 'Beta', 'Gamma', 'Delta'],
+        'genres': ['Action', 'Drama', 'Action Drama', ''],
+        'release_date': pd.to_datetime(['2001-01-01', None, '1999-01-01', '2010-01-01']),
+        'year': [2001.0, float('nan'), 1999.0, 2010.0],
+        'vote_average': [7.0, 8.0, float('nan'), 5.0],
+        'popularity': [5.0, 40.0, 30.0, 20.0],
+        'runtime': [90.0, 100.0, float('nan'), 80.0],
+        'director': ['A', 'B', 'C', ''],
+        'overview': ['', 'Plot', '', ''],
+        'tagline': ['', '', 'Line', ''],
+        'cast': ['[]', '[]', '[]', '[]'],
+    })
+    monkeypatch.setattr(app, 'snapshot', app.ArtifactSnapshot(movies_data=df, range_indexes=build_range_indexes(df)))
+
+
+def asgi_get(*paths, method='GET'):
+    async def fetch():
+        transport = httpx.ASGITransport(app=asgi_app.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return [await client.request(method, path) for path in paths]
+    return asyncio.run(fetch())
+
+
+PATHS = ['/api/movies?limit=2&page=2', '/api/movies?genre=Drama&sort=vote_average.desc',
+         '/api/movies?format=ndjson&year_min=2000', '/api/movie/2', '/api/movie/99']
+
+
+def test_asgi_matches_flask(browse_snapshot):
+    client = app.app.test_client()
+    for path, response in zip(PATHS, asgi_get(*PATHS)):
+        expected = client.get(path)
+        assert response.status_code == expected.status_code, path
+        assert response.content == expected.data, path
+    assert asgi_get('/api/movies?format=ndjson')[0].headers['x-total-count'] == '4'
+
+
+def test_asgi_unknown_routes_and_methods(browse_snapshot):
+    assert asgi_get('/nope')[0].status_code == 404
+    assert asgi_get('/api/movies', method='POST')[0].status_code == 405
+
+
+def test_asgi_stages_are_labelled_with_the_handler(browse_snapshot):
+    asgi_get('/api/movies?limit=2', '/api/movie/2')
+    lines = app.STAGE_LATENCY.render()
+    for endpoint, name in [('get_movies', 'query'), ('get_movies', 'posters'), ('get_movies', 'serialize'),
+                           ('get_movie_details', 'lookup')]:
+        assert any(f'endpoint="{endpoint}",stage="{name}"' in line for line in lines), (endpoint, name)
+    assert not any('endpoint="none"' in line for line in lines)
+
+
+def test_loaded_components_are_not_loaded_off_the_event_loop(browse_snapshot, monkeypatch):
+    offloaded = []
+    run_cpu = asgi_app.run_cpu
+    monkeypatch.setattr(asgi_app, 'run_cpu', lambda fn, *args: offloaded.append(fn) or run_cpu(fn, *args))
+    assert asgi_get('/api/movie/2')[0].status_code == 200
+    assert app.ensure_loaded not in offloaded
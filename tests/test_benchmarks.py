@@ -0,0 +1,35 @@
+import json
+import os
+import sys
+
+import pytest
+
+from catalog_csv import read_main_data, read_movies
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from run_benchmarks import compare  # noqa: E402
+from synthetic_catalog import generate_catalog  # noqa: E402
+
+
+def test_synthetic_catalog_loads_like_the_real_one(tmp_path):
+    assert generate_catalog(500, str(tmp_path), seed=1, recommender_rows=200) == (200, 500)
+    main = read_main_data(str(tmp_path / 'main_data.csv'))
+    movies = read_movies(str(tmp_path / 'movies.csv'))
+    assert len(main) == 200 and main['comb'].notna().all()
+    assert len(movies) == 500 and movies['id'].is_unique
+    assert 'budget' not in movies.columns
+    # Titles link the two files, as in the shipped artifacts
+    assert set(main['movie_title']) <= set(movies['title'].str.lower())
+
+
+def write_results(path, mean_ms):
+    path.write_text(json.dumps({'catalogs': {'synthetic-500': {'rcmd': {'mean_ms': mean_ms}, 'rows': 500}}}))
+    return str(path)
+
+
+@pytest.mark.parametrize('after_ms, status', [(1.1, 0), (1.5, 1)])
+def test_compare_flags_regressions(tmp_path, capsys, after_ms, status):
+    with pytest.raises(SystemExit) as exit_info:
+        compare(write_results(tmp_path / 'before.json', 1.0), write_results(tmp_path / 'after.json', after_ms), 1.2)
+    assert exit_info.value.code == status
+    assert ('REGRESSION' in capsys.readouterr().out) == bool(status)
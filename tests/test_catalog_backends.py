@@ -0,0 +1,88 @@
+import json
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+from catalog import CatalogDB, build_range_indexes
+from catalog_csv import read_movies
+
+
+@pytest.fixture(scope='module')
+def backends(tmp_path_factory):
+    """The same catalog as a pandas frame (with range indexes) and as a CatalogDB"""
+    rng = np.random.default_rng(7)
+    n = 400
+    dates = pd.Series(pd.date_range('1980-01-01', periods=40, freq='180D').strftime('%Y-%m-%d'))
+    movies = pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'title': [f'Movie {i}' for i in range(n)],
+        'genres': rng.choice(['Action', 'Drama Sci-Fi', 'Comedy', 'Science Fiction'], n),
+        # Few distinct values, so every sort has long runs of ties
+        'release_date': dates.sample(n, replace=True, random_state=1).to_numpy(),
+        'vote_average': rng.choice([5.0, 6.5, 8.0, np.nan], n),
+        'popularity': rng.choice([1.0, 2.0, 3.0], n),
+        'overview': '', 'tagline': '', 'runtime': 100, 'director': 'X', 'cast': '[]',
+    })
+    directory = tmp_path_factory.mktemp('catalog')
+    path = str(directory / 'movies.csv')
+    movies.to_csv(path, index=False)
+    df = read_movies(path)
+    snap = app.ArtifactSnapshot(movies_data=df, range_indexes=build_range_indexes(df))
+    db_snap = app.ArtifactSnapshot(catalog_db=CatalogDB.build(path, str(directory / 'movies.db')))
+    return snap, db_snap
+
+
+@pytest.mark.parametrize('sort', ['popularity.desc', 'vote_average.desc', 'release_date.desc'])
+@pytest.mark.parametrize('extra', [{}, {'genre': 'Sci-Fi'}, {'year_min': '1990', 'rating_max': '7'}])
+def test_backends_page_identically(backends, sort, extra):
+    snap, db_snap = backends
+    for page in (1, 2, 7):
+        args = dict(extra, sort=sort, page=str(page), limit='25')
+        rows, total, _, _ = app.browse_movies(snap, args)
+        db_rows, db_total, _, _ = app.browse_movies(db_snap, args)
+        assert total == db_total
+        assert [int(row['id']) for row in rows] == [int(row['id']) for row in db_rows]
+
+
+def test_ties_keep_csv_order(backends):
+    snap, _ = backends
+    rows, _, _, _ = app.browse_movies(snap, {'sort': 'popularity.desc', 'limit': '100'})
+    top = [(row['popularity'], int(row['id'])) for row in rows]
+    assert top == sorted(top, key=lambda item: (-item[0], item[1]))
+
+
+def ndjson_ids(client, query):
+    response = client.get(f'/api/movies?format=ndjson&{query}')
+    assert response.mimetype == 'application/x-ndjson'
+    return int(response.headers['X-Total-Count']), [json.loads(line)['id'] for line in response.data.splitlines()]
+
+
+@pytest.mark.parametrize('backend', [0, 1])
+def test_ndjson_streams_the_json_pages(backends, monkeypatch, backend):
+    monkeypatch.setattr(app, 'snapshot', backends[backend])
+    client = app.app.test_client()
+    query = 'genre=Sci-Fi&sort=vote_average.desc'
+    pages = [client.get(f'/api/movies?{query}&page={page}&limit=50').get_json() for page in range(1, 8)]
+    every = [movie['id'] for page in pages for movie in page['movies']]
+
+    total, streamed = ndjson_ids(client, query)
+    assert (total, streamed) == (pages[0]['total'], every)
+    assert ndjson_ids(client, f'{query}&page=2&limit=50')[1] == every[50:100]
+    # Pages below 1 read as page 1, as in the JSON response
+    assert ndjson_ids(client, f'{query}&page=0&limit=50')[1] == every[:50]
+
+
+def test_reusing_a_built_database_closes_its_check_connection(tmp_path, monkeypatch):
+    path = str(tmp_path / 'movies.csv')
+    pd.DataFrame({'id': [1], 'title': ['Alpha'], 'genres': ['Drama']}).to_csv(path, index=False)
+    CatalogDB.build(path, str(tmp_path / 'movies.db'))
+    opened = []
+    connect = sqlite3.connect
+    monkeypatch.setattr(sqlite3, 'connect', lambda *args, **kwargs: opened.append(connect(*args, **kwargs)) or opened[-1])
+    CatalogDB.build(path, str(tmp_path / 'movies.db'))
+    assert len(opened) == 1
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute('SELECT 1')
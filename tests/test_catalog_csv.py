@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from catalog import COLD_TEXT_COLUMNS, ColdTextStore, ColdTextWriter, compact_movies_frame
+from catalog_csv import MOVIES_SCHEMA, concat_column, iter_catalog, prepare_movies, read_catalog, read_movies
+
+
+@pytest.fixture
+def movies_csv(tmp_path):
+    rng = np.random.default_rng(2)
+    n = 23
+    pd.DataFrame({
+        'id': [float(i) if i % 7 else np.nan for i in range(n)],
+        'title': [f'Movie {i}' for i in range(n)],
+        'genres': rng.choice(['Action', 'Drama', 'Comedy', ''], n),
+        'release_date': [f'{1990 + i}-01-01' if i % 5 else '' for i in range(n)],
+        'vote_average': rng.choice([5.5, 7.0, np.nan], n),
+        'popularity': rng.random(n),
+        'director': rng.choice(['A', 'B', 'C'], n),
+        'overview': [f'Overview {i} — ünïcode' if i % 3 else '' for i in range(n)],
+        'budget': rng.integers(0, 10 ** 6, n),
+    }).to_csv(tmp_path / 'movies.csv', index=False)
+    return str(tmp_path / 'movies.csv')
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 5, 23, 1000])
+def test_chunk_size_never_changes_the_frame(movies_csv, chunk_rows):
+    pd.testing.assert_frame_equal(read_movies(movies_csv, chunk_rows), read_movies(movies_csv, 1000))
+
+
+def test_only_schema_columns_are_read(movies_csv):
+    df = read_movies(movies_csv, 5)
+    assert 'budget' not in df.columns
+    # runtime, tagline and cast are missing from the file and come back empty
+    assert df[['runtime', 'tagline', 'cast']].isna().all().all()
+    assert df['id'].dtype == np.int64 and df['id'][0] == 0
+    assert df['year'].isna().sum() == 5
+
+
+def test_compacted_chunks_join_as_categories(movies_csv):
+    def compact(chunk):
+        return compact_movies_frame(prepare_movies(chunk))
+
+    chunked = read_catalog(movies_csv, MOVIES_SCHEMA, compact, chunk_rows=4)
+    whole = compact_movies_frame(read_movies(movies_csv))
+    assert isinstance(chunked['genres'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(chunked.astype({'genres': str, 'director': str}),
+                                  whole.astype({'genres': str, 'director': str}))
+
+
+def test_concat_column_fills_one_array():
+    parts = [pd.Series([1.0, 2.0]), pd.Series([3.0]), pd.Series([], dtype=np.float64)]
+    assert concat_column(parts).tolist() == [1.0, 2.0, 3.0]
+    mixed = concat_column([pd.Series([1], dtype=np.int64), pd.Series([2.5])])
+    assert mixed.tolist() == [1.0, 2.5]
+
+
+def test_streamed_cold_text_matches_a_whole_frame_build(movies_csv, tmp_path):
+    streamed = tmp_path / 'streamed'
+    whole = tmp_path / 'whole'
+    streamed.mkdir()
+    whole.mkdir()
+    writer = ColdTextWriter(COLD_TEXT_COLUMNS, str(streamed), 'k1')
+    for chunk in iter_catalog(movies_csv, MOVIES_SCHEMA, prepare_movies, chunk_rows=4):
+        writer.add(chunk)
+    store = writer.close()
+    reference = ColdTextStore.build(read_movies(movies_csv), COLD_TEXT_COLUMNS, str(whole), 'k1')
+
+    assert (streamed / 'movies_text-k1.bin').read_bytes() == (whole / 'movies_text-k1.bin').read_bytes()
+    assert store.get('overview', 4) == 'Overview 4 — ünïcode'
+    assert store.get('overview', 3) == '' and store.get('cast', 22) == ''
+    assert sorted(p.name for p in streamed.iterdir()) == ['movies_text-k1.bin', 'movies_text-k1.npy']
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+
+ARGS = [{}, {'genre': 'Drama'}, {'sort': 'vote_average.desc'}, {'search': 'movie 1'}, {'year_min': '2000'}]
+
+
+@pytest.fixture
+def snapshots(tmp_path, monkeypatch):
+    """The same movies.csv loaded normally and in compact mode"""
+    rng = np.random.default_rng(4)
+    n = 30
+    pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'title': [f'Movie {i}' for i in range(n)],
+        'genres': rng.choice(['Action Drama', 'Drama', 'Comedy', np.nan], n),
+        'release_date': [f'{1990 + i}-06-01' if i % 4 else '' for i in range(n)],
+        'vote_average': rng.choice([5.5, 7.25, np.nan], n),
+        'popularity': rng.random(n),
+        'runtime': rng.choice([90.0, 120.0, np.nan], n),
+        'director': rng.choice(['A', 'B', np.nan], n),
+        'overview': [f'Plot of movie {i}' if i % 3 else '' for i in range(n)],
+        'tagline': [f'Tagline {i}' for i in range(n)],
+        'cast': '["X", "Y"]',
+    }).to_csv(tmp_path / 'movies.csv', index=False)
+    monkeypatch.setattr(app, 'MOVIES_DATA_PATH', str(tmp_path / 'movies.csv'))
+    monkeypatch.setattr(app, 'ARTIFACTS_DIR', str(tmp_path))
+
+    loaded = {}
+    for compact in (False, True):
+        monkeypatch.setattr(app, 'COMPACT_CATALOG', compact)
+        loaded[compact] = app.ArtifactSnapshot(**app.load_browsing_data())
+    return loaded[False], loaded[True]
+
+
+def listing(snap, args):
+    rows, total, _, _ = app.query_movies(snap.movies_data, args, snap.range_indexes)
+    return total, [app.movie_summary(row, None) for _, row in rows.iterrows()]
+
+
+def test_compact_catalog_serves_the_same_responses(snapshots):
+    full, compact = snapshots
+    assert compact.movie_text is not None and 'overview' not in compact.movies_data.columns
+    for args in ARGS:
+        assert listing(compact, args) == listing(full, args)
+    for movie_id in range(1, 31):
+        assert app.movie_detail(app.find_movie(compact, movie_id), None) == app.movie_detail(app.find_movie(full, movie_id), None)
+
+
+def test_memory_report_counts_mapped_text(snapshots, monkeypatch):
+    _, compact = snapshots
+    monkeypatch.setattr(app, 'snapshot', compact)
+    monkeypatch.setattr(app, 'ADMIN_TOKEN', 'secret')
+    client = app.app.test_client()
+    assert client.get('/admin/memory').status_code == 403
+    report = client.get('/admin/memory', headers={'X-Admin-Token': 'secret'}).get_json()
+    assert report['structures']['movie_text'] == {'heap_bytes': 0, 'mapped_bytes': compact.movie_text.mapped_bytes()}
+    assert report['structures']['movies_data']['rows'] == 30
@@ -0,0 +1,42 @@
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from fake_tmdb import UpstreamBehaviour, start_server  # noqa: E402
+
+
+@pytest.fixture
+def fake_tmdb():
+    server, behaviour = start_server(behaviour=UpstreamBehaviour(latency_ms=0, jitter_ms=0))
+    yield f'http://127.0.0.1:{server.server_address[1]}', behaviour
+    server.shutdown()
+
+
+def test_serves_the_endpoints_fetch_poster_uses(fake_tmdb):
+    base, behaviour = fake_tmdb
+    with urllib.request.urlopen(f'{base}/3/movie/42') as response:
+        assert json.load(response) == {'id': 42, 'poster_path': '/42.jpg'}
+    with urllib.request.urlopen(f'{base}/3/search/movie?query=Up') as response:
+        assert json.load(response)['results'][0]['title'] == 'Up'
+    with urllib.request.urlopen(f'{base}/t/p/w185/42.jpg') as response:
+        assert response.headers['Content-Type'] == 'image/jpeg' and response.read().startswith(b'\xff\xd8')
+    with pytest.raises(urllib.error.HTTPError) as missing:
+        urllib.request.urlopen(f'{base}/3/nothing')
+    assert missing.value.code == 404
+    assert behaviour.requests == 4
+
+
+def test_rate_limit_is_a_token_bucket():
+    behaviour = UpstreamBehaviour(latency_ms=0, jitter_ms=0, rate_limit=3)
+    assert [behaviour.admit() for _ in range(4)] == [200, 200, 200, 429]
+
+
+def test_error_rate_is_seeded():
+    runs = [[behaviour.admit() for _ in range(20)]
+            for behaviour in (UpstreamBehaviour(0, 0, 0.5, seed=9), UpstreamBehaviour(0, 0, 0.5, seed=9))]
+    assert runs[0] == runs[1] and set(runs[0]) == {200, 500}
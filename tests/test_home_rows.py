@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+import app
+from catalog import build_range_indexes
+
+
+@pytest.fixture
+def browse_snapshot(monkeypatch):
+    df = pd.DataFrame({
+        'id': [1, 2, 3, 4, 5],
+        'title': ['Alpha', 'Beta', 'Gamma', 'Delta', 'Epsilon'],
+        'genres': ['Science Fiction', 'Action Sci-Fi', 'Drama', 'Action', 'Comedy Drama'],
+        'release_date': pd.to_datetime(['2001-01-01', '2005-01-01', '1999-01-01', '2010-01-01', '2003-01-01']),
+        'year': [2001.0, 2005.0, 1999.0, 2010.0, 2003.0],
+        'vote_average': [7.0, 8.0, 6.0, 5.0, 9.0],
+        'popularity': [50.0, 40.0, 30.0, 20.0, 10.0],
+    })
+    snap = app.ArtifactSnapshot(movies_data=df, range_indexes=build_range_indexes(df))
+    snap = snap.replace(home_rows=app.build_home_rows(snap))
+    monkeypatch.setattr(app, 'snapshot', snap)
+    return snap
+
+
+def test_rows_are_the_browse_queries(browse_snapshot):
+    rows = browse_snapshot.home_rows
+    for key, _, params in app.HOME_ROWS:
+        results, total, _, _ = app.browse_movies(browse_snapshot, dict(params, limit=app.HOME_ROW_LENGTH))
+        if total:
+            assert [movie['id'] for movie in rows[key]['movies']] == [int(row['id']) for row in results]
+        else:
+            assert key not in rows
+    # Both spellings of the genre land in the Sci-Fi row
+    assert [movie['title'] for movie in rows['sci_fi']['movies']] == ['Alpha', 'Beta']
+    assert [movie['title'] for movie in rows['top_rated']['movies']][:2] == ['Epsilon', 'Beta']
+
+
+def test_rows_endpoint_selects_orders_and_trims(browse_snapshot):
+    body = app.app.test_client().get('/api/rows?rows=drama,missing,popular&limit=1').get_json()
+    assert [row['key'] for row in body['rows']] == ['drama', 'popular']
+    assert [len(row['movies']) for row in body['rows']] == [1, 1]
+    assert all(movie['poster'] for row in body['rows'] for movie in row['movies'])
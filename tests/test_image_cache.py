@@ -0,0 +1,99 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import app
+from image_cache import ImageCache
+
+
+def test_identical_images_are_stored_once(tmp_path):
+    cache = ImageCache(str(tmp_path), 10_000)
+    first = cache.put('w185/a.jpg', b'same bytes', 'image/jpeg')
+    assert cache.put('w500/a.jpg', b'same bytes', 'image/jpeg') == first
+    assert cache.get('w500/a.jpg') == (first, 'image/jpeg')
+    assert len(os.listdir(os.path.join(str(tmp_path), 'objects', first[:2]))) == 1
+
+
+def test_eviction_drops_the_oldest_objects_and_their_refs(tmp_path):
+    cache = ImageCache(str(tmp_path), 250)
+    digests = {}
+    for age, key in enumerate(['old.jpg', 'mid.jpg']):
+        digests[key] = cache.put(key, key.encode() * 10, 'image/jpeg')
+        stamp = time.time() - 100 + age
+        os.utime(cache.object_path(digests[key]), (stamp, stamp))
+    cache.put('new.jpg', b'n' * 150, 'image/jpeg')
+
+    assert cache.get('old.jpg') is None
+    assert not os.path.exists(cache.object_path(digests['old.jpg']))
+    assert digests['old.jpg'] not in {digest for _, digest in cache._refs()}
+    assert cache.get('mid.jpg') is not None and cache.get('new.jpg') is not None
+
+
+class FakeImage:
+    status_code = 200
+    headers = {'Content-Type': 'image/jpeg'}
+    content = b'poster bytes'
+
+
+@pytest.fixture
+def image_proxy(tmp_path, monkeypatch):
+    """The poster proxy over an empty cache; returns the list of upstream calls"""
+    calls = []
+
+    def fake_get(method, url, headers, params):
+        calls.append(url)
+        time.sleep(0.2)
+        return FakeImage()
+
+    monkeypatch.setattr(app, '_image_cache', ImageCache(str(tmp_path), 10_000))
+    monkeypatch.setattr(app, '_tmdb_get', fake_get)
+    return calls
+
+
+def test_concurrent_misses_fetch_once(image_proxy):
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(lambda _: app.proxied_image('w185', 'abc.jpg'), range(6)))
+    assert len(image_proxy) == 1
+    assert len(set(results)) == 1 and results[0][1] == 'image/jpeg'
+
+
+def test_poster_route_serves_etag_and_304(image_proxy):
+    client = app.app.test_client()
+    response = client.get('/img/w185/abc.jpg')
+    assert response.status_code == 200 and response.data == FakeImage.content
+    assert 'immutable' in response.headers['Cache-Control']
+    etag = response.headers['ETag']
+    assert client.get('/img/w185/abc.jpg', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/img/w999/abc.jpg').status_code == 404
+    assert len(image_proxy) == 1
+
+
+def evicting_after_lookup(monkeypatch, times):
+    """Make the object of the next `times` lookups vanish before it is sent, as another worker's eviction would"""
+    lookup = app.proxied_image
+
+    def racing(size, poster_path):
+        digest, content_type = lookup(size, poster_path)
+        if len(racing.evicted) < times:
+            os.remove(app.image_cache().object_path(digest))
+            racing.evicted.append(digest)
+        return digest, content_type
+
+    racing.evicted = []
+    monkeypatch.setattr(app, 'proxied_image', racing)
+
+
+def test_poster_evicted_before_sending_is_fetched_again(image_proxy, monkeypatch):
+    evicting_after_lookup(monkeypatch, 1)
+    response = app.app.test_client().get('/img/w185/abc.jpg')
+    assert response.status_code == 200 and response.data == FakeImage.content
+    assert len(image_proxy) == 2
+
+
+def test_poster_evicted_twice_redirects_upstream(image_proxy, monkeypatch):
+    evicting_after_lookup(monkeypatch, 2)
+    response = app.app.test_client().get('/img/w185/abc.jpg')
+    assert response.status_code == 302
+    assert response.headers['Location'] == f'{app.TMDB_IMAGE_BASE}/w185/abc.jpg'
@@ -0,0 +1,41 @@
+import numpy as np
+
+import app
+from conftest import movie
+from similarity import build_neighbors, top_k_rows
+
+
+def test_top_k_rows_orders_ties_by_ascending_column():
+    block = np.array([[0.5, 0.75, 0.5, 0.75, 0.5, 0.25]])
+    idx, scores = top_k_rows(block, 4)
+    assert idx.tolist() == [[1, 3, 0, 2]]
+    assert scores.tolist() == [[0.75, 0.75, 0.5, 0.5]]
+
+
+def test_top_k_rows_skips_self_and_caps_k():
+    block = np.array([[1.0, 0.2, 0.2], [0.3, 1.0, 0.3]])
+    idx, _ = top_k_rows(block, 10, self_rows=np.array([0, 1]))
+    assert idx.tolist() == [[1, 2], [0, 2]]
+
+
+def test_ingest_matches_a_full_rebuild(recommender):
+    result = app.ingest_movies([movie(i, recommender) for i in range(40, 48)], persist=False)
+    assert len(result['added']) == 8 and result['total'] == 48
+
+    snap = app.snapshot
+    _, scores = build_neighbors(snap.features, 5)
+    np.testing.assert_allclose(snap.neighbor_scores, scores, rtol=1e-6)
+    # Equal scores may be ordered differently, but every neighbour listed must carry its true similarity
+    sims = (snap.features @ snap.features.T).toarray()
+    listed = np.take_along_axis(sims, snap.neighbors.astype(np.int64), axis=1)
+    np.testing.assert_allclose(listed, snap.neighbor_scores, rtol=1e-6)
+    assert not (snap.neighbors == np.arange(48)[:, None]).any()
+    assert snap.title_index['movie 47'] == 47
+
+
+def test_ingest_skips_known_and_repeated_titles(recommender):
+    new = movie(40, recommender)
+    result = app.ingest_movies([movie(3, recommender), new, dict(new), {'movie_title': ' '}], persist=False)
+    assert result['added'] == ['movie 40']
+    assert result['skipped'] == ['movie 3', 'movie 40', '']
+    assert len(app.snapshot.data) == 41
@@ -0,0 +1,63 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def empty_snapshot(monkeypatch):
+    monkeypatch.setattr(app, 'snapshot', app.ArtifactSnapshot())
+
+
+def recommender_loader(load):
+    return app.LazyLoader('recommender', lambda snap: snap.neighbors is not None, load)
+
+
+def test_concurrent_callers_share_one_load():
+    calls = []
+
+    def load():
+        calls.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return {'neighbors': np.zeros((1, 0), dtype=np.int32)}
+
+    loader = recommender_loader(load)
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        snaps = list(pool.map(lambda _: loader.ensure(5), range(5)))
+    assert len(calls) == 1
+    assert all(snap.neighbors is not None for snap in snaps)
+
+
+def test_failed_loads_back_off_exponentially(monkeypatch):
+    monkeypatch.setattr(app, 'LOAD_RETRY_BASE', 10)
+    monkeypatch.setattr(app, 'LOAD_RETRY_MAX', 25)
+    calls = []
+    loader = recommender_loader(lambda: calls.append(1))
+
+    with pytest.raises(app.WarmingUp) as first:
+        loader.ensure(5)
+    assert len(calls) == 1 and 9 < first.value.retry_after <= 10
+    # Inside the backoff window nobody starts another load
+    with pytest.raises(app.WarmingUp) as waiting:
+        loader.ensure(5)
+    assert len(calls) == 1 and waiting.value.retry_after > 9
+
+    for expected in (20, 25):
+        loader._retry_at = 0.0
+        with pytest.raises(app.WarmingUp) as retry:
+            loader.ensure(5)
+        assert expected - 1 < retry.value.retry_after <= expected
+    assert len(calls) == 3
+
+
+def test_warming_up_is_a_503_with_retry_after(monkeypatch):
+    monkeypatch.setattr(app, 'WARMUP_WAIT_SECONDS', 0.5)
+    monkeypatch.setitem(app._loaders, 'recommender', recommender_loader(lambda: None))
+    response = app.app.test_client().post('/similarity', data={'name': 'movie 1'})
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) >= 1
+    assert response.get_json()['component'] == 'recommender'
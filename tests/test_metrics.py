@@ -0,0 +1,30 @@
+import app
+from metrics import Counter, Histogram
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram('latency_seconds', 'Test latency', ('endpoint',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, 'get_movies')
+    lines = histogram.render()
+    assert lines[2:] == [
+        'latency_seconds_bucket{endpoint="get_movies",le="0.1"} 2',
+        'latency_seconds_bucket{endpoint="get_movies",le="1.0"} 3',
+        'latency_seconds_bucket{endpoint="get_movies",le="+Inf"} 4',
+        'latency_seconds_sum{endpoint="get_movies"} 3.65',
+        'latency_seconds_count{endpoint="get_movies"} 4',
+    ]
+
+
+def test_counter_labels_are_escaped():
+    counter = Counter('calls_total', 'Test calls', ('name',))
+    counter.inc('say "hi"\n')
+    counter.inc('say "hi"\n', amount=2)
+    assert counter.render()[2] == 'calls_total{name="say \\"hi\\"\\n"} 3'
+
+
+def test_requests_are_recorded_per_endpoint():
+    client = app.app.test_client()
+    client.get('/health')
+    body = client.get('/metrics').data.decode()
+    assert 'http_request_duration_seconds_count{endpoint="health_check",method="GET",status="200"}' in body
@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+import app
+from catalog import build_range_indexes
+from test_asgi import asgi_get
+
+
+@pytest.fixture
+def linked_snapshot(recommender, monkeypatch):
+    """The recommender fixture plus a browse catalog whose even titles link to it"""
+    snap = app.snapshot
+    n = 40
+    movies = pd.DataFrame({
+        'id': [100 + i for i in range(n)],
+        'title': [f'Movie {i}' if i % 2 == 0 else f'Unlinked {i}' for i in range(n)],
+        'genres': 'Drama', 'release_date': pd.to_datetime('2000-01-01'), 'year': 2000.0,
+        'vote_average': 7.0, 'popularity': 1.0, 'runtime': 100.0, 'director': 'A',
+        'overview': '', 'tagline': '', 'cast': '[]',
+    })
+    changes = {'movies_data': movies, 'range_indexes': build_range_indexes(movies)}
+    snap = snap.replace(**changes, **app.catalog_links(changes, snap))
+    monkeypatch.setattr(app, 'snapshot', snap)
+    return snap
+
+
+def test_full_is_details_plus_linked_recommendations(linked_snapshot):
+    client = app.app.test_client()
+    full = client.get('/api/movie/104/full').get_json()
+    details = client.get('/api/movie/104').get_json()
+    recommendations = full.pop('recommendations')
+    assert full == details
+
+    # Neighbours of recommender row 4 that have a browse entry, in neighbour order
+    expected = [100 + a for a in linked_snapshot.neighbors[4] if a % 2 == 0]
+    assert len(expected) > 1
+    assert [rec['id'] for rec in recommendations] == expected
+    assert client.get('/api/movie/104/full?limit=1').get_json()['recommendations'] == recommendations[:1]
+
+
+def test_full_without_a_recommender_row(linked_snapshot):
+    client = app.app.test_client()
+    assert client.get('/api/movie/105/full').get_json()['recommendations'] == []
+    assert client.get('/api/movie/999/full').status_code == 404
+
+
+def test_full_serves_details_while_the_recommender_loads(linked_snapshot, monkeypatch):
+    started = []
+    monkeypatch.setattr(app, 'snapshot', linked_snapshot.replace(neighbors=None))
+    monkeypatch.setattr(app, 'load_in_background', started.append)
+    response = app.app.test_client().get('/api/movie/104/full')
+    assert response.status_code == 200
+    assert response.get_json()['recommendations'] == []
+    assert started == ['recommender']
+
+
+def test_asgi_full_serves_details_while_the_recommender_loads(linked_snapshot, monkeypatch):
+    monkeypatch.setattr(app, 'snapshot', linked_snapshot.replace(neighbors=None))
+    monkeypatch.setattr(app, 'load_in_background', lambda component: None)
+    response, = asgi_get('/api/movie/104/full')
+    assert response.status_code == 200 and response.json()['recommendations'] == []
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+
+import pytest
+
+import app
+from test_movie_full import linked_snapshot  # noqa: F401
+
+
+def test_poster_batch_resolves_duplicates_once(monkeypatch):
+    looked_up = []
+
+    def fake_fetch_posters(items):
+        looked_up.extend(items)
+        return [f'poster:{title}:{movie_id}' for title, movie_id in items]
+
+    monkeypatch.setattr(app, 'fetch_posters', fake_fetch_posters)
+    body = {'movies': ['Avatar', {'title': 'Avatar'}, {'title': 'Up', 'id': 14160}, {'title': 'Up', 'id': '14160'}]}
+    response = app.app.test_client().post('/api/posters', json=body).get_json()
+    assert looked_up == [('Avatar', None), ('Up', 14160)]
+    assert response['count'] == 4
+    assert [entry['poster'] for entry in response['posters']] == ['poster:Avatar:None', 'poster:Avatar:None',
+                                                                  'poster:Up:14160', 'poster:Up:14160']
+
+
+@pytest.mark.parametrize('body', [{}, {'movies': []}, {'movies': [{'id': 1}]}, {'movies': [7]},
+                                  {'movies': ['x'] * (app.MAX_POSTER_BATCH + 1)}])
+def test_poster_batch_rejects_bad_bodies(body):
+    assert app.app.test_client().post('/api/posters', json=body).status_code == 400
+
+
+def test_deferred_recommendations_never_call_tmdb(recommender, monkeypatch):
+    def fail(*args):
+        raise AssertionError('TMDB was called')
+
+    monkeypatch.setattr(app, 'fetch_posters', fail)
+    monkeypatch.setattr(app, '_tmdb_get', fail)
+    response = app.app.test_client().post('/recommend', json={'movie_title': 'movie 3', 'posters': 'deferred'})
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['movies'] == app.rcmd('movie 3')
+    # No browse catalog is loaded, so nothing links to an id; without a TMDB key posters are placeholders
+    assert body['ids'] == [None] * body['count']
+    assert body['posters'] == [app.placeholder_poster(movie) for movie in body['movies']]
+
+
+def test_deferred_recommendations_reuse_posters_cached_by_browse_id(linked_snapshot, monkeypatch):
+    class Answer:
+        status_code = 200
+
+        def __init__(self, url):
+            self.url = url
+
+        def json(self):
+            return {'poster_path': f"/{self.url.rsplit('/', 1)[-1]}.jpg"}
+
+    monkeypatch.setattr(app, 'TMDB_API_KEY', 'key')
+    monkeypatch.setattr(app, '_poster_cache', OrderedDict())
+    monkeypatch.setattr(app, '_tmdb_get', lambda kind, url, *args: Answer(url))
+    # /api/movies resolves posters under the browse id and its display-cased title
+    for movie_id, title in zip(linked_snapshot.movies_data['id'], linked_snapshot.movies_data['title']):
+        app.fetch_poster(title, int(movie_id))
+
+    body = app.app.test_client().post('/recommend', json={'movie_title': 'movie 3', 'posters': 'deferred'}).get_json()
+    linked = [(poster, movie_id) for poster, movie_id in zip(body['posters'], body['ids']) if movie_id]
+    assert linked
+    assert all(poster == app.poster_url(f'/{movie_id}.jpg') for poster, movie_id in linked)
+
+
+def test_title_only_posters_share_a_lowercased_key(monkeypatch):
+    monkeypatch.setattr(app, 'TMDB_API_KEY', 'key')
+    monkeypatch.setattr(app, '_poster_cache', OrderedDict())
+    app._cache_poster(app.poster_key('Blade Runner'), 'url')
+    assert app.known_poster('blade runner') == 'url'
+    assert app.known_poster('Blade Runner', 78) is None
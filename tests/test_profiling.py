@@ -0,0 +1,37 @@
+import pytest
+from flask import g
+
+import app
+
+
+@pytest.fixture
+def profiling(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.setattr(app, 'ADMIN_TOKEN', 'secret')
+
+
+def profiled_request(headers):
+    """Run the profiling hooks around a trivial request; returns the response"""
+    with app.app.test_request_context('/health', headers=headers):
+        app._start_profiler()
+        sum(range(1000))
+        return app._finish_profiler(app.app.response_class('ok'))
+
+
+def test_profile_is_stored_and_served(profiling):
+    profile_id = profiled_request({'X-Profile': '1', 'X-Admin-Token': 'secret'}).headers['X-Profile-Id']
+    client = app.app.test_client()
+    admin = {'X-Admin-Token': 'secret'}
+    assert client.get('/admin/profiles', headers=admin).get_json() == {'profiles': [profile_id]}
+    summary = client.get(f'/admin/profiles/{profile_id}', headers=admin)
+    assert summary.status_code == 200 and 'cumulative' in summary.data.decode()
+    assert client.get('/admin/profiles/missing', headers=admin).status_code == 404
+    assert client.get(f'/admin/profiles/{profile_id}').status_code == 403
+
+
+def test_profiling_needs_the_admin_token(profiling):
+    response = profiled_request({'X-Profile': '1', 'X-Admin-Token': 'wrong'})
+    assert 'X-Profile-Id' not in response.headers
+    with app.app.test_request_context('/health', headers={'X-Admin-Token': 'secret'}):
+        app._start_profiler()
+        assert 'profiler' not in g
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+from catalog import CatalogDB, SortedColumnIndex, build_range_indexes, compact_movies_frame, intersect_sorted
+from catalog_csv import read_movies
+
+MOVIES_CSV = """id,title,genres,release_date,vote_average,popularity,overview,tagline,runtime,director,cast
+1,Old Classic,Drama,1940-05-01,8.1,10.0,,,100,A,[]
+2,Undated Thriller,Thriller,,6.5,50.0,,,90,B,[]
+3,Unrated Comedy,Comedy,1945-01-01,,20.0,,,95,C,[]
+4,Modern Hit,Action,2014-07-25,4.0,90.0,,,120,D,[]
+5,Nothing Known,Drama,,,5.0,,,80,E,[]
+"""
+
+
+@pytest.fixture
+def catalog_csv(tmp_path):
+    path = tmp_path / 'movies.csv'
+    path.write_text(MOVIES_CSV)
+    return str(path)
+
+
+def memory_titles(df, args, indexed):
+    index = app.filter_movies(df, args, build_range_indexes(df) if indexed else None)
+    return sorted(df.loc[index, 'title'])
+
+
+def sqlite_titles(db, args):
+    filters = app.catalog_filters(args)
+    filters.pop('sort')
+    return sorted(row['title'] for row in db.query(**filters))
+
+
+@pytest.mark.parametrize('args, expected', [
+    ({'year_max': '1950'}, ['Old Classic', 'Unrated Comedy']),
+    ({'year_min': '1900'}, ['Modern Hit', 'Old Classic', 'Unrated Comedy']),
+    ({'rating_max': '7'}, ['Modern Hit', 'Undated Thriller']),
+    ({'rating_min': '0'}, ['Modern Hit', 'Old Classic', 'Undated Thriller']),
+    ({'year_max': '1950', 'rating_max': '9'}, ['Old Classic']),
+])
+def test_missing_year_and_rating_never_match_ranges(catalog_csv, tmp_path, args, expected):
+    df = read_movies(catalog_csv)
+    assert memory_titles(df, args, indexed=True) == expected
+    assert memory_titles(df, args, indexed=False) == expected
+    assert memory_titles(compact_movies_frame(df), args, indexed=True) == expected
+    db = CatalogDB.build(catalog_csv, str(tmp_path / 'movies.db'))
+    assert sqlite_titles(db, args) == expected
+
+
+def test_missing_year_and_rating_are_served_as_zero(catalog_csv):
+    df = read_movies(catalog_csv)
+    rows, total, _, _ = app.query_movies(df, {'search': 'nothing'})
+    assert total == 1
+    summary = app.movie_summary(rows.iloc[0], None)
+    assert (summary['year'], summary['rating']) == (0, 0.0)
+    assert pd.isna(df.loc[df['title'] == 'Nothing Known', 'year']).all()
+
+
+def test_sorted_index_matches_a_scan():
+    rng = np.random.default_rng(11)
+    values = rng.choice([1.0, 2.5, 4.0, 7.5, np.nan], 300)
+    index = SortedColumnIndex(values)
+    for low, high in [(None, None), (2.5, 4.0), (3.0, None), (None, 1.0), (8.0, 9.0), (4.0, 2.5)]:
+        expected = np.flatnonzero((values >= (-np.inf if low is None else low)) & (values <= (np.inf if high is None else high)))
+        np.testing.assert_array_equal(index.positions(low, high), expected)
+
+
+@pytest.mark.parametrize('a, b, expected', [
+    ([1, 4, 9, 12], [0, 4, 5, 12, 40], [4, 12]),
+    ([], [1, 2], []),
+    ([50, 60], [1, 2, 3], []),
+    ([0, 1, 2, 3, 4, 5], [5], [5]),
+])
+def test_intersect_sorted(a, b, expected):
+    result = intersect_sorted(np.array(a, dtype=np.int32), np.array(b, dtype=np.int32))
+    assert result.tolist() == expected
@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import app
+
+
+def naive_profile_top(snap, like_rows, dislike_rows, k):
+    """One profile scored the plain way: summed seed vectors against every row, seeds excluded"""
+    profile = np.asarray(snap.features[like_rows].sum(axis=0)).ravel()
+    if dislike_rows:
+        profile -= app.DISLIKE_WEIGHT * np.asarray(snap.features[dislike_rows].sum(axis=0)).ravel()
+    scores = snap.features @ profile
+    scores[like_rows + dislike_rows] = -np.inf
+    return scores, np.sort(scores)[::-1][:k]
+
+
+def test_score_profiles_matches_per_profile_scoring(recommender):
+    snap = app.snapshot
+    seeds = [([0, 1], []), ([2], [3, 4]), ([5, 5], [6])]
+    top = app.score_profiles(snap, seeds, 6)
+    for (like_rows, dislike_rows), row_top in zip(seeds, top):
+        scores, expected = naive_profile_top(snap, like_rows, dislike_rows, 6)
+        np.testing.assert_allclose(scores[row_top], expected)
+        assert not set(row_top.tolist()) & set(like_rows + dislike_rows)
+
+
+def test_profile_rcmd_reports_unknown_titles(recommender, monkeypatch):
+    monkeypatch.setattr(app, 'microbatcher', None)
+    titles, unknown = app.profile_rcmd(['Movie 1', 'no such movie'], ['movie 2'], k=4)
+    assert unknown == ['no such movie']
+    assert len(titles) == 4 and not {'movie 1', 'movie 2'} & set(titles)
+    assert app.profile_rcmd(['no such movie']).startswith('Sorry!')
+
+
+def test_batch_rcmd_matches_single_lookups(recommender):
+    snap = app.snapshot
+    results = app.batch_rcmd(['movie 7', 'no such movie', 'MOVIE 12'], k=5)
+    assert results[1].startswith('Sorry!')
+    sims = (snap.features @ snap.features.T).toarray()
+    for row, titles in ((7, results[0]), (12, results[2])):
+        rows = [snap.title_index[title] for title in titles]
+        np.testing.assert_allclose(sims[row, rows], snap.neighbor_scores[row], rtol=1e-6)
+        assert row not in rows
+
+
+def test_microbatcher_coalesces_concurrent_requests():
+    calls = []
+
+    def score(items):
+        calls.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = app.MicroBatcher(score, window_ms=200, max_batch=8)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(lambda item: batcher.submit(item, timeout=5), range(6)))
+    assert results == [0, 2, 4, 6, 8, 10]
+    assert sum(calls) == 6 and len(calls) < 6
+
+
+def test_microbatcher_hands_errors_to_every_caller():
+    def score(items):
+        raise ValueError('boom')
+
+    batcher = app.MicroBatcher(score, window_ms=1)
+    with pytest.raises(ValueError, match='boom'):
+        batcher.submit(1, timeout=5)
+
+
+def test_score_microbatch_matches_direct_scoring(recommender):
+    snap = app.snapshot
+    other = snap.replace()
+    items = [(snap, ([0], []), 3), (other, ([1, 2], [3]), 5), (snap, ([4], [5]), 6)]
+    for (item_snap, seeds, k), top in zip(items, app.score_microbatch(items)):
+        np.testing.assert_array_equal(top, app.score_profiles(item_snap, [seeds], k)[0])
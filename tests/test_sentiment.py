@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import MultinomialNB
+
+from sentiment import compile_sentiment
+
+TEXTS = [
+    'A wonderful, moving film with a brilliant cast',
+    'Dull and far too long; the plot goes nowhere',
+    'Brilliant direction and a wonderful score',
+    'The worst acting I have seen, dull dialogue',
+    'Café scenes were charming and the ending moving',
+    'Nowhere near as good as the book, a long slog',
+    'Charming, funny and brilliant',
+    'Boring. Long. Dull.',
+]
+LABELS = np.array([1, 0, 1, 0, 1, 0, 1, 0])
+UNSEEN = ['brilliant but long', 'completely unseen words here', '', 'DULL DULL dull wonderful', 'café charming',
+          'Søren’s naïve ﬁlm, brilliant']
+
+
+@pytest.mark.parametrize('vectorizer', [
+    TfidfVectorizer(),
+    TfidfVectorizer(sublinear_tf=True, strip_accents='ascii', stop_words='english'),
+    TfidfVectorizer(norm='l1', use_idf=False),
+    TfidfVectorizer(strip_accents='unicode'),
+])
+@pytest.mark.parametrize('make_clf', [lambda: MultinomialNB(alpha=0.5), lambda: LogisticRegression(C=10)])
+def test_compiled_model_matches_sklearn(vectorizer, make_clf):
+    X = vectorizer.fit_transform(TEXTS)
+    clf = make_clf().fit(X, LABELS)
+    compiled = compile_sentiment(clf, vectorizer)
+    texts = TEXTS + UNSEEN
+    np.testing.assert_array_equal(compiled.predict(texts), clf.predict(vectorizer.transform(texts)))
+    if hasattr(clf, 'decision_function'):
+        np.testing.assert_allclose(compiled.decision_function(texts), clf.decision_function(vectorizer.transform(texts)))
+
+
+def test_labels_come_from_the_classifier_classes():
+    vectorizer = TfidfVectorizer()
+    clf = MultinomialNB().fit(vectorizer.fit_transform(TEXTS), np.where(LABELS == 1, 'pos', 'neg'))
+    compiled = compile_sentiment(clf, vectorizer)
+    assert compiled.predict(['brilliant and wonderful', 'dull and long']).tolist() == ['pos', 'neg']
+    assert compiled.heap_bytes() > 0
+
+
+@pytest.mark.parametrize('vectorizer', [TfidfVectorizer(ngram_range=(1, 2)), TfidfVectorizer(binary=True),
+                                        TfidfVectorizer(strip_accents=str.upper)])
+def test_unsupported_vectorizers_are_refused(vectorizer):
+    clf = MultinomialNB().fit(vectorizer.fit_transform(TEXTS), LABELS)
+    with pytest.raises(ValueError):
+        compile_sentiment(clf, vectorizer)
+
+
+def test_multiclass_models_are_refused():
+    vectorizer = TfidfVectorizer()
+    clf = MultinomialNB().fit(vectorizer.fit_transform(TEXTS), [0, 1, 2, 0, 1, 2, 0, 1])
+    with pytest.raises(ValueError):
+        compile_sentiment(clf, vectorizer)
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from similarity import build_neighbors, build_neighbors_to_disk, catalog_fingerprint, load_neighbors, vectorize_catalog
+
+
+def catalog_features(n=60):
+    rng = np.random.default_rng(5)
+    words = [f'w{i}' for i in range(30)]
+    comb = pd.Series([' '.join(rng.choice(words, 6)) for _ in range(n)])
+    return comb, vectorize_catalog(comb)[1]
+
+
+def test_blocked_neighbours_match_one_block():
+    _, feats = catalog_features()
+    whole = build_neighbors(feats, 8, block_size=1000)
+    blocked = build_neighbors(feats, 8, block_size=7)
+    np.testing.assert_array_equal(whole[0], blocked[0])
+    np.testing.assert_array_equal(whole[1], blocked[1])
+
+
+def test_disk_build_matches_in_process_build(tmp_path):
+    comb, feats = catalog_features()
+    fingerprint = catalog_fingerprint(comb)
+    build_neighbors_to_disk(feats, 8, str(tmp_path), fingerprint, block_size=7, workers=2)
+
+    nbrs, scores = load_neighbors(str(tmp_path), fingerprint, len(comb), 8)
+    expected = build_neighbors(feats, 8)
+    np.testing.assert_array_equal(nbrs, expected[0])
+    np.testing.assert_array_equal(scores, expected[1])
+    # Fewer neighbours than were saved is a prefix; a changed catalog or a larger k is a miss
+    np.testing.assert_array_equal(load_neighbors(str(tmp_path), fingerprint, len(comb), 3)[0], expected[0][:, :3])
+    assert load_neighbors(str(tmp_path), 'stale', len(comb), 8) is None
+    assert load_neighbors(str(tmp_path), fingerprint, len(comb), 20) is None
@@ -0,0 +1,25 @@
+import pandas as pd
+
+import app
+
+
+def test_replace_returns_a_new_version():
+    first = app.ArtifactSnapshot(title_index={'a': 0})
+    second = first.replace(title_index={'b': 0})
+    assert (first.version, first.title_index) == (0, {'a': 0})
+    assert (second.version, second.title_index) == (1, {'b': 0})
+
+
+def test_reload_keeps_components_that_fail_to_load(monkeypatch):
+    # The test artifacts directory is empty, so every component fails to load
+    movies = pd.DataFrame({'id': [1], 'title': ['Kept']})
+    previous = app.ArtifactSnapshot(version=4, movies_data=movies)
+    monkeypatch.setattr(app, 'snapshot', previous)
+    monkeypatch.setattr(app, 'ADMIN_TOKEN', 'secret')
+    client = app.app.test_client()
+
+    assert client.post('/admin/reload?wait=1').status_code == 403
+    response = client.post('/admin/reload?wait=1', headers={'X-Admin-Token': 'secret'}).get_json()
+    assert response == {'status': 'reloaded', 'version': 5}
+    assert app.snapshot is not previous and app.snapshot.movies_data is movies
+    assert previous.version == 4
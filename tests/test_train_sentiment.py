@@ -0,0 +1,61 @@
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+import train_sentiment
+from sentiment import compile_sentiment
+
+POSITIVE = ['wonderful', 'brilliant', 'charming', 'moving', 'funny']
+NEGATIVE = ['dull', 'boring', 'slog', 'worst', 'tedious']
+
+
+def reviews(n, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        label = i % 2
+        words = rng.choices(POSITIVE if label else NEGATIVE, k=4) + rng.choices(['the', 'film', 'plot', 'café'], k=3)
+        rng.shuffle(words)
+        yield label, f"{' '.join(words)} {i}"
+
+
+@pytest.mark.parametrize('vectorizer', [
+    train_sentiment.make_vectorizer(2 ** 10),
+    HashingVectorizer(n_features=2 ** 8, alternate_sign=True, stop_words='english', norm='l1'),
+])
+def test_compiled_hashing_model_matches_sklearn(vectorizer):
+    labels, texts = zip(*reviews(200))
+    clf = SGDClassifier(random_state=0).fit(vectorizer.transform(texts), labels)
+    compiled = compile_sentiment(clf, vectorizer)
+    texts = list(texts) + ['', 'unseen words only', 'THE FILM WAS DULL']
+    np.testing.assert_array_equal(compiled.predict(texts), clf.predict(vectorizer.transform(texts)))
+    np.testing.assert_allclose(compiled.decision_function(texts), clf.decision_function(vectorizer.transform(texts)))
+
+
+def test_shuffled_keeps_every_item_once():
+    items = list(range(100))
+    out = list(train_sentiment.shuffled(iter(items), 10, random.Random(1)))
+    assert sorted(out) == items and out != items
+
+
+def test_batches_split_the_stream():
+    sizes = [len(texts) for _, texts in train_sentiment.batches(reviews(25), 10)]
+    assert sizes == [10, 10, 5]
+
+
+def test_streaming_training_learns_and_compiles(tmp_path):
+    path = tmp_path / 'reviews.txt'
+    path.write_text(''.join(f'{label}\t{text}\n' for label, text in reviews(600)), encoding='utf-8')
+    args = SimpleNamespace(epochs=2, holdout=20, shuffle_buffer=50, batch_size=64, log_every=1000, seed=0)
+    vectorizer = train_sentiment.make_vectorizer(2 ** 12)
+    models = {name: make() for name, make in train_sentiment.CLASSIFIERS.items()}
+
+    trained, _, _ = train_sentiment.train([str(path)], models, vectorizer, args)
+    accuracy, mismatches, held_out = train_sentiment.evaluate([str(path)], models, vectorizer, args)
+    assert held_out > 0
+    assert trained == 2 * (600 - held_out)
+    assert min(accuracy.values()) > 0.9
+    assert set(mismatches) == set(models) and not any(mismatches.values())
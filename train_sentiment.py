@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Out-of-core training for the review sentiment model.
+
+Streams one or more "label<TAB>text" corpora (plain or .gz) in mini-batches
+through a stateless HashingVectorizer and trains every candidate classifier
+incrementally with partial_fit, so memory is bounded by the batch and shuffle
+buffer sizes rather than the corpus:
+
+    python train_sentiment.py --reviews Artifacts/reviews.txt more_reviews.txt.gz --epochs 3
+
+A deterministic slice of the corpus (by text hash) is held out and streamed
+again to pick the best classifier. Its pickles are written as nlp_model.pkl /
+tranform.pkl to --out-dir; point the app at them with SENTIMENT_DIR (or copy
+them into Artifacts/) and POST /admin/reload.
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import pickle
+import random
+import resource
+import time
+import zlib
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import Perceptron, SGDClassifier
+from sklearn.naive_bayes import MultinomialNB
+
+from sentiment import ARTIFACTS_DIR, compile_sentiment
+
+logger = logging.getLogger(__name__)
+
+# Labels in the review corpora; partial_fit needs the full set up front
+BINARY_CLASSES = np.array([0, 1])
+
+# Incrementally trainable candidates, compared on the held-out slice
+CLASSIFIERS = {
+    'nb': lambda: MultinomialNB(alpha=0.1),
+    'sgd-hinge': lambda: SGDClassifier(loss='hinge', alpha=1e-5, random_state=0),
+    'sgd-log': lambda: SGDClassifier(loss='log_loss', alpha=1e-5, random_state=0),
+    'perceptron': lambda: Perceptron(alpha=1e-6, penalty='l2', random_state=0),
+}
+
+
+def make_vectorizer(n_features):
+    """Stateless vectorizer: nothing to fit, so every batch is transformed independently.
+
+    Counts stay non-negative (alternate_sign=False) so MultinomialNB can train on them.
+    """
+    return HashingVectorizer(n_features=n_features, alternate_sign=False, norm='l2', strip_accents='ascii')
+
+
+def iter_reviews(paths):
+    """Yield (label, text) from "label<TAB>text" files, one line at a time"""
+    for path in paths:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                label, _, text = line.rstrip('\n').partition('\t')
+                if text:
+                    yield int(label), text
+
+
+def is_holdout(text, percent):
+    """Stable train/holdout split that needs no memory of which rows went where"""
+    return zlib.crc32(text.encode('utf-8')) % 100 < percent
+
+
+def shuffled(items, buffer_size, rng):
+    """Approximately shuffle a stream with a bounded buffer (corpora are often sorted by label)"""
+    buffer = []
+    for item in items:
+        if len(buffer) < buffer_size:
+            buffer.append(item)
+            continue
+        i = rng.randrange(buffer_size)
+        yield buffer[i]
+        buffer[i] = item
+    rng.shuffle(buffer)
+    yield from buffer
+
+
+def batches(items, size):
+    """(labels, texts) mini-batches of at most `size` reviews"""
+    labels, texts = [], []
+    for label, text in items:
+        labels.append(label)
+        texts.append(text)
+        if len(texts) == size:
+            yield np.array(labels), texts
+            labels, texts = [], []
+    if texts:
+        yield np.array(labels), texts
+
+
+def train(paths, models, vectorizer, args):
+    """Run `args.epochs` streaming passes over the training slice; returns (reviews, bytes, seconds)"""
+    rng = random.Random(args.seed)
+    reviews = size = 0
+    started = time.perf_counter()
+    for epoch in range(args.epochs):
+        stream = ((label, text) for label, text in iter_reviews(paths) if not is_holdout(text, args.holdout))
+        for b, (labels, texts) in enumerate(batches(shuffled(stream, args.shuffle_buffer, rng), args.batch_size)):
+            X = vectorizer.transform(texts)
+            for clf in models.values():
+                clf.partial_fit(X, labels, classes=BINARY_CLASSES)
+            reviews += len(texts)
+            size += sum(len(text) for text in texts)
+            if (b + 1) % args.log_every == 0:
+                elapsed = time.perf_counter() - started
+                logger.info(f"epoch {epoch + 1} batch {b + 1}: {reviews:,} reviews, {reviews / elapsed:,.0f} reviews/sec")
+    return reviews, size, time.perf_counter() - started
+
+
+def evaluate(paths, models, vectorizer, args):
+    """Holdout accuracy per model, and label mismatches of the compiled model vs sklearn"""
+    compiled = {}
+    for name, clf in models.items():
+        try:
+            compiled[name] = compile_sentiment(clf, vectorizer)
+        except ValueError as e:
+            logger.warning(f"{name} cannot be compiled: {e}")
+    correct = {name: 0 for name in models}
+    mismatches = {name: 0 for name in compiled}
+    total = 0
+    stream = ((label, text) for label, text in iter_reviews(paths) if is_holdout(text, args.holdout))
+    for labels, texts in batches(stream, args.batch_size):
+        X = vectorizer.transform(texts)
+        for name, clf in models.items():
+            predicted = clf.predict(X)
+            correct[name] += int((predicted == labels).sum())
+            if name in compiled:
+                mismatches[name] += int((compiled[name].predict(texts) != predicted).sum())
+        total += len(texts)
+    accuracy = {name: correct[name] / total if total else 0.0 for name in models}
+    return accuracy, mismatches, total
+
+
+def _atomic_pickle(obj, path):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def save_artifacts(out_dir, clf, vectorizer, meta):
+    """Write the app's pickle names; the model goes last so a reload never pairs it with an old vectorizer"""
+    os.makedirs(out_dir, exist_ok=True)
+    _atomic_pickle(vectorizer, os.path.join(out_dir, 'tranform.pkl'))
+    _atomic_pickle(clf, os.path.join(out_dir, 'nlp_model.pkl'))
+    with open(os.path.join(out_dir, 'sentiment_training.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the sentiment model out of core with partial_fit")
+    parser.add_argument('--reviews', nargs='+', default=[os.path.join(ARTIFACTS_DIR, 'reviews.txt')],
+                        help='"label<TAB>text" files, optionally gzipped')
+    parser.add_argument('--out-dir', default=os.path.join(ARTIFACTS_DIR, 'sentiment'))
+    parser.add_argument('--classifiers', nargs='+', choices=sorted(CLASSIFIERS), default=sorted(CLASSIFIERS))
+    parser.add_argument('--n-features', type=int, default=2 ** 20, help="Hashing buckets")
+    parser.add_argument('--batch-size', type=int, default=10000, help="Reviews per partial_fit call")
+    parser.add_argument('--shuffle-buffer', type=int, default=100000, help="Reviews held for shuffling")
+    parser.add_argument('--epochs', type=int, default=3)
+    parser.add_argument('--holdout', type=int, default=10, help="Percent of reviews held out for selection")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--log-every', type=int, default=50, help="Batches between progress lines")
+    args = parser.parse_args()
+    if not 0 < args.holdout < 100:
+        parser.error('--holdout must be between 1 and 99')
+
+    logging.basicConfig(level=logging.INFO)
+    vectorizer = make_vectorizer(args.n_features)
+    models = {name: CLASSIFIERS[name]() for name in args.classifiers}
+
+    reviews, size, seconds = train(args.reviews, models, vectorizer, args)
+    if not reviews:
+        parser.error('no training reviews found')
+    accuracy, mismatches, holdout = evaluate(args.reviews, models, vectorizer, args)
+    candidates = [name for name in models if name in mismatches] or list(models)
+    best = max(candidates, key=lambda name: accuracy[name])
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"Trained on {reviews:,} reviews ({args.epochs} epochs) in {seconds:.1f}s: "
+          f"{reviews / seconds:,.0f} reviews/sec, {size / seconds / 1e6:.1f} MB/s, peak RSS {peak_mb:.0f} MB")
+    for name in models:
+        compiled_note = f", {mismatches[name]} compiled mismatches" if name in mismatches else ", not compilable"
+        print(f"  {name:<11} holdout accuracy {accuracy[name]:.4f} on {holdout:,}{compiled_note}")
+
+    meta = {'classifier': best, 'holdout_accuracy': accuracy[best], 'holdout_reviews': holdout,
+            'training_reviews': reviews, 'epochs': args.epochs, 'n_features': args.n_features,
+            'corpora': args.reviews, 'trained_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
+    save_artifacts(args.out_dir, models[best], vectorizer, meta)
+    print(f"Saved {best} to {args.out_dir} (SENTIMENT_DIR={args.out_dir} to serve it)")
+
+
+if __name__ == '__main__':
+    main()